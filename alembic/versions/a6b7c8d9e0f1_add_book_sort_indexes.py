@@ -0,0 +1,36 @@
+"""add indexes for the GET /books sort orders
+
+Revision ID: a6b7c8d9e0f1
+Revises: f5a6b7c8d9e0
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a6b7c8d9e0f1"
+down_revision: Union[str, Sequence[str], None] = "f5a6b7c8d9e0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_books_created_at_id", "books", ["created_at", "id"], unique=False
+    )
+    op.create_index("ix_books_title_id", "books", ["title", "id"], unique=False)
+    op.create_index(
+        "ix_books_borrowed_at_id", "books", ["borrowed_at", "id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_books_borrowed_at_id", table_name="books")
+    op.drop_index("ix_books_title_id", table_name="books")
+    op.drop_index("ix_books_created_at_id", table_name="books")
@@ -0,0 +1,66 @@
+"""add loan history and precomputed related books
+
+Revision ID: b8c9d0e1f2a3
+Revises: a6b7c8d9e0f1
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b8c9d0e1f2a3"
+down_revision: Union[str, Sequence[str], None] = "a6b7c8d9e0f1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "loans",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("book_id", sa.UUID(), nullable=False),
+        sa.Column("card_number", sa.CHAR(length=6), nullable=False),
+        sa.Column("borrowed_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["book_id"], ["books.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(
+            ["card_number"], ["users.card_number"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_loans_book_id", "loans", ["book_id"], unique=False)
+    op.create_index("ix_loans_card_number", "loans", ["card_number"], unique=False)
+    # The history starts with the loans running today.
+    op.execute(
+        """
+        INSERT INTO loans (book_id, card_number, borrowed_at)
+        SELECT id, borrowed_by, borrowed_at FROM books WHERE is_borrowed
+        """
+    )
+    op.create_table(
+        "related_books",
+        sa.Column("book_id", sa.UUID(), nullable=False),
+        sa.Column("rank", sa.SmallInteger(), nullable=False),
+        sa.Column("related_id", sa.UUID(), nullable=False),
+        sa.Column("together", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["book_id"], ["books.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["related_id"], ["books.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("book_id", "rank"),
+    )
+    op.create_index(
+        "ix_related_books_related_id", "related_books", ["related_id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_related_books_related_id", table_name="related_books")
+    op.drop_table("related_books")
+    op.drop_index("ix_loans_card_number", table_name="loans")
+    op.drop_index("ix_loans_book_id", table_name="loans")
+    op.drop_table("loans")
@@ -0,0 +1,40 @@
+"""add users.loan_count
+
+Revision ID: c2d3e4f5a6b7
+Revises: b7c1d2e3f4a5
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c2d3e4f5a6b7"
+down_revision: Union[str, Sequence[str], None] = "b7c1d2e3f4a5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "users",
+        sa.Column("loan_count", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.create_check_constraint(
+        "ck_users_loan_count_non_negative", "users", "loan_count >= 0"
+    )
+    op.execute(
+        "UPDATE users SET loan_count = "
+        "(SELECT count(*) FROM books WHERE books.borrowed_by = users.card_number)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint("ck_users_loan_count_non_negative", "users", type_="check")
+    op.drop_column("users", "loan_count")
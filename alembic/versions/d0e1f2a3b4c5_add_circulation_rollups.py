@@ -0,0 +1,65 @@
+"""add day and week rollups to circulation buckets
+
+Revision ID: d0e1f2a3b4c5
+Revises: c9d0e1f2a3b4
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d0e1f2a3b4c5"
+down_revision: Union[str, Sequence[str], None] = "c9d0e1f2a3b4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "circulation_buckets",
+        sa.Column(
+            "granularity", sa.String(length=8), nullable=False, server_default="hour"
+        ),
+    )
+    op.alter_column("circulation_buckets", "granularity", server_default=None)
+    op.drop_constraint(
+        "circulation_buckets_pkey", "circulation_buckets", type_="primary"
+    )
+    op.create_primary_key(
+        "circulation_buckets_pkey",
+        "circulation_buckets",
+        ["granularity", "bucket_start"],
+    )
+    # date_trunc('week') starts weeks on Monday, like the ISO weeks of the API.
+    for granularity in ("day", "week"):
+        op.execute(
+            f"""
+            INSERT INTO circulation_buckets
+                (granularity, bucket_start, borrows, returns)
+            SELECT '{granularity}',
+                date_trunc('{granularity}', bucket_start AT TIME ZONE 'UTC')
+                    AT TIME ZONE 'UTC',
+                sum(borrows), sum(returns)
+            FROM circulation_buckets
+            WHERE granularity = 'hour'
+            GROUP BY 2
+            """
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DELETE FROM circulation_buckets WHERE granularity <> 'hour'")
+    op.drop_constraint(
+        "circulation_buckets_pkey", "circulation_buckets", type_="primary"
+    )
+    op.create_primary_key(
+        "circulation_buckets_pkey", "circulation_buckets", ["bucket_start"]
+    )
+    op.drop_column("circulation_buckets", "granularity")
@@ -0,0 +1,40 @@
+"""add id to the index of the author sort order
+
+Revision ID: e1f2a3b4c5d6
+Revises: d0e1f2a3b4c5
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e1f2a3b4c5d6"
+down_revision: Union[str, Sequence[str], None] = "d0e1f2a3b4c5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_books_author_id_created_at_id",
+        "books",
+        ["author_id", "created_at", "id"],
+        unique=False,
+    )
+    op.drop_index("ix_books_author_id_created_at", table_name="books")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(
+        "ix_books_author_id_created_at",
+        "books",
+        ["author_id", "created_at"],
+        unique=False,
+    )
+    op.drop_index("ix_books_author_id_created_at_id", table_name="books")
@@ -0,0 +1,47 @@
+"""add change feed index and book tombstones
+
+Revision ID: e4f5a6b7c8d9
+Revises: d3e4f5a6b7c8
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e4f5a6b7c8d9"
+down_revision: Union[str, Sequence[str], None] = "d3e4f5a6b7c8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_books_updated_at_id", "books", ["updated_at", "id"], unique=False
+    )
+    op.create_table(
+        "book_tombstones",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("book_id", sa.UUID(), nullable=False),
+        sa.Column("serial_number", sa.CHAR(length=6), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_book_tombstones_deleted_at_id",
+        "book_tombstones",
+        ["deleted_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_book_tombstones_deleted_at_id", table_name="book_tombstones")
+    op.drop_table("book_tombstones")
+    op.drop_index("ix_books_updated_at_id", table_name="books")
@@ -0,0 +1,84 @@
+"""add authors table referenced by books
+
+Revision ID: f5a6b7c8d9e0
+Revises: e4f5a6b7c8d9
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f5a6b7c8d9e0"
+down_revision: Union[str, Sequence[str], None] = "e4f5a6b7c8d9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "authors",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "uq_authors_name_lower", "authors", [sa.text("lower(name)")], unique=True
+    )
+    # One author per case-insensitive name, keeping the most common spelling.
+    op.execute(
+        """
+        INSERT INTO authors (name)
+        SELECT DISTINCT ON (lower(author)) author
+        FROM books
+        GROUP BY author
+        ORDER BY lower(author), count(*) DESC, author
+        """
+    )
+    op.add_column("books", sa.Column("author_id", sa.Integer(), nullable=True))
+    op.execute(
+        """
+        UPDATE books SET author_id = authors.id
+        FROM authors
+        WHERE lower(authors.name) = lower(books.author)
+        """
+    )
+    op.alter_column("books", "author_id", nullable=False)
+    op.create_foreign_key(
+        "books_author_id_fkey",
+        "books",
+        "authors",
+        ["author_id"],
+        ["id"],
+        ondelete="RESTRICT",
+    )
+    op.create_index(
+        "ix_books_author_id_created_at",
+        "books",
+        ["author_id", "created_at"],
+        unique=False,
+    )
+    op.drop_column("books", "author")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column("books", sa.Column("author", sa.String(length=255), nullable=True))
+    op.execute(
+        """
+        UPDATE books SET author = authors.name
+        FROM authors
+        WHERE authors.id = books.author_id
+        """
+    )
+    op.alter_column("books", "author", nullable=False)
+    op.drop_index("ix_books_author_id_created_at", table_name="books")
+    op.drop_constraint("books_author_id_fkey", "books", type_="foreignkey")
+    op.drop_column("books", "author_id")
+    op.drop_index("uq_authors_name_lower", table_name="authors")
+    op.drop_table("authors")
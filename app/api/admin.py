@@ -0,0 +1,74 @@
+from dataclasses import asdict
+from typing import List
+
+from fastapi import APIRouter, HTTPException, Query
+
+from app import db
+from app.availability import availability
+from app.schemas.admin import (
+    AvailabilityCheckOut,
+    CircuitBreakerStats,
+    CoalescingStats,
+    MetricsOut,
+    PageCacheStats,
+    SlowQueryOut,
+    StaleReadStats,
+)
+from app.page_cache import page_cache
+from app.singleflight import read_coalescer
+from app.slow_queries import slow_query_log
+from app.stale import last_good
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.get(
+    "/metrics",
+    response_model=MetricsOut,
+    summary="Process metrics",
+    description="Counters of this worker process since it started.",
+)
+async def metrics():
+    return MetricsOut(
+        read_coalescing=CoalescingStats(**read_coalescer.stats()),
+        page_cache=PageCacheStats(**page_cache.stats()),
+        circuit_breaker=CircuitBreakerStats(**db.breaker.stats()),
+        stale_reads=StaleReadStats(**last_good.stats()),
+    )
+
+
+@router.get(
+    "/slow-queries",
+    response_model=List[SlowQueryOut],
+    summary="Recent slow queries",
+    description=(
+        "The most recent statements of this worker process that exceeded "
+        "`SLOW_QUERY_THRESHOLD_MS`, newest first, with their PostgreSQL plan once "
+        "it has been captured."
+    ),
+)
+async def slow_queries():
+    return [SlowQueryOut(**asdict(entry)) for entry in slow_query_log.entries()]
+
+
+@router.get(
+    "/availability/check",
+    response_model=AvailabilityCheckOut,
+    summary="Check the availability index",
+    description=(
+        "Compares this worker's availability index with the `books` table. "
+        "Changes from other workers that are younger than the change feed lag may "
+        "show up as mismatches. With **repair=true** the index is replaced by the "
+        "table's state."
+    ),
+)
+async def check_availability(
+    repair: bool = Query(False, description="Rebuild the index on mismatch"),
+):
+    if not availability.loaded:
+        raise HTTPException(
+            status_code=503, detail="Availability index is not loaded yet"
+        )
+    async with db.transaction_session("job") as session:
+        result = await availability.check(session, repair=repair)
+    return AvailabilityCheckOut(**asdict(result))
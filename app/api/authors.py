@@ -0,0 +1,35 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import get_read_db
+from app.schemas.author import AuthorOut
+from app.services.authors import AuthorService
+
+router = APIRouter(prefix="/authors", tags=["authors"])
+
+
+@router.get(
+    "",
+    response_model=List[AuthorOut],
+    summary="Browse authors",
+    description=(
+        "Returns the authors that have books in the catalog with their book counts, "
+        "ordered by name (case-insensitive). To get the next page, pass the last "
+        "name of the previous one as **after**."
+    ),
+)
+async def list_authors(
+    after: Optional[str] = Query(
+        None,
+        max_length=255,
+        description="Return only authors whose name sorts after this one",
+    ),
+    limit: int = Query(
+        100, ge=1, le=500, description="Max number of authors to return (1–500)"
+    ),
+    db: AsyncSession = Depends(get_read_db),
+):
+    authors = await AuthorService(db).list_authors(after=after, limit=limit)
+    return [AuthorOut(name=a.name, book_count=a.book_count) for a in authors]
@@ -1,34 +1,83 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Path, Body, status
+from fastapi.responses import Response, StreamingResponse
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db import get_db
+from app.availability import availability
+from app.config import settings
+from app.db import get_read_db, transaction_session
 from app.dataclasses.book_dto import BookDTO
-from app.schemas.book import BookCreate, BookOut, BorrowRequest, SetStatusRequest
-from app.services.books import BookService
+from app.schemas.book import (
+    BookAvailabilityOut,
+    BookAvailabilityRequest,
+    BookChangesOut,
+    BookCreate,
+    BookImportRequest,
+    BookLookupOut,
+    BookLookupRequest,
+    BookOut,
+    BookSort,
+    BookTombstoneOut,
+    BorrowRequest,
+    BulkAvailabilityOut,
+    BulkStatusRequest,
+    SetStatusRequest,
+    SnapshotFormat,
+)
+from app.schemas.job import JobAccepted
+from app.services.jobs import runner
+from app.services.books import BOOK_FIELDS, DEFAULT_SORT, BookService
+from app.services.changes import ChangeFeedService
+from app.services.snapshot import (
+    SNAPSHOT_EXTENSIONS,
+    SNAPSHOT_MEDIA_TYPES,
+    SnapshotService,
+    snapshot_available,
+)
+from app.page_cache import page_cache
+from app.singleflight import read_coalescer
+from app.stale import last_good
 from app.exceptions import (
     BookAlreadyBorrowed,
     BookNotBorrowed,
     BookNotFound,
+    DatabaseUnavailable,
     DuplicateSerialNumber,
     InvalidCardNumber,
+    InvalidChangeToken,
     InvalidSerialNumber,
+    JobQueueFull,
+    LoanLimitExceeded,
     UserNotFound,
 )
 from app.api_docs.responses import (
+    R400_INVALID_CHANGE_TOKEN,
     R400_INVALID_SERIAL,
-    R400_INVALID_CARD,
+    R400_INVALID_FIELDS,
+    R400_INVALID_CARD_OR_FIELDS,
+    R400_INVALID_SERIAL_OR_FIELDS,
     R400_INVALID_CARD_OR_SERIAL,
     R404_BOOK,
     R404_BOOK_OR_USER,
     R409_DUPLICATE_SERIAL,
     R409_ALREADY_BORROWED,
     R409_NOT_BORROWED,
+    R409_ALREADY_BORROWED_OR_LOAN_LIMIT,
+    R409_LOAN_LIMIT,
+    R501_SNAPSHOT_UNAVAILABLE,
+    R503_AVAILABILITY_LOADING,
+    R503_JOB_QUEUE_FULL,
 )
+from app.utils import parse_fields, validate_serial, validate_serials
 
 router = APIRouter(prefix="/books", tags=["books"])
 
+BOOK_LIST = TypeAdapter(List[BookOut])
+ROWS = TypeAdapter(List[Dict[str, Any]])
+ROWS_LOOKUP = TypeAdapter(Dict[str, Any])
+
 
 def dto_to_out(dto: BookDTO) -> BookOut:
     return BookOut(
@@ -42,17 +91,58 @@ def dto_to_out(dto: BookDTO) -> BookOut:
     )
 
 
+def fields_query():
+    return Query(
+        None,
+        description=(
+            "Comma-separated subset of the book fields to return (e.g. "
+            "`serial_number,is_borrowed`); only those columns are read. "
+            "Omit to return whole books."
+        ),
+        examples={"status": {"value": "serial_number,is_borrowed"}},  # type: ignore
+    )
+
+
+def requested_fields(raw: Optional[str]):
+    try:
+        return parse_fields(raw, BOOK_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+async def coalesced_json(key, produce) -> Response:
+    # Identical concurrent reads share one DB call and its serialized body; each
+    # flight uses its own session so it does not depend on any one request.
+    try:
+        body = await read_coalescer.do(
+            key, produce, window=settings.read_coalescing_window_ms / 1000
+        )
+    except DatabaseUnavailable:
+        stale = last_good.get(key)
+        if stale is None:
+            raise
+        return Response(
+            content=stale[0], media_type="application/json", headers=stale[1]
+        )
+    last_good.put(key, body)
+    return Response(content=body, media_type="application/json")
+
+
 @router.get(
     "",
     response_model=List[BookOut],
     summary="List books",
     description=(
         "Returns a paginated list of books. "
-        "Optionally filter by **is_borrowed** and/or **borrower_card**. "
-        "Results are ordered by `created_at` descending."
+        "Optionally filter by **is_borrowed**, **borrower_card** and/or **author** "
+        "(exact name, case-insensitive). "
+        "Results are ordered by **sort**: `created`, `title`, `author`, `serial` or "
+        "`borrowed_at`, prefixed with `-` for descending (default `-created`, "
+        "newest first). "
+        "Pass **fields** to get only some fields of each book."
     ),
     responses={
-        400: R400_INVALID_CARD,
+        400: R400_INVALID_CARD_OR_FIELDS,
     },
 )
 async def list_books(
@@ -66,27 +156,272 @@ async def list_books(
         description="Borrower card (6 digits) to filter by",
         examples={"by_user": {"value": "654321"}},  # type: ignore
     ),
+    author: Optional[str] = Query(
+        None,
+        max_length=255,
+        description="Author name to filter by (case-insensitive, whole name)",
+        examples={"by_author": {"value": "Robert C. Martin"}},  # type: ignore
+    ),
     offset: int = Query(
         0, ge=0, le=1_000_000, description="Number of items to skip (pagination)"
     ),
     limit: int = Query(
         100, ge=1, le=500, description="Max number of items to return (1–500)"
     ),
-    db: AsyncSession = Depends(get_db),
+    sort: BookSort = Query(
+        DEFAULT_SORT,
+        description="Sort key, `-` prefix for descending",
+        examples={"by_title": {"value": "title"}},  # type: ignore
+    ),
+    fields: Optional[str] = fields_query(),
 ):
-    svc = BookService(db)
+    selected = requested_fields(fields)
+    filters = dict(
+        is_borrowed=is_borrowed,
+        borrower_card=borrower_card,
+        author=author,
+        offset=offset,
+        limit=limit,
+        sort=sort,
+    )
+
+    async def produce() -> bytes:
+        async with transaction_session("read") as db:
+            svc = BookService(db)
+            if selected is not None:
+                return ROWS.dump_json(await svc.list_book_fields(selected, **filters))
+            items = await svc.list_books(**filters)
+        return BOOK_LIST.dump_json([dto_to_out(x) for x in items])
+
+    # Author names match case-insensitively, so all spellings share a page.
+    params = dict(filters, author=author and author.strip().lower(), fields=selected)
+
+    async def cached() -> bytes:
+        return await page_cache.get_or_compute("books", params, produce)
+
+    key = ("list", is_borrowed, borrower_card, author, offset, limit, sort, selected)
     try:
-        items = await svc.list_books(
-            is_borrowed=is_borrowed,
-            borrower_card=borrower_card,
-            offset=offset,
-            limit=limit,
-        )
-        return [dto_to_out(x) for x in items]
+        return await coalesced_json(key, cached)
     except InvalidCardNumber as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.get(
+    "/changes",
+    response_model=BookChangesOut,
+    summary="Changes since a token",
+    description=(
+        "Returns books created or modified and books deleted after the position "
+        "encoded in **since**, oldest first. Omit **since** to start from the "
+        "beginning, then keep passing `next_token`; an empty page means the mirror "
+        "is up to date."
+    ),
+    responses={
+        400: R400_INVALID_CHANGE_TOKEN,
+    },
+)
+async def list_changes(
+    since: Optional[str] = Query(None, description="`next_token` of the previous call"),
+    limit: int = Query(
+        500, ge=1, le=1000, description="Max number of books and of deletions"
+    ),
+    db: AsyncSession = Depends(get_read_db),
+):
+    svc = ChangeFeedService(db)
+    try:
+        changes = await svc.changes_since(since, limit=limit)
+    except InvalidChangeToken as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return BookChangesOut(
+        books=[dto_to_out(x) for x in changes.books],
+        deleted=[
+            BookTombstoneOut(
+                id=str(t.book_id),
+                serial_number=t.serial_number,
+                deleted_at=t.deleted_at,
+            )
+            for t in changes.deleted
+        ],
+        next_token=changes.next_token,
+        has_more=changes.has_more,
+    )
+
+
+@router.get(
+    "/snapshot",
+    summary="Columnar snapshot of the catalog",
+    description=(
+        "Streams every book, including its loan state, as an Arrow IPC stream "
+        "(`format=arrow`) or a Parquet file (`format=parquet`, one row group per "
+        "batch), in no particular order. Pass **fields** to export only some "
+        "columns."
+    ),
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {media_type: {} for media_type in SNAPSHOT_MEDIA_TYPES.values()}
+        },
+        400: R400_INVALID_FIELDS,
+        501: R501_SNAPSHOT_UNAVAILABLE,
+    },
+)
+async def export_snapshot(
+    format: SnapshotFormat = Query("arrow", description="`arrow` or `parquet`"),
+    fields: Optional[str] = fields_query(),
+):
+    selected = requested_fields(fields)
+    if not snapshot_available():
+        raise HTTPException(
+            status_code=501, detail="Snapshot export needs the pyarrow package"
+        )
+
+    async def body():
+        # The session lives as long as the response body is being sent.
+        async with transaction_session("export") as db:
+            async for chunk in SnapshotService(db).stream(format, selected):
+                yield chunk
+
+    return StreamingResponse(
+        body(),
+        media_type=SNAPSHOT_MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="books.{SNAPSHOT_EXTENSIONS[format]}"'
+            )
+        },
+    )
+
+
+@router.post(
+    "/lookup",
+    response_model=BookLookupOut,
+    summary="Look up many books by serial",
+    description=(
+        "Returns the books matching the given **serial_numbers** (up to 5000) and "
+        "the serials that do not exist. The whole batch is fetched in one query "
+        "per 1000 serials. Pass **fields** to get only some fields of each book."
+    ),
+    responses={
+        400: R400_INVALID_SERIAL_OR_FIELDS,
+    },
+)
+async def lookup_books(
+    payload: BookLookupRequest = Body(..., description="Serials to look up"),
+    fields: Optional[str] = fields_query(),
+):
+    selected = requested_fields(fields)
+
+    async def produce() -> bytes:
+        async with transaction_session("read") as db:
+            svc = BookService(db)
+            if selected is not None:
+                rows, missing = await svc.lookup_book_fields(
+                    payload.serial_numbers, selected
+                )
+                return ROWS_LOOKUP.dump_json({"found": rows, "missing": missing})
+            found, missing = await svc.lookup_by_serials(payload.serial_numbers)
+        out = BookLookupOut(found=[dto_to_out(x) for x in found], missing=missing)
+        return out.model_dump_json().encode()
+
+    key = ("lookup", tuple(payload.serial_numbers), selected)
+    try:
+        return await coalesced_json(key, produce)
+    except InvalidSerialNumber as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _require_availability_index() -> None:
+    if not availability.loaded:
+        raise HTTPException(
+            status_code=503, detail="Availability index is not loaded yet"
+        )
+
+
+@router.post(
+    "/availability",
+    response_model=BulkAvailabilityOut,
+    summary="Check availability of many books",
+    description=(
+        "Splits **serial_numbers** into available, borrowed and missing books. "
+        "Answered from the in-memory availability index without querying the "
+        "database; changes made by other workers show up within a few seconds."
+    ),
+    responses={
+        400: R400_INVALID_SERIAL,
+        503: R503_AVAILABILITY_LOADING,
+    },
+)
+async def bulk_availability(
+    payload: BookAvailabilityRequest = Body(..., description="Serials to check"),
+):
+    _require_availability_index()
+    try:
+        serials = validate_serials(payload.serial_numbers)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    out = BulkAvailabilityOut(available=[], borrowed=[], missing=[])
+    for serial, borrowed in availability.statuses(serials).items():
+        if borrowed is None:
+            out.missing.append(serial)
+        elif borrowed:
+            out.borrowed.append(serial)
+        else:
+            out.available.append(serial)
+    return out
+
+
+async def _submit_job(kind: str, items) -> JobAccepted:
+    try:
+        job = await runner.submit(kind, items)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return JobAccepted(
+        job_id=str(job.id), status=job.status, status_url=f"/jobs/{job.id}"
+    )
+
+
+@router.post(
+    "/bulk/import",
+    response_model=JobAccepted,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Import books in the background",
+    description=(
+        "Queues a background job adding all **books**. Poll `status_url` for "
+        "progress; books whose serial already exists are reported as item errors."
+    ),
+    responses={
+        503: R503_JOB_QUEUE_FULL,
+    },
+)
+async def import_books(
+    payload: BookImportRequest = Body(..., description="Books to add"),
+):
+    return await _submit_job(
+        "import_books", [book.model_dump() for book in payload.books]
+    )
+
+
+@router.post(
+    "/bulk/status",
+    response_model=JobAccepted,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Set borrow status of many books in the background",
+    description=(
+        "Queues a background job applying each item like "
+        "`PATCH /books/{serial_number}/status`. Poll `status_url` for progress."
+    ),
+    responses={
+        503: R503_JOB_QUEUE_FULL,
+    },
+)
+async def bulk_set_status(
+    payload: BulkStatusRequest = Body(..., description="Status changes to apply"),
+):
+    return await _submit_job(
+        "set_status", [item.model_dump() for item in payload.items]
+    )
+
+
 @router.post(
     "",
     response_model=BookOut,
@@ -103,20 +438,53 @@ async def create_book(
         ...,
         description="Book data to create",
     ),
-    db: AsyncSession = Depends(get_db),
 ):
-    svc = BookService(db)
     try:
-        dto = await svc.add_book(
-            serial_number=payload.serial_number,
-            title=payload.title,
-            author=payload.author,
-        )
-        return dto_to_out(dto)
+        async with transaction_session() as db:
+            dto = await BookService(db).add_book(
+                serial_number=payload.serial_number,
+                title=payload.title,
+                author=payload.author,
+            )
     except InvalidSerialNumber as e:
         raise HTTPException(status_code=400, detail=str(e))
     except DuplicateSerialNumber as e:
         raise HTTPException(status_code=409, detail=str(e))
+    return dto_to_out(dto)
+
+
+@router.get(
+    "/{serial_number}/available",
+    response_model=BookAvailabilityOut,
+    summary="Check availability",
+    description=(
+        "Tells whether the book can be borrowed right now, from the in-memory "
+        "availability index."
+    ),
+    responses={
+        400: R400_INVALID_SERIAL,
+        404: R404_BOOK,
+        503: R503_AVAILABILITY_LOADING,
+    },
+)
+async def book_availability(
+    serial_number: str = Path(
+        ...,
+        description="Book serial (6 digits)",
+        examples={"ex": {"value": "123456"}},  # type: ignore
+    ),
+):
+    _require_availability_index()
+    try:
+        serial = validate_serial(serial_number)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    borrowed = availability.status(serial)
+    if borrowed is None:
+        raise HTTPException(
+            status_code=404, detail=f"Book with serial {serial} not found"
+        )
+    return BookAvailabilityOut(serial_number=serial, available=not borrowed)
 
 
 @router.delete(
@@ -142,13 +510,12 @@ async def delete_book(
     allow_if_borrowed: bool = Query(
         False, description="Allow deletion even if the book is borrowed"
     ),
-    db: AsyncSession = Depends(get_db),
 ):
-    svc = BookService(db)
     try:
-        await svc.delete_book(
-            serial_number=serial_number, allow_if_borrowed=allow_if_borrowed
-        )
+        async with transaction_session() as db:
+            await BookService(db).delete_book(
+                serial_number=serial_number, allow_if_borrowed=allow_if_borrowed
+            )
         return
     except BookNotFound as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -162,11 +529,14 @@ async def delete_book(
     "/{serial_number}/borrow",
     response_model=BookOut,
     summary="Borrow a book",
-    description="Marks the book as borrowed by the user with **borrower_card**.",
+    description=(
+        "Marks the book as borrowed by the user with **borrower_card**. "
+        "Fails with 409 when the user already has the maximum number of loans."
+    ),
     responses={
         400: R400_INVALID_CARD_OR_SERIAL,
         404: R404_BOOK_OR_USER,
-        409: R409_ALREADY_BORROWED,
+        409: R409_ALREADY_BORROWED_OR_LOAN_LIMIT,
     },
 )
 async def borrow_book(
@@ -178,24 +548,25 @@ async def borrow_book(
     body: BorrowRequest = Body(
         ..., description="Borrower card of the user borrowing the book"
     ),
-    db: AsyncSession = Depends(get_db),
 ):
-    svc = BookService(db)
     try:
-        dto = await svc.borrow_book(
-            serial_number=serial_number, borrower_card=body.borrower_card
-        )
-        return dto_to_out(dto)
+        async with transaction_session() as db:
+            dto = await BookService(db).borrow_book(
+                serial_number=serial_number, borrower_card=body.borrower_card
+            )
     except BookNotFound as e:
         raise HTTPException(status_code=404, detail=str(e))
     except InvalidCardNumber as e:
         raise HTTPException(status_code=400, detail=str(e))
     except BookAlreadyBorrowed as e:
         raise HTTPException(status_code=409, detail=str(e))
+    except LoanLimitExceeded as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except UserNotFound as e:
         raise HTTPException(status_code=404, detail=str(e))
     except InvalidSerialNumber as e:
         raise HTTPException(status_code=400, detail=str(e))
+    return dto_to_out(dto)
 
 
 @router.post(
@@ -215,18 +586,17 @@ async def return_book(
         description="Book serial (6 digits)",
         examples={"ex": {"value": "123456"}},  # type: ignore
     ),
-    db: AsyncSession = Depends(get_db),
 ):
-    svc = BookService(db)
     try:
-        dto = await svc.return_book(serial_number=serial_number)
-        return dto_to_out(dto)
+        async with transaction_session() as db:
+            dto = await BookService(db).return_book(serial_number=serial_number)
     except BookNotFound as e:
         raise HTTPException(status_code=404, detail=str(e))
     except BookNotBorrowed as e:
         raise HTTPException(status_code=409, detail=str(e))
     except InvalidSerialNumber as e:
         raise HTTPException(status_code=400, detail=str(e))
+    return dto_to_out(dto)
 
 
 @router.patch(
@@ -240,6 +610,7 @@ async def return_book(
     responses={
         400: R400_INVALID_CARD_OR_SERIAL,
         404: R404_BOOK_OR_USER,
+        409: R409_LOAN_LIMIT,
     },
 )
 async def set_status(
@@ -252,26 +623,27 @@ async def set_status(
         ...,
         description="Desired borrow status. For `is_borrowed=true`, include `borrower_card`.",
     ),
-    db: AsyncSession = Depends(get_db),
 ):
     if body.is_borrowed and not body.borrower_card:
         raise HTTPException(
             status_code=400, detail="borrower_card is required when is_borrowed is true"
         )
-    svc = BookService(db)
     try:
-        dto = await svc.set_status(
-            serial_number=serial_number,
-            is_borrowed=body.is_borrowed,
-            borrower_card=body.borrower_card,
-            when=body.when,
-        )
-        return dto_to_out(dto)
+        async with transaction_session() as db:
+            dto = await BookService(db).set_status(
+                serial_number=serial_number,
+                is_borrowed=body.is_borrowed,
+                borrower_card=body.borrower_card,
+                when=body.when,
+            )
     except BookNotFound as e:
         raise HTTPException(status_code=404, detail=str(e))
     except InvalidCardNumber as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except LoanLimitExceeded as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except UserNotFound as e:
         raise HTTPException(status_code=404, detail=str(e))
     except InvalidSerialNumber as e:
         raise HTTPException(status_code=400, detail=str(e))
+    return dto_to_out(dto)
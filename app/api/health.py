@@ -0,0 +1,40 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app import lifecycle
+from app.schemas.health import HealthStatus
+
+router = APIRouter(prefix=lifecycle.HEALTH_PREFIX, tags=["health"])
+
+
+@router.get(
+    "/live",
+    response_model=HealthStatus,
+    summary="Liveness probe",
+    description="Returns 200 as long as the process is able to serve requests.",
+)
+async def live():
+    return HealthStatus(status="alive")
+
+
+@router.get(
+    "/ready",
+    response_model=HealthStatus,
+    summary="Readiness probe",
+    description=(
+        "Returns 200 once the connection pool has been warmed up and the database "
+        "answers. Returns 503 during startup, while draining on shutdown, or when "
+        "the database is unreachable."
+    ),
+    responses={503: {"model": HealthStatus, "description": "Not ready"}},
+)
+async def ready():
+    if lifecycle.state.draining:
+        reason = "draining"
+    elif not lifecycle.state.started:
+        reason = "starting"
+    elif not await lifecycle.check_database():
+        reason = "database unavailable"
+    else:
+        return HealthStatus(status="ready")
+    return JSONResponse(status_code=503, content={"status": reason})
@@ -0,0 +1,134 @@
+import uuid
+from typing import List
+
+from fastapi import APIRouter, Body, Depends, HTTPException, Path, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api_docs.responses import (
+    R400_INVALID_CARD_OR_SERIAL,
+    R400_INVALID_SERIAL,
+    R404_BOOK,
+    R404_BOOK_OR_USER,
+    R404_HOLD,
+    R409_HOLD_NOT_ALLOWED,
+)
+from app.dataclasses.hold_dto import HoldDTO
+from app.db import get_read_db, transaction_session
+from app.exceptions import (
+    BookNotBorrowed,
+    BookNotFound,
+    DuplicateHold,
+    HoldNotFound,
+    InvalidCardNumber,
+    InvalidSerialNumber,
+    UserNotFound,
+)
+from app.schemas.hold import HoldCreate, HoldOut
+from app.services.holds import HoldService
+
+router = APIRouter(prefix="/books", tags=["holds"])
+
+
+def hold_to_out(dto: HoldDTO, position: int) -> HoldOut:
+    return HoldOut(
+        id=str(dto.id),
+        serial_number=dto.serial_number,
+        card_number=dto.card_number,
+        position=position,
+        created_at=dto.created_at,
+    )
+
+
+@router.get(
+    "/{serial_number}/holds",
+    response_model=List[HoldOut],
+    summary="List holds",
+    description="Returns the hold queue of the book, head of the queue first.",
+    responses={
+        400: R400_INVALID_SERIAL,
+        404: R404_BOOK,
+    },
+)
+async def list_holds(
+    serial_number: str = Path(
+        ...,
+        description="Book serial (6 digits)",
+        examples={"ex": {"value": "123456"}},  # type: ignore
+    ),
+    db: AsyncSession = Depends(get_read_db),
+):
+    svc = HoldService(db)
+    try:
+        holds = await svc.list_holds(serial_number)
+        return [hold_to_out(h, i) for i, h in enumerate(holds, start=1)]
+    except BookNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except InvalidSerialNumber as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post(
+    "/{serial_number}/holds",
+    response_model=HoldOut,
+    status_code=status.HTTP_201_CREATED,
+    summary="Place a hold",
+    description=(
+        "Queues the user with **borrower_card** for a borrowed book. When the book "
+        "is returned it is lent to the head of the queue right away."
+    ),
+    responses={
+        400: R400_INVALID_CARD_OR_SERIAL,
+        404: R404_BOOK_OR_USER,
+        409: R409_HOLD_NOT_ALLOWED,
+    },
+)
+async def place_hold(
+    serial_number: str = Path(
+        ...,
+        description="Book serial (6 digits)",
+        examples={"ex": {"value": "123456"}},  # type: ignore
+    ),
+    body: HoldCreate = Body(..., description="Card of the user placing the hold"),
+):
+    try:
+        async with transaction_session() as db:
+            dto, position = await HoldService(db).place_hold(
+                serial_number, body.borrower_card
+            )
+    except BookNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except UserNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except (BookNotBorrowed, DuplicateHold) as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except (InvalidCardNumber, InvalidSerialNumber) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return hold_to_out(dto, position)
+
+
+@router.delete(
+    "/{serial_number}/holds/{hold_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Cancel a hold",
+    description="Removes the hold from the book's queue.",
+    responses={
+        400: R400_INVALID_SERIAL,
+        404: R404_HOLD,
+    },
+)
+async def cancel_hold(
+    serial_number: str = Path(
+        ...,
+        description="Book serial (6 digits)",
+        examples={"ex": {"value": "123456"}},  # type: ignore
+    ),
+    hold_id: uuid.UUID = Path(..., description="Hold id"),
+):
+    try:
+        async with transaction_session() as db:
+            await HoldService(db).cancel_hold(serial_number, hold_id)
+        return
+    except (BookNotFound, HoldNotFound) as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except InvalidSerialNumber as e:
+        raise HTTPException(status_code=400, detail=str(e))
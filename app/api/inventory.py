@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Request
+
+from app.db import transaction_session
+from app.schemas.inventory import InventoryAuditOut
+from app.services.inventory import InventoryService, read_scans
+
+router = APIRouter(prefix="/inventory", tags=["inventory"])
+
+
+@router.post(
+    "/audit",
+    response_model=InventoryAuditOut,
+    summary="Audit the shelves",
+    description=(
+        "Takes every serial scanned on the shelves as a plain-text body, separated "
+        "by newlines, spaces or commas (it may be streamed), and returns the "
+        "serials, sorted, of books that are neither on the shelves nor borrowed, "
+        "of scanned books marked as borrowed, and of scanned serials that are not "
+        "in the catalog."
+    ),
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"text/plain": {"example": "123456\n654321\n"}},
+        }
+    },
+)
+async def audit_inventory(request: Request):
+    # Read the whole upload before opening a transaction.
+    scans = await read_scans(request.stream())
+    async with transaction_session("job") as db:
+        audit = await InventoryService(db).audit(scans)
+    return InventoryAuditOut(
+        scans=audit.scans,
+        distinct_serials=audit.distinct_serials,
+        missing=audit.missing,
+        borrowed_on_shelf=audit.borrowed_on_shelf,
+        unknown=audit.unknown,
+        invalid=audit.invalid,
+        invalid_sample=audit.invalid_sample,
+    )
@@ -0,0 +1,48 @@
+import uuid
+
+from fastapi import APIRouter, Depends, HTTPException, Path
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api_docs.responses import R404_JOB
+from app.db import get_read_db
+from app.dataclasses.job_dto import JobDTO
+from app.exceptions import JobNotFound
+from app.schemas.job import JobOut
+from app.services.jobs import JobService
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+def job_to_out(dto: JobDTO) -> JobOut:
+    return JobOut(
+        id=str(dto.id),
+        kind=dto.kind,
+        status=dto.status,
+        total=dto.total,
+        processed=dto.processed,
+        succeeded=dto.succeeded,
+        failed=dto.failed,
+        errors=dto.errors,
+        created_at=dto.created_at,
+        started_at=dto.started_at,
+        finished_at=dto.finished_at,
+    )
+
+
+@router.get(
+    "/{job_id}",
+    response_model=JobOut,
+    summary="Get job status",
+    description="Reports the progress, item counts and the first item errors of a job.",
+    responses={
+        404: R404_JOB,
+    },
+)
+async def get_job(
+    job_id: uuid.UUID = Path(..., description="Job id returned on submission"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    try:
+        return job_to_out(await JobService(db).get(job_id))
+    except JobNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
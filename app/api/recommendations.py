@@ -0,0 +1,52 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Path
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api_docs.responses import R400_INVALID_SERIAL, R404_BOOK
+from app.db import get_read_db
+from app.exceptions import BookNotFound, InvalidSerialNumber
+from app.schemas.recommendation import RelatedBookOut
+from app.services.recommendations import RecommendationService
+
+router = APIRouter(prefix="/books", tags=["recommendations"])
+
+
+@router.get(
+    "/{serial_number}/related",
+    response_model=List[RelatedBookOut],
+    summary="Frequently borrowed together",
+    description=(
+        "Returns the books borrowed by the most cards that also borrowed this "
+        "one, best first. The list is precomputed from the loan history by "
+        "`python -m app.cli rebuild-recommendations` and is empty until then."
+    ),
+    responses={
+        400: R400_INVALID_SERIAL,
+        404: R404_BOOK,
+    },
+)
+async def related_books(
+    serial_number: str = Path(
+        ...,
+        description="Book serial (6 digits)",
+        examples={"ex": {"value": "123456"}},  # type: ignore
+    ),
+    db: AsyncSession = Depends(get_read_db),
+):
+    try:
+        related = await RecommendationService(db).related_books(serial_number)
+    except BookNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except InvalidSerialNumber as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return [
+        RelatedBookOut(
+            serial_number=r.serial_number,
+            title=r.title,
+            author=r.author,
+            is_borrowed=r.is_borrowed,
+            borrowed_together=r.borrowed_together,
+        )
+        for r in related
+    ]
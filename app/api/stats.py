@@ -0,0 +1,38 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import get_read_db
+from app.schemas.circulation import CirculationGranularity, CirculationPointOut
+from app.services.circulation import CirculationService
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+
+@router.get(
+    "/circulation",
+    response_model=List[CirculationPointOut],
+    summary="Borrows and returns over time",
+    description=(
+        "Returns the number of borrows and returns in each of the last **periods** "
+        "hours, days or ISO weeks (UTC), up to and including the current one, "
+        "oldest first. Read from pre-aggregated buckets of that granularity that "
+        "every worker updates every `CIRCULATION_FLUSH_INTERVAL_S` seconds, so the "
+        "latest loans may take that long to show up."
+    ),
+)
+async def circulation(
+    granularity: CirculationGranularity = Query(
+        "day", description="`hour`, `day` or `week`"
+    ),
+    periods: int = Query(
+        30, ge=1, le=1000, description="Number of periods to return (1–1000)"
+    ),
+    db: AsyncSession = Depends(get_read_db),
+):
+    series = await CirculationService(db).series(granularity, periods)
+    return [
+        CirculationPointOut(start=p.start, borrows=p.borrows, returns=p.returns)
+        for p in series
+    ]
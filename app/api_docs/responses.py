@@ -57,6 +57,72 @@ R400_INVALID_CARD_OR_SERIAL = {
     },
 }
 
+R400_INVALID_FIELDS = {
+    "description": "Unknown field",
+    "model": ErrorResponse,
+    "content": {
+        "application/json": {
+            "examples": {
+                "invalid_fields": {
+                    "summary": "Unknown field",
+                    "value": {
+                        "detail": "Unknown fields: isbn (allowed: id, serial_number, "
+                        "title, author, is_borrowed, borrowed_at, borrowed_by)"
+                    },
+                },
+            }
+        }
+    },
+}
+
+R400_INVALID_CARD_OR_FIELDS = {
+    "description": "Invalid card number format or unknown field",
+    "model": ErrorResponse,
+    "content": {
+        "application/json": {
+            "examples": {
+                "invalid_card": {
+                    "summary": "Card must be 6 digits",
+                    "value": {
+                        "detail": "Invalid card number: must be exactly 6 digits"
+                    },
+                },
+                "invalid_fields": {
+                    "summary": "Unknown field",
+                    "value": {
+                        "detail": "Unknown fields: isbn (allowed: id, serial_number, "
+                        "title, author, is_borrowed, borrowed_at, borrowed_by)"
+                    },
+                },
+            }
+        }
+    },
+}
+
+R400_INVALID_SERIAL_OR_FIELDS = {
+    "description": "Invalid serial number format or unknown field",
+    "model": ErrorResponse,
+    "content": {
+        "application/json": {
+            "examples": {
+                "invalid_serial": {
+                    "summary": "Serial must be 6 digits",
+                    "value": {
+                        "detail": "Invalid serial number: must be exactly 6 digits"
+                    },
+                },
+                "invalid_fields": {
+                    "summary": "Unknown field",
+                    "value": {
+                        "detail": "Unknown fields: isbn (allowed: id, serial_number, "
+                        "title, author, is_borrowed, borrowed_at, borrowed_by)"
+                    },
+                },
+            }
+        }
+    },
+}
+
 R404_BOOK = {
     "description": "Book not found",
     "model": ErrorResponse,
@@ -150,3 +216,163 @@ R409_NOT_BORROWED = {
         }
     },
 }
+
+R409_ALREADY_BORROWED_OR_LOAN_LIMIT = {
+    "description": "Book is already borrowed or the borrower reached the loan limit",
+    "model": ErrorResponse,
+    "content": {
+        "application/json": {
+            "examples": {
+                "already_borrowed": {
+                    "summary": "Already borrowed",
+                    "value": {"detail": "Book 123456 already borrowed by 654321"},
+                },
+                "loan_limit": {
+                    "summary": "Loan limit reached",
+                    "value": {
+                        "detail": "User with card number 654321 already has 5 "
+                        "books borrowed (limit 5)"
+                    },
+                },
+            }
+        }
+    },
+}
+
+R409_LOAN_LIMIT = {
+    "description": "Borrower reached the loan limit",
+    "model": ErrorResponse,
+    "content": {
+        "application/json": {
+            "examples": {
+                "loan_limit": {
+                    "summary": "Loan limit reached",
+                    "value": {
+                        "detail": "User with card number 654321 already has 5 "
+                        "books borrowed (limit 5)"
+                    },
+                }
+            }
+        }
+    },
+}
+
+R404_JOB = {
+    "description": "Job not found",
+    "model": ErrorResponse,
+    "content": {
+        "application/json": {
+            "examples": {
+                "job": {
+                    "summary": "Job not found",
+                    "value": {
+                        "detail": "Job 0f8c2a5e-6f0b-4a4e-9a53-3f1f2f0c9d11 not found"
+                    },
+                }
+            }
+        }
+    },
+}
+
+R503_JOB_QUEUE_FULL = {
+    "description": "Job queue is full",
+    "model": ErrorResponse,
+    "content": {
+        "application/json": {
+            "examples": {
+                "queue_full": {
+                    "summary": "Queue full",
+                    "value": {"detail": "Too many queued jobs, try again later"},
+                }
+            }
+        }
+    },
+}
+
+R404_HOLD = {
+    "description": "Book or hold not found",
+    "model": ErrorResponse,
+    "content": {
+        "application/json": {
+            "examples": {
+                "book": {
+                    "summary": "Book not found",
+                    "value": {"detail": "Book with serial 123456 not found"},
+                },
+                "hold": {
+                    "summary": "Hold not found",
+                    "value": {
+                        "detail": "Hold 0f8c2a5e-6f0b-4a4e-9a53-3f1f2f0c9d11 "
+                        "not found for book 123456"
+                    },
+                },
+            }
+        }
+    },
+}
+
+R409_HOLD_NOT_ALLOWED = {
+    "description": "Hold cannot be placed",
+    "model": ErrorResponse,
+    "content": {
+        "application/json": {
+            "examples": {
+                "available": {
+                    "summary": "Book is available",
+                    "value": {"detail": "Book 123456 is available, borrow it instead"},
+                },
+                "duplicate": {
+                    "summary": "Duplicate hold",
+                    "value": {
+                        "detail": "User 654321 already has a hold on book 123456"
+                    },
+                },
+            }
+        }
+    },
+}
+
+R400_INVALID_CHANGE_TOKEN = {
+    "description": "Invalid change token",
+    "model": ErrorResponse,
+    "content": {
+        "application/json": {
+            "examples": {
+                "invalid_token": {
+                    "summary": "Malformed token",
+                    "value": {"detail": "Invalid change token"},
+                }
+            }
+        }
+    },
+}
+
+R503_AVAILABILITY_LOADING = {
+    "description": "Availability index not loaded yet",
+    "model": ErrorResponse,
+    "content": {
+        "application/json": {
+            "examples": {
+                "loading": {
+                    "summary": "Index still loading",
+                    "value": {"detail": "Availability index is not loaded yet"},
+                }
+            }
+        }
+    },
+}
+
+R501_SNAPSHOT_UNAVAILABLE = {
+    "description": "Snapshot export is not installed",
+    "model": ErrorResponse,
+    "content": {
+        "application/json": {
+            "examples": {
+                "no_pyarrow": {
+                    "summary": "pyarrow missing",
+                    "value": {"detail": "Snapshot export needs the pyarrow package"},
+                }
+            }
+        }
+    },
+}
@@ -0,0 +1,183 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import db, events
+from app.bitset import DigitBitset
+from app.config import settings
+from app.dataclasses.change_dto import ChangeWatermark
+from app.models import Book
+from app.services.changes import ChangeFeedService
+from app.utils import utcnow
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_PARTITION = 10_000
+SYNC_PAGE_SIZE = 1000
+MAX_REPORTED_MISMATCHES = 20
+
+SERIALS_AND_STATUS = select(Book.serial_number, Book.is_borrowed)
+
+
+class Bitmaps:
+    def __init__(self) -> None:
+        self.exists = DigitBitset()
+        self.borrowed = DigitBitset()
+
+    def apply(self, serial: str, exists: bool, is_borrowed: bool) -> None:
+        self.exists.put(serial, exists)
+        self.borrowed.put(serial, exists and is_borrowed)
+
+    def difference(self, other: "Bitmaps") -> Tuple[int, List[str]]:
+        exists = self.exists.difference(other.exists, MAX_REPORTED_MISMATCHES)
+        borrowed = self.borrowed.difference(other.borrowed, MAX_REPORTED_MISMATCHES)
+        sample = sorted(set(exists[1]) | set(borrowed[1]))
+        return exists[0] + borrowed[0], sample[:MAX_REPORTED_MISMATCHES]
+
+
+@dataclass(frozen=True)
+class AvailabilityCheck:
+    books: int
+    mismatches: int
+    sample: List[str]
+    repaired: bool
+
+
+class AvailabilityIndex:
+    """Whether each of the 1,000,000 possible serials exists and is borrowed,
+    as two 125 KB bitsets.
+
+    Loaded from `books` at startup, then kept current by the `book.changed`
+    events of this process' committed writes and by polling the change feed
+    for writes made by other workers. Writes that commit while a snapshot is
+    being read are replayed on top of it."""
+
+    def __init__(self) -> None:
+        self._bitmaps = Bitmaps()
+        self._pending: Optional[list] = None
+        # One snapshot at a time: writes committed meanwhile go to `_pending`.
+        self._snapshot_lock = asyncio.Lock()
+        self._watermark = ChangeWatermark()
+        self._sync_task: Optional[asyncio.Task] = None
+        self.loaded = False
+
+    def set(self, serial_number: str, exists: bool, is_borrowed: bool) -> None:
+        if self._pending is not None:
+            self._pending.append((serial_number, exists, is_borrowed))
+        self._bitmaps.apply(serial_number, exists, is_borrowed)
+
+    def on_book_changed(
+        self, serial_number: str, exists: bool, is_borrowed: bool, **_
+    ) -> None:
+        self.set(serial_number, exists, is_borrowed)
+
+    def status(self, serial_number: str) -> Optional[bool]:
+        """None if no such book, otherwise whether it is borrowed."""
+        if serial_number not in self._bitmaps.exists:
+            return None
+        return serial_number in self._bitmaps.borrowed
+
+    def statuses(self, serial_numbers: Sequence[str]) -> Dict[str, Optional[bool]]:
+        return {s: self.status(s) for s in serial_numbers}
+
+    async def _snapshot(self, session: AsyncSession) -> Tuple[Bitmaps, int]:
+        async with self._snapshot_lock:
+            bitmaps = Bitmaps()
+            count = 0
+            self._pending = []
+            try:
+                result = await session.stream(SERIALS_AND_STATUS)
+                async for rows in result.partitions(SNAPSHOT_PARTITION):
+                    for serial, is_borrowed in rows:
+                        bitmaps.apply(serial, True, is_borrowed)
+                    count += len(rows)
+                for change in self._pending:
+                    bitmaps.apply(*change)
+            finally:
+                self._pending = None
+            return bitmaps, count
+
+    async def load(self, session: AsyncSession) -> int:
+        started_at = utcnow() - timedelta(seconds=settings.change_feed_lag_seconds)
+        self._bitmaps, count = await self._snapshot(session)
+        position = (started_at, UUID(int=0))
+        self._watermark = ChangeWatermark(books=position, deleted=position)
+        self.loaded = True
+        return count
+
+    async def check(
+        self, session: AsyncSession, repair: bool = False
+    ) -> AvailabilityCheck:
+        fresh, count = await self._snapshot(session)
+        mismatches, sample = self._bitmaps.difference(fresh)
+        if mismatches and repair:
+            self._bitmaps = fresh
+        return AvailabilityCheck(
+            books=count,
+            mismatches=mismatches,
+            sample=sample,
+            repaired=bool(mismatches and repair),
+        )
+
+    async def sync(self, session: AsyncSession) -> int:
+        """Applies the change feed since the last sync; returns rows applied.
+
+        Books and tombstones are paged separately, so they are merged by
+        (timestamp, id) and applied only up to the end of the first full page:
+        a tombstone is never applied after a later copy of its serial, even when
+        it arrives in a later page. On equal timestamps the book wins."""
+        feed = ChangeFeedService(session)
+        applied = 0
+        while True:
+            books, deleted = await feed.rows_since(self._watermark, SYNC_PAGE_SIZE)
+            changes = [
+                ((t.deleted_at, 0, t.id), t.serial_number, False, False)
+                for t in deleted
+            ] + [
+                ((b.updated_at, 1, b.id), b.serial_number, True, b.is_borrowed)
+                for b in books
+            ]
+            ends = []
+            if len(deleted) == SYNC_PAGE_SIZE:
+                ends.append((deleted[-1].deleted_at, 0, deleted[-1].id))
+            if len(books) == SYNC_PAGE_SIZE:
+                ends.append((books[-1].updated_at, 1, books[-1].id))
+            last = {0: self._watermark.deleted, 1: self._watermark.books}
+            for key, serial, exists, is_borrowed in sorted(changes):
+                if ends and key > min(ends):
+                    break
+                self.set(serial, exists, is_borrowed)
+                last[key[1]] = (key[0], key[2])
+                applied += 1
+            self._watermark = ChangeWatermark(books=last[1], deleted=last[0])
+            if not ends:
+                return applied
+
+    async def _sync_forever(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with db.transaction_session("read") as session:
+                    await self.sync(session)
+            except Exception:
+                logger.exception("Availability index sync failed")
+
+    def start_sync(self, interval: float) -> None:
+        if interval > 0:
+            self._sync_task = asyncio.create_task(self._sync_forever(interval))
+
+    async def stop_sync(self) -> None:
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            await asyncio.gather(self._sync_task, return_exceptions=True)
+            self._sync_task = None
+
+
+availability = AvailabilityIndex()
+events.subscribe("book.changed", availability.on_book_changed)
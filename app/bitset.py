@@ -0,0 +1,78 @@
+from typing import Iterator, List, Tuple
+
+DIGIT_KEYS = 1_000_000
+
+
+class DigitBitset:
+    """A set of 6-digit keys ("000000".."999999") stored as one bit per key,
+    125 KB in total."""
+
+    def __init__(self) -> None:
+        self._bits = bytearray(DIGIT_KEYS // 8)
+
+    def add(self, key: str) -> None:
+        i = int(key)
+        self._bits[i >> 3] |= 1 << (i & 7)
+
+    def discard(self, key: str) -> None:
+        i = int(key)
+        self._bits[i >> 3] &= ~(1 << (i & 7))
+
+    def put(self, key: str, present: bool) -> None:
+        if present:
+            self.add(key)
+        else:
+            self.discard(key)
+
+    def __contains__(self, key: str) -> bool:
+        i = int(key)
+        return bool(self._bits[i >> 3] & (1 << (i & 7)))
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, DigitBitset) and self._bits == other._bits
+
+    def __len__(self) -> int:
+        return self._as_int().bit_count()
+
+    def __iter__(self) -> Iterator[str]:
+        """Keys in ascending order."""
+        for byte, bits in enumerate(self._bits):
+            while bits:
+                low = bits & -bits
+                yield f"{byte * 8 + low.bit_length() - 1:06d}"
+                bits ^= low
+
+    # Set operations work on the whole bitset as one integer.
+    def _as_int(self) -> int:
+        return int.from_bytes(self._bits, "little")
+
+    @classmethod
+    def _from_int(cls, value: int) -> "DigitBitset":
+        bitset = cls()
+        bitset._bits[:] = value.to_bytes(DIGIT_KEYS // 8, "little")
+        return bitset
+
+    def __and__(self, other: "DigitBitset") -> "DigitBitset":
+        return self._from_int(self._as_int() & other._as_int())
+
+    def __or__(self, other: "DigitBitset") -> "DigitBitset":
+        return self._from_int(self._as_int() | other._as_int())
+
+    def __sub__(self, other: "DigitBitset") -> "DigitBitset":
+        return self._from_int(self._as_int() & ~other._as_int())
+
+    def difference(self, other: "DigitBitset", sample: int) -> Tuple[int, List[str]]:
+        """Number of keys in exactly one of the two sets, and up to `sample` of
+        them in ascending order."""
+        count, keys = 0, []
+        if self._bits == other._bits:
+            return count, keys
+        for byte, (a, b) in enumerate(zip(self._bits, other._bits)):
+            if a == b:
+                continue
+            bits = a ^ b
+            count += bin(bits).count("1")
+            for bit in range(8):
+                if bits & (1 << bit) and len(keys) < sample:
+                    keys.append(f"{byte * 8 + bit:06d}")
+        return count, keys
@@ -0,0 +1,80 @@
+import asyncio
+import logging
+from typing import Optional
+
+from sqlalchemy import bindparam, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import db
+from app.bitset import DigitBitset
+from app.models import User
+
+logger = logging.getLogger(__name__)
+
+CARD_NUMBERS = select(User.card_number)
+CARD_EXISTS = select(User.id).where(User.card_number == bindparam("card"))
+
+
+class CardCache:
+    """The set of registered card numbers, one bit per possible card.
+
+    A card found in the cache is trusted without querying `users`; the
+    `books.borrowed_by` / `holds.card_number` foreign keys and the loan
+    counter update still reject a user deleted since. A card missing from the
+    cache is looked up and added when found, so new users work immediately.
+    The whole set is reloaded every `card_cache_refresh_interval_s` to drop
+    removed users."""
+
+    def __init__(self) -> None:
+        self._cards = DigitBitset()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def add(self, card: str) -> None:
+        self._cards.add(card)
+
+    def discard(self, card: str) -> None:
+        self._cards.discard(card)
+
+    def __contains__(self, card: str) -> bool:
+        return card in self._cards
+
+    async def load(self, session: AsyncSession) -> int:
+        cards, count = DigitBitset(), 0
+        result = await session.stream(CARD_NUMBERS)
+        async for rows in result.partitions(10_000):
+            for (card,) in rows:
+                cards.add(card)
+            count += len(rows)
+        self._cards = cards
+        return count
+
+    async def is_registered(self, session: AsyncSession, card: str) -> bool:
+        if card in self._cards:
+            return True
+        result = await session.execute(CARD_EXISTS, {"card": card})
+        if result.scalar_one_or_none() is None:
+            return False
+        self._cards.add(card)
+        return True
+
+    async def _refresh_forever(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with db.transaction_session("read") as session:
+                    await self.load(session)
+            except Exception:
+                logger.exception("Card cache refresh failed")
+
+    def start_refresh(self, interval: float) -> None:
+        if interval > 0:
+            self._refresh_task = asyncio.create_task(self._refresh_forever(interval))
+
+    async def stop_refresh(self) -> None:
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            await asyncio.gather(self._refresh_task, return_exceptions=True)
+            self._refresh_task = None
+
+
+card_cache = CardCache()
@@ -0,0 +1,132 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app import db, events
+from app.models import CirculationBucket
+
+logger = logging.getLogger(__name__)
+
+
+def hour_start(at: datetime) -> datetime:
+    if at.tzinfo is None:
+        at = at.replace(tzinfo=timezone.utc)
+    return at.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+GRANULARITIES = ("hour", "day", "week")
+
+
+def period_start(at: datetime, granularity: str) -> datetime:
+    """Start of the UTC hour, day or ISO week (from Monday) containing `at`."""
+    start = hour_start(at)
+    if granularity == "hour":
+        return start
+    start = start.replace(hour=0)
+    if granularity == "day":
+        return start
+    return start - timedelta(days=start.weekday())
+
+
+@lru_cache(maxsize=None)
+def add_counts_statement(postgres: bool):
+    insert = postgresql.insert if postgres else sqlite.insert
+    stmt = insert(CirculationBucket)
+    return stmt.on_conflict_do_update(
+        index_elements=[CirculationBucket.granularity, CirculationBucket.bucket_start],
+        set_={
+            "borrows": CirculationBucket.borrows + stmt.excluded.borrows,
+            "returns": CirculationBucket.returns + stmt.excluded.returns,
+        },
+    )
+
+
+class CirculationCounters:
+    """Borrows and returns per hour, counted in memory from the committed
+    `book.borrowed` / `book.returned` events of this process.
+
+    Every `circulation_flush_interval_s` the counts are added to the hour, day
+    and week rows of `circulation_buckets` with one upsert, so each worker
+    contributes its own counts and the table holds the totals. Counts that fail
+    to flush are kept for the next attempt."""
+
+    def __init__(self) -> None:
+        self._counts: Dict[datetime, List[int]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def _add(self, at: datetime, borrows: int, returns: int) -> None:
+        counts = self._counts.setdefault(hour_start(at), [0, 0])
+        counts[0] += borrows
+        counts[1] += returns
+
+    def on_borrowed(self, at: datetime, **_) -> None:
+        self._add(at, 1, 0)
+
+    def on_returned(self, at: datetime, **_) -> None:
+        self._add(at, 0, 1)
+
+    def take(self) -> Dict[datetime, List[int]]:
+        """Removes and returns the counts not flushed yet."""
+        counts, self._counts = self._counts, {}
+        return counts
+
+    async def flush(self) -> int:
+        counts = self.take()
+        if not counts:
+            return 0
+        rollups: Dict[Tuple[str, datetime], List[int]] = {}
+        for start, (borrows, returns) in counts.items():
+            for granularity in GRANULARITIES:
+                key = (granularity, period_start(start, granularity))
+                totals = rollups.setdefault(key, [0, 0])
+                totals[0] += borrows
+                totals[1] += returns
+        rows = [
+            {
+                "granularity": granularity,
+                "bucket_start": start,
+                "borrows": borrows,
+                "returns": returns,
+            }
+            for (granularity, start), (borrows, returns) in rollups.items()
+        ]
+        try:
+            async with db.transaction_session("job") as session:
+                postgres = session.get_bind().dialect.name == "postgresql"
+                await session.execute(add_counts_statement(postgres), rows)
+        except BaseException:
+            for start, (borrows, returns) in counts.items():
+                self._add(start, borrows, returns)
+            raise
+        return len(rows)
+
+    async def _flush_forever(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Flushing circulation counts failed")
+
+    def start_flush(self, interval: float) -> None:
+        if interval > 0:
+            self._flush_task = asyncio.create_task(self._flush_forever(interval))
+
+    async def stop_flush(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+            self._flush_task = None
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception("Flushing circulation counts at shutdown failed")
+
+
+circulation = CirculationCounters()
+events.subscribe("book.borrowed", circulation.on_borrowed)
+events.subscribe("book.returned", circulation.on_returned)
@@ -0,0 +1,52 @@
+"""Maintenance commands, run as `python -m app.cli <command>`."""
+
+import argparse
+import asyncio
+
+from app import db
+from app.services.recommendations import RecommendationService
+from app.services.users import UserService
+
+
+async def repair_loan_counts() -> None:
+    async with db.transaction_session(budget=None) as session:
+        fixed = await UserService(session).recompute_loan_counts()
+    print(f"Recomputed loan counts, {fixed} user(s) corrected")
+
+
+async def rebuild_recommendations() -> None:
+    async with db.transaction_session(budget=None) as session:
+        stored = await RecommendationService(session).rebuild()
+    print(f"Rebuilt recommendations, {stored} related book(s) stored")
+
+
+COMMANDS = {
+    "repair-loan-counts": (
+        repair_loan_counts,
+        "Recompute users.loan_count from the books table",
+    ),
+    "rebuild-recommendations": (
+        rebuild_recommendations,
+        "Recompute the books frequently borrowed together from the loan history",
+    ),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name, (_, help_text) in COMMANDS.items():
+        subparsers.add_parser(name, help=help_text)
+    args = parser.parse_args()
+
+    async def _run() -> None:
+        try:
+            await COMMANDS[args.command][0]()
+        finally:
+            await db.engine.dispose()
+
+    asyncio.run(_run())
+
+
+if __name__ == "__main__":
+    main()
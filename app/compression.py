@@ -0,0 +1,171 @@
+import zlib
+from typing import List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstd is optional
+    zstandard = None
+
+from app.config import settings
+
+COMPRESSIBLE_TYPES = (
+    b"application/json",
+    b"application/x-ndjson",
+    b"application/vnd.apache.arrow.stream",
+    b"text/",
+)
+
+
+class GzipStream:
+    encoding = "gzip"
+
+    def __init__(self, level: int) -> None:
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        out = self._obj.compress(data)
+        return out + self._obj.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class ZstdStream:
+    encoding = "zstd"
+
+    def __init__(self, level: int) -> None:
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        out = self._obj.compress(data)
+        if final:
+            return out + self._obj.flush()
+        return out + self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+
+def supported_encodings() -> List[str]:
+    return ["zstd", "gzip"] if zstandard is not None else ["gzip"]
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """Picks the best encoding we support from an Accept-Encoding header,
+    honouring q-values and preferring zstd over gzip on ties."""
+    weights = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            weights[name] = q
+    best, best_q = None, 0.0
+    for encoding in supported_encodings():
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def make_compressor(encoding: str):
+    if encoding == "zstd":
+        return ZstdStream(settings.compression_zstd_level)
+    return GzipStream(settings.compression_gzip_level)
+
+
+class CompressionMiddleware:
+    """Compresses JSON/text responses of at least `compression_min_size` bytes
+    with the encoding negotiated from Accept-Encoding. Streamed responses are
+    compressed chunk by chunk, flushing after each one."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not settings.compression_enabled:
+            await self.app(scope, receive, send)
+            return
+        accept = ""
+        for key, value in scope["headers"]:
+            if key == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = negotiate(accept) if accept else None
+        await self.app(scope, receive, _CompressingSend(send, encoding))
+
+
+class _CompressingSend:
+    def __init__(self, send, encoding: Optional[str]) -> None:
+        self.send = send
+        self.encoding = encoding
+        self.start = None
+        self.passthrough = False
+        self.buffer: List[bytes] = []
+        self.buffered = 0
+        self.compressor = None
+
+    async def __call__(self, message) -> None:
+        if message["type"] == "http.response.start":
+            headers = message.get("headers", [])
+            if message["status"] in (204, 304) or not _is_compressible(headers):
+                self.passthrough = True
+                await self.send(message)
+                return
+            self.start = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is not None:
+            await self.send(
+                {
+                    "type": "http.response.body",
+                    "body": self.compressor.compress(body, final=not more_body),
+                    "more_body": more_body,
+                }
+            )
+            return
+
+        self.buffer.append(body)
+        self.buffered += len(body)
+        if more_body and self.buffered < settings.compression_min_size:
+            return
+
+        data = b"".join(self.buffer)
+        self.buffer = []
+        headers = [(k, v) for k, v in self.start["headers"] if k != b"vary"]
+        headers.append((b"vary", b"Accept-Encoding"))
+
+        if self.encoding is None or self.buffered < settings.compression_min_size:
+            self.passthrough = True
+            await self.send({**self.start, "headers": headers})
+            await self.send(
+                {"type": "http.response.body", "body": data, "more_body": more_body}
+            )
+            return
+
+        self.compressor = make_compressor(self.encoding)
+        compressed = self.compressor.compress(data, final=not more_body)
+        headers = [(k, v) for k, v in headers if k != b"content-length"]
+        headers.append((b"content-encoding", self.encoding.encode("latin-1")))
+        if not more_body:
+            headers.append((b"content-length", str(len(compressed)).encode("latin-1")))
+        await self.send({**self.start, "headers": headers})
+        await self.send(
+            {"type": "http.response.body", "body": compressed, "more_body": more_body}
+        )
+
+
+def _is_compressible(headers: List[Tuple[bytes, bytes]]) -> bool:
+    content_type = b""
+    for key, value in headers:
+        if key == b"content-encoding":
+            return False
+        if key == b"content-type":
+            content_type = value
+    return content_type.startswith(COMPRESSIBLE_TYPES)
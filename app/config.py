@@ -9,6 +9,56 @@ class Settings(BaseSettings):
     postgres_port: int = 5432
     uvicorn_host: str = "localhost"
     uvicorn_port: int = 8000
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    db_warmup_connections: int = 5
+    db_prepared_statement_cache_size: int = 500
+    db_read_statement_timeout_ms: int = 5000
+    db_write_statement_timeout_ms: int = 2000
+    db_job_statement_timeout_ms: int = 30000
+    db_lock_timeout_ms: int = 1000
+    db_idle_in_transaction_timeout_ms: int = 10000
+    db_pool_timeout_s: float = 5.0
+    db_connect_timeout_s: float = 5.0
+    db_breaker_failure_threshold: int = 5
+    db_breaker_reset_timeout_s: float = 5.0
+    stale_reads_max_bytes: int = 64 * 1024 * 1024
+    availability_index_enabled: bool = True
+    availability_sync_interval_s: float = 1.0
+    card_cache_refresh_interval_s: float = 300.0
+    circulation_flush_interval_s: float = 10.0
+    cancel_on_disconnect: bool = True
+    shutdown_drain_timeout: float = 10.0
+    max_loans_per_card: int = 5
+    change_feed_lag_seconds: float = 2.0
+    read_coalescing_window_ms: float = 100.0
+    page_cache_backend: str = "none"
+    page_cache_redis_url: str = "redis://localhost:6379/0"
+    page_cache_key_prefix: str = "library"
+    page_cache_ttl_s: float = 30.0
+    page_cache_stale_ttl_s: float = 300.0
+    page_cache_lock_ttl_s: float = 5.0
+    page_cache_timeout_s: float = 0.5
+    job_workers: int = 2
+    job_queue_size: int = 100
+    job_chunk_size: int = 200
+    snapshot_batch_rows: int = 50_000
+    recommendations_top_k: int = 10
+    recommendations_min_together: int = 2
+    recommendations_max_books_per_card: int = 500
+    compression_enabled: bool = True
+    compression_min_size: int = 1024
+    compression_gzip_level: int = 6
+    compression_zstd_level: int = 3
+    slow_query_threshold_ms: float = 200.0
+    slow_query_log_size: int = 100
+    slow_query_explain: bool = True
+    slow_query_explain_interval_s: float = 60.0
+    profiling_enabled: bool = False
+    profiling_header: str = "X-Profile"
+    profiling_sample_rate: float = 0.0
+    profiling_interval_ms: float = 5.0
+    profiling_dir: str = "profiles"
 
     @property
     def database_url_asyncpg(self) -> str:
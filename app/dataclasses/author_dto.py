@@ -0,0 +1,7 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class AuthorDTO:
+    name: str
+    book_count: int
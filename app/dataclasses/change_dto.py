@@ -0,0 +1,66 @@
+import base64
+import json
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from app.dataclasses.book_dto import BookDTO
+from app.models import BookTombstone
+
+Position = Tuple[datetime, uuid.UUID]
+
+
+@dataclass(frozen=True)
+class TombstoneDTO:
+    book_id: uuid.UUID
+    serial_number: str
+    deleted_at: datetime
+
+    @classmethod
+    def from_model(cls, t: BookTombstone) -> "TombstoneDTO":
+        return cls(
+            book_id=t.book_id, serial_number=t.serial_number, deleted_at=t.deleted_at
+        )
+
+
+@dataclass(frozen=True)
+class ChangeWatermark:
+    books: Optional[Position] = None
+    deleted: Optional[Position] = None
+
+    def encode(self) -> str:
+        raw = json.dumps(
+            {
+                "b": _dump_position(self.books),
+                "d": _dump_position(self.deleted),
+            },
+            separators=(",", ":"),
+        )
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> "ChangeWatermark":
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        data = json.loads(raw)
+        return cls(books=_load_position(data["b"]), deleted=_load_position(data["d"]))
+
+
+@dataclass(frozen=True)
+class ChangesDTO:
+    books: List[BookDTO]
+    deleted: List[TombstoneDTO]
+    next_token: str
+    has_more: bool
+
+
+def _dump_position(position: Optional[Position]):
+    if position is None:
+        return None
+    return [position[0].isoformat(), str(position[1])]
+
+
+def _load_position(value) -> Optional[Position]:
+    if value is None:
+        return None
+    return datetime.fromisoformat(value[0]), uuid.UUID(value[1])
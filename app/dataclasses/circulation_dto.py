@@ -0,0 +1,9 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+
+@dataclass(frozen=True)
+class CirculationPointDTO:
+    start: datetime
+    borrows: int
+    returns: int
@@ -0,0 +1,22 @@
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+
+from app.models import Hold
+
+
+@dataclass(frozen=True)
+class HoldDTO:
+    id: uuid.UUID
+    serial_number: str
+    card_number: str
+    created_at: datetime
+
+    @classmethod
+    def from_model(cls, h: Hold, serial_number: str) -> "HoldDTO":
+        return cls(
+            id=h.id,
+            serial_number=serial_number,
+            card_number=h.card_number,
+            created_at=h.created_at,
+        )
@@ -0,0 +1,23 @@
+from dataclasses import dataclass, field
+from typing import List
+
+from app.bitset import DigitBitset
+
+
+@dataclass
+class Scans:
+    serials: DigitBitset = field(default_factory=DigitBitset)
+    total: int = 0
+    invalid: int = 0
+    invalid_sample: List[str] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class InventoryAuditDTO:
+    scans: int
+    distinct_serials: int
+    missing: List[str]
+    borrowed_on_shelf: List[str]
+    unknown: List[str]
+    invalid: int
+    invalid_sample: List[str]
@@ -0,0 +1,37 @@
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
+
+from app.models import Job
+
+
+@dataclass(frozen=True)
+class JobDTO:
+    id: uuid.UUID
+    kind: str
+    status: str
+    total: int
+    processed: int
+    succeeded: int
+    failed: int
+    errors: List[dict]
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+
+    @classmethod
+    def from_model(cls, j: Job) -> "JobDTO":
+        return cls(
+            id=j.id,
+            kind=j.kind,
+            status=j.status,
+            total=j.total,
+            processed=j.processed,
+            succeeded=j.succeeded,
+            failed=j.failed,
+            errors=list(j.errors or []),
+            created_at=j.created_at,
+            started_at=j.started_at,
+            finished_at=j.finished_at,
+        )
@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class RelatedBookDTO:
+    serial_number: str
+    title: str
+    author: str
+    is_borrowed: bool
+    borrowed_together: int
@@ -1,12 +1,34 @@
+import asyncio
+import logging
+import time
 from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
 
+from sqlalchemy import exc as sa_exc, text
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import DeclarativeBase
 
+from app import events, slow_queries
 from app.config import settings
+from app.exceptions import DatabaseUnavailable
 
+logger = logging.getLogger(__name__)
 
-engine = create_async_engine(settings.database_url_asyncpg, echo=False, future=True)
+engine = create_async_engine(
+    settings.database_url_asyncpg,
+    echo=False,
+    future=True,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout_s,
+    connect_args={
+        "prepared_statement_cache_size": settings.db_prepared_statement_cache_size,
+        "timeout": settings.db_connect_timeout_s,
+    },
+)
+
+slow_queries.install(engine)
 
 SessionLocal = async_sessionmaker(
     bind=engine,
@@ -19,13 +41,210 @@ class Base(DeclarativeBase):
     pass
 
 
+class InFlightTransactions:
+    def __init__(self) -> None:
+        self.count = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    def enter(self) -> None:
+        self.count += 1
+        self._idle.clear()
+
+    def exit(self) -> None:
+        self.count -= 1
+        if self.count == 0:
+            self._idle.set()
+
+    async def wait_idle(self, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+
+inflight = InFlightTransactions()
+
+
+@dataclass(frozen=True)
+class TimeoutBudget:
+    statement_timeout_ms: int
+    lock_timeout_ms: int
+    idle_in_transaction_timeout_ms: int
+
+
+def timeout_budget(kind: str) -> TimeoutBudget:
+    statement_timeout = {
+        "read": settings.db_read_statement_timeout_ms,
+        "write": settings.db_write_statement_timeout_ms,
+        "job": settings.db_job_statement_timeout_ms,
+        "export": settings.db_job_statement_timeout_ms,
+    }[kind]
+    # An export keeps its transaction open while a slow client reads the
+    # response, so only the statements themselves are bounded.
+    idle_timeout = 0 if kind == "export" else settings.db_idle_in_transaction_timeout_ms
+    return TimeoutBudget(
+        statement_timeout_ms=statement_timeout,
+        lock_timeout_ms=settings.db_lock_timeout_ms,
+        idle_in_transaction_timeout_ms=idle_timeout,
+    )
+
+
+SET_TIMEOUTS = text(
+    "SELECT set_config('statement_timeout', :statement_timeout, true), "
+    "set_config('lock_timeout', :lock_timeout, true), "
+    "set_config('idle_in_transaction_session_timeout', :idle_timeout, true)"
+)
+
+
+async def apply_timeout_budget(session: AsyncSession, budget: TimeoutBudget) -> None:
+    # Transaction-local (SET LOCAL), so pooled connections never keep them.
+    if session.bind.dialect.name != "postgresql":
+        return
+    await session.execute(
+        SET_TIMEOUTS,
+        {
+            "statement_timeout": str(budget.statement_timeout_ms),
+            "lock_timeout": str(budget.lock_timeout_ms),
+            "idle_timeout": str(budget.idle_in_transaction_timeout_ms),
+        },
+    )
+
+
+# connection_exception (08xxx) and the admin_shutdown, crash_shutdown and
+# cannot_connect_now errors (57P01-57P03), as seen while PostgreSQL restarts or
+# fails over.
+OUTAGE_SQLSTATE_PREFIXES = ("08", "57P01", "57P02", "57P03")
+
+
+def is_outage(error: BaseException) -> bool:
+    """Whether `error` means the database cannot be reached, as opposed to a
+    failed statement or a pool that is busy."""
+    if isinstance(error, OSError):
+        return True
+    if isinstance(error, sa_exc.DBAPIError):
+        if isinstance(error, sa_exc.InterfaceError) or error.connection_invalidated:
+            return True
+        if isinstance(error.orig, OSError):
+            return True
+        sqlstate = getattr(error.orig, "sqlstate", None) or ""
+        return sqlstate.startswith(OUTAGE_SQLSTATE_PREFIXES)
+    return False
+
+
+class CircuitBreaker:
+    """Stops sending transactions to a database that cannot be reached.
+
+    After `db_breaker_failure_threshold` consecutive outage errors the breaker
+    opens and transactions fail at once with DatabaseUnavailable, instead of
+    each waiting for the pool and connect timeouts. `db_breaker_reset_timeout_s`
+    later it is half-open: the next transaction first probes the database with
+    `SELECT 1` while the others keep failing fast, and the breaker closes if
+    the probe succeeds or opens again otherwise."""
+
+    def __init__(self) -> None:
+        self.state = "closed"
+        self.failures = 0
+        self.opened = 0
+        self.rejected = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    def retry_after(self) -> float:
+        elapsed = time.monotonic() - self._opened_at
+        return max(0.0, settings.db_breaker_reset_timeout_s - elapsed)
+
+    def _reject(self) -> DatabaseUnavailable:
+        self.rejected += 1
+        return DatabaseUnavailable("Database unavailable, try again later")
+
+    def _open(self) -> None:
+        if self.state != "open":
+            logger.warning("Database unreachable, opening the circuit breaker")
+            self.opened += 1
+        self.state = "open"
+        self._opened_at = time.monotonic()
+
+    def record_success(self) -> None:
+        if self.state != "closed":
+            logger.info("Database reachable again, closing the circuit breaker")
+        self.state = "closed"
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        threshold = settings.db_breaker_failure_threshold
+        if self.state != "closed" or (threshold > 0 and self.failures >= threshold):
+            self._open()
+
+    async def _probe(self) -> None:
+        async with asyncio.timeout(settings.db_connect_timeout_s):
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+
+    async def before_transaction(self) -> None:
+        if self.state == "closed":
+            return
+        if self._probing or self.retry_after() > 0:
+            raise self._reject()
+        self.state = "half_open"
+        self._probing = True
+        try:
+            await self._probe()
+        except Exception as e:
+            self._open()
+            raise self._reject() from e
+        finally:
+            self._probing = False
+        self.record_success()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
+
+
+breaker = CircuitBreaker()
+
+
 @asynccontextmanager
-async def transaction_session():
-    async with SessionLocal() as session:
-        async with session.begin():
-            yield session
+async def transaction_session(budget: Optional[str] = "write"):
+    await breaker.before_transaction()
+    inflight.enter()
+    try:
+        async with SessionLocal() as session:
+            async with session.begin():
+                if budget is not None:
+                    await apply_timeout_budget(session, timeout_budget(budget))
+                yield session
+            # Post-commit handlers such as the page cache version bump finish
+            # before the caller responds.
+            await events.wait_for_dispatched(session)
+    except sa_exc.TimeoutError as e:
+        # Every pooled connection is in use: the database is busy, not down.
+        raise DatabaseUnavailable("Database busy, try again later") from e
+    except Exception as e:
+        if not is_outage(e):
+            raise
+        breaker.record_failure()
+        raise DatabaseUnavailable("Database unavailable, try again later") from e
+    else:
+        breaker.record_success()
+    finally:
+        inflight.exit()
+
+
+def session_dependency(budget: Optional[str]):
+    async def dependency() -> AsyncSession:  # type: ignore
+        async with transaction_session(budget) as session:
+            yield session  # type: ignore
+
+    return dependency
 
 
-async def get_db() -> AsyncSession:  # type: ignore
-    async with transaction_session() as session:
-        yield session  # type: ignore
+get_db = session_dependency("write")
+get_read_db = session_dependency("read")
@@ -0,0 +1,99 @@
+"""In-process domain events delivered after the emitting transaction commits.
+
+Services call `emit(session, name, **payload)` while they work; handlers
+registered with `subscribe(name, handler)` run once the outermost transaction
+commits. Events from a rolled back transaction or savepoint are dropped.
+Handlers may be plain functions or coroutine functions; coroutines are
+scheduled as tasks on the running loop, and `wait_for_dispatched(session)`
+waits for the ones started by that session's commit."""
+
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Set
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+_handlers: Dict[str, List[Callable[..., Any]]] = defaultdict(list)
+_tasks: Set[asyncio.Task] = set()
+
+_PENDING = "pending_events"
+_MARKS = "pending_event_marks"
+_DISPATCHED = "dispatched_event_tasks"
+
+
+def subscribe(name: str, handler: Callable[..., Any]) -> None:
+    _handlers[name].append(handler)
+
+
+def unsubscribe(name: str, handler: Callable[..., Any]) -> None:
+    if handler in _handlers[name]:
+        _handlers[name].remove(handler)
+
+
+def emit(session, name: str, **payload: Any) -> None:
+    sync_session = getattr(session, "sync_session", session)
+    sync_session.info.setdefault(_PENDING, []).append((name, payload))
+
+
+def dispatch(name: str, **payload: Any) -> List[asyncio.Task]:
+    started = []
+    for handler in list(_handlers.get(name, ())):
+        try:
+            result = handler(**payload)
+        except Exception:
+            logger.exception("Handler %r for event %s failed", handler, name)
+            continue
+        if asyncio.iscoroutine(result):
+            task = asyncio.get_running_loop().create_task(result)
+            _tasks.add(task)
+            task.add_done_callback(_tasks.discard)
+            started.append(task)
+    return started
+
+
+async def wait_for_handlers() -> None:
+    if _tasks:
+        await asyncio.gather(*list(_tasks), return_exceptions=True)
+
+
+async def wait_for_dispatched(session) -> None:
+    sync_session = getattr(session, "sync_session", session)
+    started = sync_session.info.pop(_DISPATCHED, None)
+    if started:
+        await asyncio.gather(*started, return_exceptions=True)
+
+
+@event.listens_for(Session, "after_transaction_create")
+def _mark_savepoint(session, transaction) -> None:
+    if transaction.nested:
+        marks = session.info.setdefault(_MARKS, {})
+        marks[id(transaction)] = len(session.info.get(_PENDING, ()))
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_rolled_back(session, previous_transaction) -> None:
+    if previous_transaction.nested:
+        mark = session.info.get(_MARKS, {}).pop(id(previous_transaction), None)
+        if mark is not None and _PENDING in session.info:
+            del session.info[_PENDING][mark:]
+    else:
+        session.info.pop(_PENDING, None)
+        session.info.pop(_MARKS, None)
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_pending(session) -> None:
+    nested = session.get_nested_transaction()
+    if nested is not None:
+        # Releasing a savepoint keeps its events for the enclosing transaction.
+        session.info.get(_MARKS, {}).pop(id(nested), None)
+        return
+    session.info.pop(_MARKS, None)
+    for name, payload in session.info.pop(_PENDING, ()):
+        started = dispatch(name, **payload)
+        if started:
+            session.info.setdefault(_DISPATCHED, []).extend(started)
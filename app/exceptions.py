@@ -26,5 +26,41 @@ class BookNotBorrowed(BookError):
     pass
 
 
+class LoanLimitExceeded(BookError):
+    pass
+
+
 class UserNotFound(Exception):
     pass
+
+
+class JobError(Exception):
+    pass
+
+
+class JobNotFound(JobError):
+    pass
+
+
+class JobQueueFull(JobError):
+    pass
+
+
+class HoldError(Exception):
+    pass
+
+
+class HoldNotFound(HoldError):
+    pass
+
+
+class DuplicateHold(HoldError):
+    pass
+
+
+class InvalidChangeToken(BookError):
+    pass
+
+
+class DatabaseUnavailable(Exception):
+    pass
@@ -0,0 +1,176 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+from fastapi import FastAPI
+from sqlalchemy import text
+
+from app import db
+from app.availability import availability
+from app.cards import card_cache
+from app.circulation import circulation
+from app.config import settings
+from app.exceptions import BookNotFound
+from app.page_cache import make_backend, page_cache
+from app.services.books import BookService
+from app.services.jobs import runner
+
+logger = logging.getLogger(__name__)
+
+HEALTH_PREFIX = "/health"
+
+
+@dataclass
+class LifecycleState:
+    started: bool = False
+    draining: bool = False
+
+
+state = LifecycleState()
+
+
+async def warm_up_pool(connections: int) -> None:
+    """Open `connections` pooled connections at once and run the hot queries
+    on each, so asyncpg has them prepared before the first real request."""
+    if connections <= 0:
+        return
+    barrier = asyncio.Barrier(connections)
+
+    async def _warm_one() -> None:
+        try:
+            async with db.SessionLocal() as session:
+                svc = BookService(session)
+                await svc.list_books(limit=1)
+                for for_update in (False, True):
+                    try:
+                        await svc.get_by_serial("000000", for_update=for_update)
+                    except BookNotFound:
+                        pass
+                await barrier.wait()
+                await session.rollback()
+        except BaseException:
+            # Release the connections already waiting for this one.
+            await barrier.abort()
+            raise
+
+    results = await asyncio.gather(
+        *(_warm_one() for _ in range(connections)), return_exceptions=True
+    )
+    for result in results:
+        if isinstance(result, BaseException) and not isinstance(
+            result, asyncio.BrokenBarrierError
+        ):
+            raise result
+
+
+async def check_database() -> bool:
+    try:
+        async with db.engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    except Exception:
+        logger.exception("Database readiness check failed")
+        return False
+    return True
+
+
+async def load_availability_index() -> None:
+    try:
+        async with db.transaction_session("job") as session:
+            count = await availability.load(session)
+    except Exception:
+        logger.exception("Loading the availability index failed")
+        return
+    logger.info("Availability index loaded with %d books", count)
+    availability.start_sync(settings.availability_sync_interval_s)
+
+
+async def load_card_cache() -> None:
+    try:
+        async with db.transaction_session("job") as session:
+            count = await card_cache.load(session)
+    except Exception:
+        logger.exception("Loading the card cache failed")
+        return
+    logger.info("Card cache loaded with %d cards", count)
+    card_cache.start_refresh(settings.card_cache_refresh_interval_s)
+
+
+async def startup() -> None:
+    state.draining = False
+    connections = min(settings.db_warmup_connections, settings.db_pool_size)
+    try:
+        await warm_up_pool(connections)
+    except Exception:
+        logger.exception("Connection pool warm-up failed")
+    if settings.availability_index_enabled:
+        await load_availability_index()
+    await load_card_cache()
+    circulation.start_flush(settings.circulation_flush_interval_s)
+    page_cache.open(make_backend(settings.page_cache_backend))
+    await runner.start(settings.job_workers, settings.job_queue_size)
+    state.started = True
+
+
+async def drain(timeout: float) -> bool:
+    state.draining = True
+    drained = await db.inflight.wait_idle(timeout)
+    if not drained:
+        logger.warning(
+            "Shutdown deadline reached with %d transaction(s) still open",
+            db.inflight.count,
+        )
+    return drained
+
+
+async def shutdown() -> None:
+    state.draining = True
+    await availability.stop_sync()
+    await card_cache.stop_refresh()
+    await runner.stop(settings.shutdown_drain_timeout)
+    await drain(settings.shutdown_drain_timeout)
+    # After the drain, so the loans of the last requests are counted too.
+    await circulation.stop_flush()
+    await page_cache.close()
+    await db.engine.dispose()
+    state.started = False
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await startup()
+    yield
+    await shutdown()
+
+
+class DrainMiddleware:
+    """Rejects new requests with 503 once shutdown has started, except for
+    the health probes."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if (
+            scope["type"] == "http"
+            and state.draining
+            and not scope["path"].startswith(HEALTH_PREFIX)
+        ):
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 503,
+                    "headers": [
+                        (b"content-type", b"application/json"),
+                        (b"connection", b"close"),
+                    ],
+                }
+            )
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": b'{"detail":"Server is shutting down"}',
+                }
+            )
+            return
+        await self.app(scope, receive, send)
@@ -1,6 +1,41 @@
 from fastapi import FastAPI
+from sqlalchemy.exc import DBAPIError
+
+from app.api.admin import router as admin_router
+from app.api.authors import router as authors_router
 from app.api.books import router as books_router
+from app.api.health import router as health_router
+from app.api.holds import router as holds_router
+from app.api.inventory import router as inventory_router
+from app.api.jobs import router as jobs_router
+from app.api.recommendations import router as recommendations_router
+from app.api.stats import router as stats_router
+from app.compression import CompressionMiddleware
+from app.exceptions import DatabaseUnavailable
+from app.lifecycle import DrainMiddleware, lifespan
+from app.profiling import ProfilerMiddleware
+from app.timeouts import (
+    CancelOnDisconnectMiddleware,
+    database_timeout_handler,
+    database_unavailable_handler,
+)
+
+app = FastAPI(title="Library API", lifespan=lifespan)
+
+app.add_middleware(ProfilerMiddleware)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(DrainMiddleware)
+app.add_middleware(CancelOnDisconnectMiddleware)
 
-app = FastAPI(title="Library API")
+app.add_exception_handler(DBAPIError, database_timeout_handler)
+app.add_exception_handler(DatabaseUnavailable, database_unavailable_handler)
 
 app.include_router(books_router)
+app.include_router(authors_router)
+app.include_router(holds_router)
+app.include_router(recommendations_router)
+app.include_router(inventory_router)
+app.include_router(jobs_router)
+app.include_router(stats_router)
+app.include_router(health_router)
+app.include_router(admin_router)
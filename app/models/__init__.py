@@ -1,2 +1,9 @@
 from .user import User
+from .author import Author
 from .book import Book
+from .hold import Hold
+from .job import Job
+from .tombstone import BookTombstone
+from .loan import Loan
+from .related_book import RelatedBook
+from .circulation import CirculationBucket
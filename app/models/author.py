@@ -0,0 +1,16 @@
+from sqlalchemy import Index, Integer, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base
+
+
+class Author(Base):
+    __tablename__ = "authors"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    name: Mapped[str] = mapped_column(String(255), nullable=False)
+
+    __table_args__ = (Index("uq_authors_name_lower", func.lower(name), unique=True),)
+
+    def __repr__(self) -> str:
+        return f"<Author id={self.id} name={self.name!r}>"
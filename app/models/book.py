@@ -2,11 +2,21 @@ import uuid
 from datetime import datetime, timezone
 from typing import Optional
 
-from sqlalchemy import String, Boolean, DateTime, CheckConstraint, CHAR, ForeignKey
+from sqlalchemy import (
+    String,
+    Boolean,
+    DateTime,
+    CheckConstraint,
+    CHAR,
+    ForeignKey,
+    Index,
+    Integer,
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db import Base
+from app.models.author import Author
 
 
 class Book(Base):
@@ -24,7 +34,11 @@ class Book(Base):
     )
 
     title: Mapped[str] = mapped_column(String(255), nullable=False)
-    author: Mapped[str] = mapped_column(String(255), nullable=False)
+    author_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("authors.id", ondelete="RESTRICT"), nullable=False
+    )
+    # Many-to-one on the primary key, joined into every Book SELECT.
+    writer: Mapped[Author] = relationship(Author, lazy="joined", innerjoin=True)
 
     is_borrowed: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     borrowed_at: Mapped[Optional[datetime]] = mapped_column(
@@ -67,8 +81,18 @@ class Book(Base):
             "OR (NOT is_borrowed AND borrowed_at IS NULL AND borrowed_by IS NULL)",
             name="ck_books_borrow_state_consistent",
         ),
+        Index("ix_books_updated_at_id", "updated_at", "id"),
+        # One per sort order of GET /books, each ending in a unique column.
+        Index("ix_books_author_id_created_at_id", "author_id", "created_at", "id"),
+        Index("ix_books_created_at_id", "created_at", "id"),
+        Index("ix_books_title_id", "title", "id"),
+        Index("ix_books_borrowed_at_id", "borrowed_at", "id"),
     )
 
+    @property
+    def author(self) -> str:
+        return self.writer.name
+
     def __repr__(self) -> str:
         return (
             f"<Book id={self.id} serial={self.serial_number} "
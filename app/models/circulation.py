@@ -0,0 +1,27 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base
+
+
+class CirculationBucket(Base):
+    """Borrows and returns during the UTC hour, day or ISO week (`granularity`)
+    starting at `bucket_start`."""
+
+    __tablename__ = "circulation_buckets"
+
+    granularity: Mapped[str] = mapped_column(String(8), primary_key=True)
+    bucket_start: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), primary_key=True
+    )
+    borrows: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    returns: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return (
+            f"<CirculationBucket {self.granularity} {self.bucket_start} "
+            f"borrows={self.borrows} "
+            f"returns={self.returns}>"
+        )
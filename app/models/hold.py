@@ -0,0 +1,39 @@
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import DateTime, CHAR, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base
+
+
+class Hold(Base):
+    __tablename__ = "holds"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, nullable=False
+    )
+    book_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("books.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    card_number: Mapped[str] = mapped_column(
+        CHAR(6),
+        ForeignKey("users.card_number", ondelete="CASCADE"),
+        nullable=False,
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+    )
+
+    __table_args__ = (
+        Index("ix_holds_book_id_created_at", "book_id", "created_at"),
+        UniqueConstraint("book_id", "card_number", name="uq_holds_book_card"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<Hold id={self.id} book={self.book_id} card={self.card_number}>"
@@ -0,0 +1,39 @@
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import DateTime, CHAR, ForeignKey, Index, Integer
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base
+
+
+class Loan(Base):
+    """One row per time a book was lent to a card, kept after it is returned."""
+
+    __tablename__ = "loans"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    book_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("books.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    card_number: Mapped[str] = mapped_column(
+        CHAR(6),
+        ForeignKey("users.card_number", ondelete="CASCADE"),
+        nullable=False,
+    )
+    borrowed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+    )
+
+    __table_args__ = (
+        Index("ix_loans_book_id", "book_id"),
+        Index("ix_loans_card_number", "card_number"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<Loan id={self.id} book={self.book_id} card={self.card_number}>"
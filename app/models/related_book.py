@@ -0,0 +1,35 @@
+import uuid
+
+from sqlalchemy import ForeignKey, Index, Integer, SmallInteger
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base
+
+
+class RelatedBook(Base):
+    """The books most often borrowed by the same cards as `book_id`, ranked from
+    0; rebuilt as a whole by `python -m app.cli rebuild-recommendations`."""
+
+    __tablename__ = "related_books"
+
+    book_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("books.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    rank: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    related_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("books.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    together: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    __table_args__ = (Index("ix_related_books_related_id", "related_id"),)
+
+    def __repr__(self) -> str:
+        return (
+            f"<RelatedBook book={self.book_id} rank={self.rank} "
+            f"related={self.related_id} together={self.together}>"
+        )
@@ -0,0 +1,28 @@
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import DateTime, CHAR, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base
+
+
+class BookTombstone(Base):
+    __tablename__ = "book_tombstones"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, nullable=False
+    )
+    book_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    serial_number: Mapped[str] = mapped_column(CHAR(6), nullable=False)
+    deleted_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+    )
+
+    __table_args__ = (Index("ix_book_tombstones_deleted_at_id", "deleted_at", "id"),)
+
+    def __repr__(self) -> str:
+        return f"<BookTombstone book={self.book_id} serial={self.serial_number}>"
@@ -1,7 +1,7 @@
 import uuid
 from typing import List
 
-from sqlalchemy import String, CheckConstraint, CHAR
+from sqlalchemy import String, Integer, CheckConstraint, CHAR
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -19,6 +19,9 @@ class User(Base):
     card_number: Mapped[str] = mapped_column(
         CHAR(6), unique=True, nullable=False, index=True
     )
+    loan_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
 
     borrowed_books: Mapped[List["Book"]] = relationship(  # type: ignore
         "Book",
@@ -29,6 +32,7 @@ class User(Base):
 
     __table_args__ = (
         CheckConstraint("card_number ~ '^[0-9]{6}$'", name="ck_users_card_six_digits"),
+        CheckConstraint("loan_count >= 0", name="ck_users_loan_count_non_negative"),
     )
 
     def __repr__(self) -> str:
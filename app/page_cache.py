@@ -0,0 +1,278 @@
+import asyncio
+import logging
+import struct
+import time
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, Tuple, TypeVar
+from urllib.parse import urlencode
+
+try:
+    from redis import asyncio as redis_asyncio
+except ImportError:  # pragma: no cover - redis is optional
+    redis_asyncio = None
+
+from app import events
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+VERSION_KEY = "catalog-version"
+LOCK_POLL_INTERVAL = 0.02
+# Cached pages are stored as the wall-clock time they stop being fresh followed
+# by the body, so every worker agrees on when a page went stale.
+_FRESH_UNTIL = struct.Struct(">d")
+
+
+class MemoryBackend:
+    """Process-local stand-in for Redis, for tests and single-worker setups."""
+
+    def __init__(self, max_entries: int = 10_000) -> None:
+        self._data: Dict[str, Tuple[bytes, Optional[float]]] = {}
+        self._max_entries = max_entries
+
+    def _live(self, key: str) -> Optional[bytes]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        for key, (_, expires_at) in list(self._data.items()):
+            if expires_at is not None and expires_at <= now:
+                del self._data[key]
+        while len(self._data) >= self._max_entries:
+            del self._data[next(iter(self._data))]
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._live(key)
+
+    async def set(
+        self, key: str, value: bytes, ttl: float, only_if_absent: bool = False
+    ) -> bool:
+        if only_if_absent and self._live(key) is not None:
+            return False
+        if key not in self._data and len(self._data) >= self._max_entries:
+            self._evict()
+        self._data[key] = (value, time.monotonic() + ttl)
+        return True
+
+    async def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    async def incr(self, key: str) -> int:
+        value = int(self._live(key) or 0) + 1
+        self._data[key] = (str(value).encode(), None)
+        return value
+
+    async def close(self) -> None:
+        self._data.clear()
+
+
+class RedisBackend:
+    """Any server speaking the Redis protocol (Redis, Valkey, KeyDB, ...)."""
+
+    def __init__(self, url: str) -> None:
+        if redis_asyncio is None:
+            raise RuntimeError("PAGE_CACHE_BACKEND=redis needs the redis package")
+        self._client = redis_asyncio.from_url(
+            url,
+            socket_timeout=settings.page_cache_timeout_s,
+            socket_connect_timeout=settings.page_cache_timeout_s,
+        )
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._client.get(key)
+
+    async def set(
+        self, key: str, value: bytes, ttl: float, only_if_absent: bool = False
+    ) -> bool:
+        stored = await self._client.set(
+            key, value, px=max(1, int(ttl * 1000)), nx=only_if_absent
+        )
+        return bool(stored)
+
+    async def delete(self, key: str) -> None:
+        await self._client.delete(key)
+
+    async def incr(self, key: str) -> int:
+        return await self._client.incr(key)
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+def make_backend(kind: str):
+    if kind == "none":
+        return None
+    if kind == "memory":
+        return MemoryBackend()
+    if kind == "redis":
+        return RedisBackend(settings.page_cache_redis_url)
+    raise ValueError(f"Unknown page cache backend {kind!r}")
+
+
+def _normalize(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (list, tuple)):
+        return ",".join(map(str, value))
+    return str(value)
+
+
+def page_key(name: str, params: Mapping[str, Any]) -> str:
+    """`name?a=1&b=2` with the parameters sorted and unset ones left out, so
+    equivalent requests share a key."""
+    query = sorted((k, _normalize(v)) for k, v in params.items() if v is not None)
+    return f"{name}?{urlencode(query)}"
+
+
+class PageCache:
+    """Serialized read pages shared by all workers through a cache server.
+
+    Page keys include a catalog version that is bumped after every committed
+    `BookService` write, which makes all cached pages unreachable at once. A
+    page is fresh for `page_cache_ttl_s` and kept `page_cache_stale_ttl_s`
+    longer. Only the worker holding a page's refresh lock recomputes it; while
+    it does, the others serve the stale copy or, when there is none, wait for
+    its result. If the backend fails, pages are computed without caching."""
+
+    def __init__(self) -> None:
+        self.backend = None
+        self._bump: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.stale = 0
+        self.computed = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def open(self, backend) -> None:
+        self.backend = backend
+
+    async def close(self) -> None:
+        if self.backend is not None:
+            await self.backend.close()
+            self.backend = None
+
+    def _key(self, key: str) -> str:
+        return f"{settings.page_cache_key_prefix}:{key}"
+
+    async def _call(self, request: Awaitable[T]) -> T:
+        # A cache server that hangs fails like one that refuses connections.
+        return await asyncio.wait_for(request, settings.page_cache_timeout_s)
+
+    async def version(self) -> int:
+        return int(await self._call(self.backend.get(self._key(VERSION_KEY))) or 0)
+
+    def on_book_changed(self, **_) -> Optional[Awaitable[None]]:
+        # Changes committed before a bump starts share it; every writer waits for
+        # it, so a write never responds ahead of the version it invalidates.
+        if self.backend is None:
+            return None
+        if self._bump is None:
+            self._bump = asyncio.get_running_loop().create_task(self._bump_version())
+        return self._wait_for_bump(self._bump)
+
+    async def _wait_for_bump(self, bump: asyncio.Task) -> None:
+        await asyncio.shield(bump)
+
+    async def _bump_version(self) -> None:
+        self._bump = None
+        try:
+            await self._call(self.backend.incr(self._key(VERSION_KEY)))
+        except Exception:
+            self.errors += 1
+            logger.exception("Bumping the catalog version failed")
+
+    async def get_or_compute(
+        self,
+        name: str,
+        params: Mapping[str, Any],
+        produce: Callable[[], Awaitable[bytes]],
+    ) -> bytes:
+        if self.backend is None:
+            return await produce()
+        produced = False
+
+        async def tracked() -> bytes:
+            nonlocal produced
+            produced = True
+            return await produce()
+
+        try:
+            return await self._cached(page_key(name, params), tracked)
+        except Exception:
+            if produced:
+                raise
+            self.errors += 1
+            logger.warning("Page cache unavailable", exc_info=True)
+            return await produce()
+
+    async def _cached(self, key: str, produce: Callable[[], Awaitable[bytes]]) -> bytes:
+        key = self._key(f"page:{await self.version()}:{key}")
+        lock = f"{key}:lock"
+        lock_ttl = settings.page_cache_lock_ttl_s
+        deadline = time.monotonic() + lock_ttl
+        while True:
+            cached = await self._call(self.backend.get(key))
+            if cached is not None:
+                (fresh_until,) = _FRESH_UNTIL.unpack_from(cached)
+                body = cached[_FRESH_UNTIL.size :]
+                if time.time() < fresh_until:
+                    self.hits += 1
+                    return body
+                if not await self._call(self.backend.set(lock, b"1", lock_ttl, True)):
+                    self.stale += 1
+                    return body
+                return await self._refresh(key, lock, produce)
+            if await self._call(self.backend.set(lock, b"1", lock_ttl, True)):
+                return await self._refresh(key, lock, produce)
+            if time.monotonic() >= deadline:
+                # The lock holder is slow or died; don't wait for it any longer.
+                self.computed += 1
+                return await produce()
+            await asyncio.sleep(LOCK_POLL_INTERVAL)
+
+    async def _refresh(
+        self, key: str, lock: str, produce: Callable[[], Awaitable[bytes]]
+    ) -> bytes:
+        self.computed += 1
+        try:
+            body = await produce()
+            ttl = settings.page_cache_ttl_s
+            value = _FRESH_UNTIL.pack(time.time() + ttl) + body
+            try:
+                await self._call(
+                    self.backend.set(key, value, ttl + settings.page_cache_stale_ttl_s)
+                )
+            except Exception:
+                self.errors += 1
+                logger.warning("Storing page %s failed", key, exc_info=True)
+            return body
+        finally:
+            try:
+                await self._call(self.backend.delete(lock))
+            except Exception:
+                self.errors += 1
+                logger.warning("Releasing lock %s failed", lock, exc_info=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "stale": self.stale,
+            "computed": self.computed,
+            "errors": self.errors,
+        }
+
+
+page_cache = PageCache()
+events.subscribe("book.changed", page_cache.on_book_changed)
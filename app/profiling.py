@@ -0,0 +1,161 @@
+import asyncio
+import inspect
+import logging
+import random
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from pathlib import Path
+from typing import List, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_ID_HEADER = b"x-profile-id"
+
+
+def _await_chain(coro) -> List:
+    frames = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            break
+        frames.append(frame)
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    return frames
+
+
+def _label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_qualname} ({code.co_filename}:{code.co_firstlineno})"
+
+
+class TaskSampler:
+    """Wall-clock sampler for a single asyncio task.
+
+    Every `interval` seconds a loop callback records the chain of coroutines
+    the task is suspended in below the `root` frame (e.g. the route handler
+    awaiting a SQLAlchemy query), weighted by the time since the previous
+    sample. Time the task spends running without yielding is attributed to the
+    point where it next awaits. While the task waits on a task passed to
+    `follow` (e.g. a single-flight call), that task's chain is sampled below
+    it. Samples are written in the folded-stack format understood by
+    flamegraph.pl and speedscope, weights in microseconds."""
+
+    def __init__(self, task: asyncio.Task, root, interval: float) -> None:
+        self.task = task
+        self.root = root
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._followed: List[asyncio.Task] = []
+        self._last = 0.0
+        self._handle: Optional[asyncio.TimerHandle] = None
+
+    def start(self) -> None:
+        self._last = time.perf_counter()
+        self._schedule()
+
+    def stop(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def follow(self, task: asyncio.Task) -> None:
+        self._followed = [t for t in self._followed if not t.done()]
+        self._followed.append(task)
+
+    def _schedule(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._handle = loop.call_later(self.interval, self._sample)
+
+    def _sample(self) -> None:
+        now = time.perf_counter()
+        frames = _await_chain(self.task.get_coro())
+        if self.root in frames:
+            frames = frames[frames.index(self.root) + 1 :]
+        pending = [t for t in self._followed if not t.done()]
+        if frames and pending:
+            frames += _await_chain(pending[-1].get_coro())
+        if frames:
+            stack = ";".join(_label(f) for f in frames)
+            self.samples[stack] += now - self._last
+        self._last = now
+        self._schedule()
+
+    def folded(self) -> str:
+        return "".join(
+            f"{stack} {round(seconds * 1_000_000)}\n"
+            for stack, seconds in self.samples.items()
+        )
+
+
+_sampler: ContextVar[Optional[TaskSampler]] = ContextVar("sampler", default=None)
+
+
+def follow(task: asyncio.Task) -> None:
+    """Profiles `task` as part of the current request while the request
+    awaits it."""
+    sampler = _sampler.get()
+    if sampler is not None:
+        sampler.follow(task)
+
+
+def _should_profile(scope) -> bool:
+    header = settings.profiling_header.lower().encode("latin-1")
+    for key, value in scope["headers"]:
+        if key == header:
+            return value.lower() in (b"1", b"true", b"yes")
+    rate = settings.profiling_sample_rate
+    return rate > 0 and random.random() < rate
+
+
+def _write_profile(path: Path, data: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(data)
+
+
+class ProfilerMiddleware:
+    """Profiles requests carrying the profiling header (or a random sample of
+    `profiling_sample_rate` of them) when `profiling_enabled` is set, saving a
+    folded-stack file under `profiling_dir` and naming it in X-Profile-Id."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if (
+            not settings.profiling_enabled
+            or scope["type"] != "http"
+            or not _should_profile(scope)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        name = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:12]}.folded"
+
+        async def send_with_id(message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((PROFILE_ID_HEADER, name.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        sampler = TaskSampler(
+            asyncio.current_task(),
+            inspect.currentframe(),
+            settings.profiling_interval_ms / 1000,
+        )
+        sampler.start()
+        token = _sampler.set(sampler)
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            _sampler.reset(token)
+            sampler.stop()
+            path = Path(settings.profiling_dir) / name
+            try:
+                await asyncio.to_thread(_write_profile, path, sampler.folded())
+            except OSError:
+                logger.exception("Could not write profile %s", path)
@@ -0,0 +1,54 @@
+from datetime import datetime
+from typing import Any, List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class CoalescingStats(BaseModel):
+    executed: int = Field(..., description="Reads that ran a query")
+    coalesced: int = Field(..., description="Reads served by joining an in-flight one")
+    in_flight: int
+
+
+class PageCacheStats(BaseModel):
+    enabled: bool
+    hits: int = Field(..., description="Pages served fresh from the cache")
+    stale: int = Field(..., description="Stale pages served while being refreshed")
+    computed: int = Field(..., description="Pages queried and rendered here")
+    errors: int = Field(..., description="Failed cache backend calls")
+
+
+class CircuitBreakerStats(BaseModel):
+    state: str = Field(..., description="`closed`, `open` or `half_open`")
+    consecutive_failures: int
+    opened: int = Field(..., description="Times the database was found unreachable")
+    rejected: int = Field(..., description="Transactions refused while open")
+
+
+class StaleReadStats(BaseModel):
+    entries: int = Field(..., description="Reads with a last good response kept")
+    bytes: int
+    served: int = Field(..., description="Stale responses served")
+
+
+class MetricsOut(BaseModel):
+    read_coalescing: CoalescingStats
+    page_cache: PageCacheStats
+    circuit_breaker: CircuitBreakerStats
+    stale_reads: StaleReadStats
+
+
+class SlowQueryOut(BaseModel):
+    recorded_at: datetime
+    duration_ms: float
+    statement: str
+    parameters: Any = Field(..., description="Parameter types, never values")
+    origin: Optional[str] = Field(None, description="Service method that ran it")
+    plan: Optional[Any] = Field(None, description="EXPLAIN (FORMAT JSON) output")
+
+
+class AvailabilityCheckOut(BaseModel):
+    books: int = Field(..., description="Books in the table")
+    mismatches: int = Field(..., description="Index bits that differ from the table")
+    sample: List[str] = Field(..., description="Some of the mismatching serials")
+    repaired: bool
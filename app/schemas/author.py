@@ -0,0 +1,9 @@
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class AuthorOut(BaseModel):
+    model_config = ConfigDict(
+        json_schema_extra={"examples": [{"name": "Robert C. Martin", "book_count": 4}]}
+    )
+    name: str
+    book_count: int = Field(..., description="Number of books in the catalog")
@@ -1,10 +1,26 @@
 from datetime import datetime
-from typing import Annotated, Optional
+from typing import Annotated, List, Literal, Optional
 from pydantic import BaseModel, Field, ConfigDict
 
 SixDigits = Annotated[str, Field(pattern=r"^\d{6}$", description="Exactly 6 digits")]
 
 
+BookSort = Literal[
+    "created",
+    "-created",
+    "title",
+    "-title",
+    "author",
+    "-author",
+    "serial",
+    "-serial",
+    "borrowed_at",
+    "-borrowed_at",
+]
+
+SnapshotFormat = Literal["arrow", "parquet"]
+
+
 class BookCreate(BaseModel):
     model_config = ConfigDict(
         json_schema_extra={
@@ -77,3 +93,92 @@ class SetStatusRequest(BaseModel):
     is_borrowed: bool
     borrower_card: Optional[SixDigits] = None
     when: Optional[datetime] = None
+
+
+class BookLookupRequest(BaseModel):
+    model_config = ConfigDict(
+        json_schema_extra={"examples": [{"serial_numbers": ["123456", "654321"]}]}
+    )
+    serial_numbers: List[str] = Field(
+        ...,
+        min_length=1,
+        max_length=5000,
+        description="Serials (6 digits each) to look up; duplicates are ignored",
+    )
+
+
+class BookLookupOut(BaseModel):
+    found: List[BookOut]
+    missing: List[str] = Field(
+        ..., description="Requested serials that do not exist, in request order"
+    )
+
+
+class BookAvailabilityOut(BaseModel):
+    serial_number: str
+    available: bool = Field(..., description="True when the book is not borrowed")
+
+
+class BookAvailabilityRequest(BaseModel):
+    model_config = ConfigDict(
+        json_schema_extra={"examples": [{"serial_numbers": ["123456", "654321"]}]}
+    )
+    serial_numbers: List[str] = Field(
+        ...,
+        min_length=1,
+        max_length=100_000,
+        description="Serials (6 digits each) to check; duplicates are ignored",
+    )
+
+
+class BulkAvailabilityOut(BaseModel):
+    available: List[str] = Field(..., description="Serials that can be borrowed")
+    borrowed: List[str] = Field(..., description="Serials currently borrowed")
+    missing: List[str] = Field(..., description="Serials that do not exist")
+
+
+class BookImportRequest(BaseModel):
+    books: List[BookCreate] = Field(..., min_length=1, max_length=100_000)
+
+
+class BulkStatusItem(SetStatusRequest):
+    serial_number: SixDigits
+
+
+class BulkStatusRequest(BaseModel):
+    model_config = ConfigDict(
+        json_schema_extra={
+            "examples": [
+                {
+                    "items": [
+                        {
+                            "serial_number": "123456",
+                            "is_borrowed": True,
+                            "borrower_card": "654321",
+                        },
+                        {"serial_number": "123457", "is_borrowed": False},
+                    ]
+                }
+            ]
+        }
+    )
+    items: List[BulkStatusItem] = Field(..., min_length=1, max_length=100_000)
+
+
+class BookTombstoneOut(BaseModel):
+    id: str = Field(..., description="Id of the deleted book")
+    serial_number: str
+    deleted_at: datetime
+
+
+class BookChangesOut(BaseModel):
+    books: List[BookOut] = Field(
+        ..., description="Books created or modified since the token"
+    )
+    deleted: List[BookTombstoneOut] = Field(
+        ..., description="Books deleted since the token"
+    )
+    next_token: str = Field(..., description="Pass as `since` in the next call")
+    has_more: bool = Field(
+        ..., description="True when more changes are available right away"
+    )
@@ -0,0 +1,19 @@
+from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict, Field
+
+CirculationGranularity = Literal["hour", "day", "week"]
+
+
+class CirculationPointOut(BaseModel):
+    model_config = ConfigDict(
+        json_schema_extra={
+            "examples": [
+                {"start": "2025-10-06T00:00:00Z", "borrows": 42, "returns": 37}
+            ]
+        }
+    )
+    start: datetime = Field(..., description="Start of the period (UTC)")
+    borrows: int
+    returns: int
@@ -0,0 +1,7 @@
+from pydantic import BaseModel, Field
+
+
+class HealthStatus(BaseModel):
+    status: str = Field(
+        ..., description="`alive`, `ready` or the reason for not being ready"
+    )
@@ -0,0 +1,33 @@
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from app.schemas.book import SixDigits
+
+
+class HoldCreate(BaseModel):
+    model_config = ConfigDict(
+        json_schema_extra={"examples": [{"borrower_card": "654321"}]}
+    )
+    borrower_card: SixDigits = Field(..., examples=["654321"])
+
+
+class HoldOut(BaseModel):
+    model_config = ConfigDict(
+        json_schema_extra={
+            "examples": [
+                {
+                    "id": "0f8c2a5e-6f0b-4a4e-9a53-3f1f2f0c9d11",
+                    "serial_number": "123456",
+                    "card_number": "654321",
+                    "position": 1,
+                    "created_at": "2025-10-05T12:34:56Z",
+                }
+            ]
+        }
+    )
+    id: str
+    serial_number: str
+    card_number: str
+    position: int = Field(..., description="1 for the head of the queue")
+    created_at: datetime
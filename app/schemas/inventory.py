@@ -0,0 +1,19 @@
+from typing import List
+
+from pydantic import BaseModel, Field
+
+
+class InventoryAuditOut(BaseModel):
+    scans: int = Field(..., description="Scanned values received, including repeats")
+    distinct_serials: int = Field(..., description="Distinct valid serials scanned")
+    missing: List[str] = Field(
+        ..., description="Books that are not borrowed but were not scanned"
+    )
+    borrowed_on_shelf: List[str] = Field(
+        ..., description="Scanned books that are marked as borrowed"
+    )
+    unknown: List[str] = Field(..., description="Scanned serials not in the catalog")
+    invalid: int = Field(..., description="Scanned values that are not 6 digits")
+    invalid_sample: List[str] = Field(
+        ..., description="The first invalid values (at most 20)"
+    )
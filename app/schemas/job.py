@@ -0,0 +1,60 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class JobItemError(BaseModel):
+    index: int = Field(..., description="Position of the failed item in the request")
+    serial_number: Optional[str] = None
+    detail: str
+
+
+class JobOut(BaseModel):
+    model_config = ConfigDict(
+        json_schema_extra={
+            "examples": [
+                {
+                    "id": "0f8c2a5e-6f0b-4a4e-9a53-3f1f2f0c9d11",
+                    "kind": "import_books",
+                    "status": "running",
+                    "total": 10000,
+                    "processed": 4000,
+                    "succeeded": 3998,
+                    "failed": 2,
+                    "errors": [
+                        {
+                            "index": 17,
+                            "serial_number": "123456",
+                            "detail": "Book with serial 123456 already exists",
+                        }
+                    ],
+                    "created_at": "2025-10-05T12:34:56Z",
+                    "started_at": "2025-10-05T12:34:57Z",
+                    "finished_at": None,
+                }
+            ]
+        }
+    )
+    id: str
+    kind: str
+    status: str = Field(
+        ...,
+        description="queued, running, succeeded, completed_with_errors or failed",
+    )
+    total: int
+    processed: int
+    succeeded: int
+    failed: int
+    errors: List[JobItemError] = Field(
+        ..., description="The first 100 item errors of the job"
+    )
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+class JobAccepted(BaseModel):
+    job_id: str
+    status: str
+    status_url: str
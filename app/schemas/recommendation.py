@@ -0,0 +1,24 @@
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class RelatedBookOut(BaseModel):
+    model_config = ConfigDict(
+        json_schema_extra={
+            "examples": [
+                {
+                    "serial_number": "654321",
+                    "title": "Clean Code",
+                    "author": "Robert C. Martin",
+                    "is_borrowed": False,
+                    "borrowed_together": 12,
+                }
+            ]
+        }
+    )
+    serial_number: str
+    title: str
+    author: str
+    is_borrowed: bool
+    borrowed_together: int = Field(
+        ..., description="Number of cards that borrowed both books"
+    )
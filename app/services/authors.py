@@ -0,0 +1,68 @@
+from typing import List, Optional
+
+from sqlalchemy import bindparam, exists, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.dataclasses.author_dto import AuthorDTO
+from app.models import Author, Book
+
+# Both lookups and the browse order go through the unique index on lower(name).
+AUTHOR_BY_NAME = select(Author).where(
+    func.lower(Author.name) == func.lower(bindparam("name"))
+)
+AUTHOR_ID_BY_NAME = (
+    select(Author.id)
+    .where(func.lower(Author.name) == func.lower(bindparam("author")))
+    .scalar_subquery()
+)
+BOOK_COUNT = select(func.count()).where(Book.author_id == Author.id).scalar_subquery()
+
+
+def browse_statement(after: bool):
+    stmt = select(Author.name, BOOK_COUNT).where(
+        exists().where(Book.author_id == Author.id)
+    )
+    if after:
+        stmt = stmt.where(func.lower(Author.name) > func.lower(bindparam("after")))
+    return stmt.order_by(func.lower(Author.name)).limit(bindparam("limit"))
+
+
+BROWSE_AUTHORS = browse_statement(after=False)
+BROWSE_AUTHORS_AFTER = browse_statement(after=True)
+
+
+class AuthorService:
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def get_or_create(self, name: str) -> Author:
+        """The author whose name matches `name` case-insensitively, created with
+        this spelling if there is none yet."""
+        name = name.strip()
+        result = await self.session.execute(AUTHOR_BY_NAME, {"name": name})
+        author = result.scalar_one_or_none()
+        if author is not None:
+            return author
+        author = Author(name=name)
+        try:
+            async with self.session.begin_nested():
+                self.session.add(author)
+        except IntegrityError:
+            # A concurrent transaction created the same author first.
+            result = await self.session.execute(AUTHOR_BY_NAME, {"name": name})
+            author = result.scalar_one()
+        return author
+
+    async def list_authors(
+        self, after: Optional[str] = None, limit: int = 100
+    ) -> List[AuthorDTO]:
+        """Authors that have books, ordered by name case-insensitively, starting
+        after the name `after`."""
+        params = {"limit": max(1, min(limit, 500))}
+        stmt = BROWSE_AUTHORS
+        if after is not None:
+            params["after"] = after
+            stmt = BROWSE_AUTHORS_AFTER
+        result = await self.session.execute(stmt, params)
+        return [AuthorDTO(name=name, book_count=count) for name, count in result]
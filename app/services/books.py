@@ -1,10 +1,17 @@
-from typing import List, Optional
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from datetime import datetime
-from sqlalchemy import select
+from sqlalchemy import CHAR, any_, bindparam, func, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.models import Book, User
+from sqlalchemy.orm import contains_eager
+from app import events
+from app.cards import card_cache
+from app.config import settings
+from app.models import Author, Book, BookTombstone, Hold, Loan, User
 from app.dataclasses.book_dto import BookDTO
+from app.services.authors import AUTHOR_ID_BY_NAME, AuthorService
 from app.exceptions import (
     BookAlreadyBorrowed,
     BookNotBorrowed,
@@ -12,9 +19,129 @@ from app.exceptions import (
     DuplicateSerialNumber,
     InvalidCardNumber,
     InvalidSerialNumber,
+    LoanLimitExceeded,
     UserNotFound,
 )
-from app.utils import validate_card, validate_serial, utcnow
+from app.utils import validate_card, validate_serial, validate_serials, utcnow
+
+LOOKUP_CHUNK_SIZE = 1000
+
+# The hot statements are built once: executing a prebuilt statement skips the
+# construction and reuses its memoized cache key, and the unchanged SQL text keeps
+# hitting asyncpg's per-connection prepared statement cache.
+USER_BY_CARD = select(User).where(User.card_number == bindparam("card"))
+BOOK_BY_SERIAL = select(Book).where(Book.serial_number == bindparam("serial"))
+# Only the book row is locked, not the joined author.
+BOOK_BY_SERIAL_FOR_UPDATE = BOOK_BY_SERIAL.with_for_update(of=Book)
+TAKE_LOAN = (
+    update(User)
+    .where(User.card_number == bindparam("card"))
+    .values(loan_count=User.loan_count + 1)
+    .execution_options(synchronize_session=False)
+)
+TAKE_LOAN_WITHIN_LIMIT = TAKE_LOAN.where(User.loan_count < bindparam("limit"))
+RELEASE_LOAN = (
+    update(User)
+    .where(User.card_number == bindparam("card"), User.loan_count > 0)
+    .values(loan_count=User.loan_count - 1)
+    .execution_options(synchronize_session=False)
+)
+NEXT_HOLD = (
+    select(Hold)
+    .where(Hold.book_id == bindparam("book_id"))
+    .order_by(Hold.created_at, Hold.id)
+    .limit(1)
+    .with_for_update()
+)
+
+
+BOOK_FIELDS = (
+    "id",
+    "serial_number",
+    "title",
+    "author",
+    "is_borrowed",
+    "borrowed_at",
+    "borrowed_by",
+)
+Fields = Optional[Tuple[str, ...]]
+# Statements are cached per filter combination, sort and field set.
+STATEMENT_CACHE_SIZE = 512
+
+
+def canonical_fields(fields: Fields) -> Fields:
+    """`fields` in BOOK_FIELDS order, so every ordering of a field set shares one
+    cached statement; callers put the columns back in the requested order."""
+    if fields is None:
+        return None
+    return tuple(f for f in BOOK_FIELDS if f in fields)
+
+
+# Sort keys of `list_books` ("-key" for descending) and their ORDER BY columns.
+# Each order is served by an index on the same columns (books by author walk
+# the authors by name, then ix_books_author_id_created_at_id) and ends in a
+# unique column, so it is total and a page boundary can be resumed from.
+BOOK_SORTS = {
+    "created": (Book.created_at, Book.id),
+    "title": (Book.title, Book.id),
+    "author": (func.lower(Author.name), Book.created_at, Book.id),
+    "serial": (Book.serial_number,),
+    "borrowed_at": (Book.borrowed_at, Book.id),
+}
+DEFAULT_SORT = "-created"
+
+
+def _select_books(fields: Fields):
+    if fields is None:
+        return select(Book)
+    stmt = select(
+        *(
+            Author.name.label("author") if f == "author" else getattr(Book, f)
+            for f in fields
+        )
+    )
+    if "author" in fields:
+        stmt = stmt.join(Book.writer)
+    return stmt
+
+
+@lru_cache(maxsize=STATEMENT_CACHE_SIZE)
+def list_books_statement(
+    by_status: bool,
+    by_card: bool,
+    by_author: bool = False,
+    fields: Fields = None,
+    sort: str = DEFAULT_SORT,
+):
+    key = sort.removeprefix("-")
+    columns = BOOK_SORTS[key]
+    if sort.startswith("-"):
+        columns = tuple(c.desc() for c in columns)
+    stmt = _select_books(fields)
+    if key == "author" and fields is None:
+        # The sort reuses the join that loads the authors.
+        stmt = stmt.join(Book.writer).options(contains_eager(Book.writer))
+    elif key == "author" and "author" not in fields:
+        stmt = stmt.join(Book.writer)
+    if by_status:
+        stmt = stmt.where(Book.is_borrowed == bindparam("is_borrowed"))
+    if by_card:
+        stmt = stmt.where(Book.borrowed_by == bindparam("card"))
+    if by_author:
+        stmt = stmt.where(Book.author_id == AUTHOR_ID_BY_NAME)
+    return stmt.order_by(*columns).offset(bindparam("offset")).limit(bindparam("limit"))
+
+
+@lru_cache(maxsize=STATEMENT_CACHE_SIZE)
+def lookup_statement(postgres: bool, fields: Fields = None):
+    # One array parameter on PostgreSQL keeps a single prepared statement for any
+    # batch size; elsewhere the IN list is expanded per call.
+    stmt = _select_books(fields)
+    if postgres:
+        return stmt.where(
+            Book.serial_number == any_(bindparam("serials", type_=ARRAY(CHAR(6))))
+        )
+    return stmt.where(Book.serial_number.in_(bindparam("serials", expanding=True)))
 
 
 class BookService:
@@ -22,55 +149,204 @@ class BookService:
         self.session = session
 
     async def _get_user_by_card(self, card_number: str):
-        stmt = select(User).where(User.card_number == card_number)
-        result = await self.session.execute(stmt)
+        result = await self.session.execute(USER_BY_CARD, {"card": card_number})
         return result.scalar_one_or_none()
 
+    async def _take_loan(self, card_number: str, enforce_limit: bool = True) -> None:
+        limit = settings.max_loans_per_card
+        if enforce_limit:
+            result = await self.session.execute(
+                TAKE_LOAN_WITHIN_LIMIT, {"card": card_number, "limit": limit}
+            )
+        else:
+            result = await self.session.execute(TAKE_LOAN, {"card": card_number})
+        if result.rowcount == 1:
+            return
+        user = await self._get_user_by_card(card_number)
+        if not user:
+            card_cache.discard(card_number)
+            raise UserNotFound(f"User with card number {card_number} not found")
+        raise LoanLimitExceeded(
+            f"User with card number {card_number} already has {user.loan_count} "
+            f"books borrowed (limit {limit})"
+        )
+
+    async def _release_loan(self, card_number: str) -> None:
+        await self.session.execute(RELEASE_LOAN, {"card": card_number})
+
+    async def _move_loan(self, from_card: Optional[str], to_card: str) -> None:
+        # Touch the two user rows in card order so concurrent transfers between the
+        # same cards cannot deadlock.
+        if from_card and from_card < to_card:
+            await self._release_loan(from_card)
+            await self._take_loan(to_card)
+        else:
+            await self._take_loan(to_card)
+            if from_card:
+                await self._release_loan(from_card)
+
+    async def resolve_card(self, card_number: str) -> str:
+        """Validates a borrower card and checks that its user exists, answering
+        from the card cache when possible so a known card costs no query."""
+        try:
+            card = validate_card(card_number)
+        except ValueError as e:
+            raise InvalidCardNumber(str(e)) from e
+        if not await card_cache.is_registered(self.session, card):
+            raise UserNotFound(f"User with card number {card} not found")
+        return card
+
+    def _record_loan(self, book: Book) -> None:
+        self.session.add(
+            Loan(
+                book_id=book.id,
+                card_number=book.borrowed_by,
+                borrowed_at=book.borrowed_at,
+            )
+        )
+        events.emit(
+            self.session,
+            "book.borrowed",
+            serial_number=book.serial_number,
+            card_number=book.borrowed_by,
+            at=book.borrowed_at,
+        )
+
+    def _record_return(self, book: Book) -> None:
+        events.emit(
+            self.session,
+            "book.returned",
+            serial_number=book.serial_number,
+            card_number=book.borrowed_by,
+            at=utcnow(),
+        )
+
+    def _emit_changed(self, book: Book, exists: bool = True) -> None:
+        events.emit(
+            self.session,
+            "book.changed",
+            serial_number=book.serial_number,
+            exists=exists,
+            is_borrowed=book.is_borrowed,
+        )
+
     async def get_by_serial(self, serial_number: str, for_update: bool = False) -> Book:
         try:
             serial = validate_serial(serial_number)
         except ValueError as e:
             raise InvalidSerialNumber(str(e)) from e
-        stmt = select(Book).where(Book.serial_number == serial)
-        if for_update:
-            stmt = stmt.with_for_update()
-        result = await self.session.execute(stmt)
+        stmt = BOOK_BY_SERIAL_FOR_UPDATE if for_update else BOOK_BY_SERIAL
+        result = await self.session.execute(stmt, {"serial": serial})
         book = result.scalar_one_or_none()
         if not book:
             raise BookNotFound(f"Book with serial {serial} not found")
         return book
 
-    async def list_books(
+    def _list_params(
         self,
-        is_borrowed: Optional[bool] = None,
-        borrower_card: Optional[str] = None,
-        offset: int = 0,
-        limit: int = 100,
-    ) -> List[BookDTO]:
-        stmt = select(Book)
+        is_borrowed: Optional[bool],
+        borrower_card: Optional[str],
+        author: Optional[str],
+        offset: int,
+        limit: int,
+    ) -> Dict[str, Any]:
+        params: Dict[str, Any] = {
+            "offset": max(offset, 0),
+            "limit": max(1, min(limit, 500)),
+        }
         if is_borrowed is not None:
-            stmt = stmt.where(Book.is_borrowed == is_borrowed)
+            params["is_borrowed"] = is_borrowed
         if borrower_card is not None:
             try:
-                card = validate_card(borrower_card)
+                params["card"] = validate_card(borrower_card)
             except ValueError as e:
                 raise InvalidCardNumber(str(e)) from e
-            stmt = stmt.where(Book.borrowed_by == card)
-        stmt = (
-            stmt.order_by(Book.created_at.desc())
-            .offset(max(offset, 0))
-            .limit(max(1, min(limit, 500)))
+        if author is not None:
+            params["author"] = author.strip()
+        return params
+
+    def _list_statement(self, params: Dict[str, Any], sort: str, fields: Fields):
+        if sort.removeprefix("-") not in BOOK_SORTS:
+            raise ValueError(f"Unknown sort key {sort!r}")
+        return list_books_statement(
+            "is_borrowed" in params, "card" in params, "author" in params, fields, sort
         )
-        result = await self.session.execute(stmt)
+
+    async def list_books(
+        self,
+        is_borrowed: Optional[bool] = None,
+        borrower_card: Optional[str] = None,
+        author: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 100,
+        sort: str = DEFAULT_SORT,
+    ) -> List[BookDTO]:
+        params = self._list_params(is_borrowed, borrower_card, author, offset, limit)
+        stmt = self._list_statement(params, sort, None)
+        result = await self.session.execute(stmt, params)
         rows = result.scalars().all()
         return [BookDTO.from_model(b) for b in rows]
 
+    async def list_book_fields(
+        self,
+        fields: Sequence[str],
+        is_borrowed: Optional[bool] = None,
+        borrower_card: Optional[str] = None,
+        author: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 100,
+        sort: str = DEFAULT_SORT,
+    ) -> List[Dict[str, Any]]:
+        """Like `list_books`, but selects and returns only the given columns."""
+        params = self._list_params(is_borrowed, borrower_card, author, offset, limit)
+        stmt = self._list_statement(params, sort, canonical_fields(tuple(fields)))
+        result = await self.session.execute(stmt, params)
+        return [{f: row[f] for f in fields} for row in result.mappings()]
+
+    async def _lookup_rows(self, serial_numbers: Sequence[str], fields: Fields):
+        try:
+            serials = validate_serials(serial_numbers)
+        except ValueError as e:
+            raise InvalidSerialNumber(str(e)) from e
+        postgres = self.session.get_bind().dialect.name == "postgresql"
+        stmt = lookup_statement(postgres, fields)
+        rows = []
+        for start in range(0, len(serials), LOOKUP_CHUNK_SIZE):
+            chunk = serials[start : start + LOOKUP_CHUNK_SIZE]
+            result = await self.session.execute(stmt, {"serials": chunk})
+            rows.extend(result.scalars() if fields is None else result.mappings())
+        return serials, rows
+
+    async def lookup_by_serials(
+        self, serial_numbers: Sequence[str]
+    ) -> Tuple[List[BookDTO], List[str]]:
+        serials, rows = await self._lookup_rows(serial_numbers, None)
+        by_serial = {b.serial_number: BookDTO.from_model(b) for b in rows}
+        found = [by_serial[s] for s in serials if s in by_serial]
+        missing = [s for s in serials if s not in by_serial]
+        return found, missing
+
+    async def lookup_book_fields(
+        self, serial_numbers: Sequence[str], fields: Sequence[str]
+    ) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """Like `lookup_by_serials`, but selects and returns only the given
+        columns (plus `serial_number`, which the lookup needs)."""
+        columns = canonical_fields(("serial_number", *fields))
+        serials, rows = await self._lookup_rows(serial_numbers, columns)
+        by_serial = {row["serial_number"]: row for row in rows}
+        found = [
+            {f: by_serial[s][f] for f in fields} for s in serials if s in by_serial
+        ]
+        missing = [s for s in serials if s not in by_serial]
+        return found, missing
+
     async def add_book(self, serial_number: str, title: str, author: str) -> BookDTO:
         try:
             serial = validate_serial(serial_number)
         except ValueError as e:
             raise InvalidSerialNumber(str(e)) from e
-        book = Book(serial_number=serial, title=title.strip(), author=author.strip())
+        writer = await AuthorService(self.session).get_or_create(author)
+        book = Book(serial_number=serial, title=title.strip(), writer=writer)
         self.session.add(book)
         try:
             await self.session.flush()
@@ -78,6 +354,7 @@ class BookService:
             raise DuplicateSerialNumber(
                 f"Book with serial {serial} already exists"
             ) from e
+        self._emit_changed(book)
         return BookDTO.from_model(book)
 
     async def delete_book(
@@ -88,7 +365,14 @@ class BookService:
             raise BookAlreadyBorrowed(
                 f"Book {book.serial_number} is currently borrowed by {book.borrowed_by}"
             )
+        if book.borrowed_by:
+            await self._release_loan(book.borrowed_by)
+            self._record_return(book)
+        self.session.add(
+            BookTombstone(book_id=book.id, serial_number=book.serial_number)
+        )
         await self.session.delete(book)
+        self._emit_changed(book, exists=False)
 
     async def borrow_book(self, serial_number: str, borrower_card: str) -> BookDTO:
         book = await self.get_by_serial(serial_number, for_update=True)
@@ -97,19 +381,15 @@ class BookService:
                 f"Book {book.serial_number} already borrowed by {book.borrowed_by}"
             )
 
-        try:
-            card = validate_card(borrower_card)
-        except ValueError as e:
-            raise InvalidCardNumber(str(e)) from e
-
-        user = await self._get_user_by_card(card)
-        if not user:
-            raise UserNotFound(f"User with card number {card} not found")
+        card = await self.resolve_card(borrower_card)
+        await self._take_loan(card)
 
         book.is_borrowed = True
         book.borrowed_by = card
         book.borrowed_at = utcnow()
         self.session.add(book)
+        self._record_loan(book)
+        self._emit_changed(book)
         return BookDTO.from_model(book)
 
     async def return_book(self, serial_number: str) -> BookDTO:
@@ -118,12 +398,42 @@ class BookService:
             raise BookNotBorrowed(
                 f"Book {book.serial_number} is not currently borrowed"
             )
-        book.is_borrowed = False
-        book.borrowed_by = None
-        book.borrowed_at = None
+        await self._release_loan(book.borrowed_by)
+        self._record_return(book)
+        # The book row is changed only once the next holder is known, so it is
+        # written with a single UPDATE.
+        if not await self._fulfil_next_hold(book):
+            book.is_borrowed = False
+            book.borrowed_by = None
+            book.borrowed_at = None
         self.session.add(book)
+        self._emit_changed(book)
         return BookDTO.from_model(book)
 
+    async def _fulfil_next_hold(self, book: Book) -> bool:
+        # The book row is locked, so concurrent returns of this book are serialized
+        # here; locking the head hold keeps a concurrent cancel from racing us.
+        result = await self.session.execute(NEXT_HOLD, {"book_id": book.id})
+        hold = result.scalar_one_or_none()
+        if not hold:
+            return False
+        # The patron queued for this copy, so the hand-over is not refused for the
+        # loan limit.
+        await self._take_loan(hold.card_number, enforce_limit=False)
+        book.is_borrowed = True
+        book.borrowed_by = hold.card_number
+        book.borrowed_at = utcnow()
+        self._record_loan(book)
+        await self.session.delete(hold)
+        events.emit(
+            self.session,
+            "hold.fulfilled",
+            hold_id=hold.id,
+            serial_number=book.serial_number,
+            card_number=hold.card_number,
+        )
+        return True
+
     async def set_status(
         self,
         serial_number: str,
@@ -133,21 +443,29 @@ class BookService:
     ) -> BookDTO:
         book = await self.get_by_serial(serial_number, for_update=True)
         if is_borrowed:
-            try:
-                card = validate_card(borrower_card or "")
-            except ValueError as e:
-                raise InvalidCardNumber(str(e)) from e
-
-            user = await self._get_user_by_card(card)
-            if not user:
-                raise UserNotFound(f"User with card number {card} not found")
+            card = await self.resolve_card(borrower_card or "")
+            lent = book.borrowed_by != card
+            if lent:
+                await self._move_loan(book.borrowed_by, card)
+                if book.borrowed_by:
+                    self._record_return(book)
 
             book.is_borrowed = True
             book.borrowed_by = card
             book.borrowed_at = when or utcnow()
+            if lent:
+                self._record_loan(book)
+        elif book.borrowed_by:
+            # Freeing a lent book is a return: the head of the hold queue gets it.
+            await self._release_loan(book.borrowed_by)
+            self._record_return(book)
+            if not await self._fulfil_next_hold(book):
+                book.is_borrowed = False
+                book.borrowed_by = None
+                book.borrowed_at = None
         else:
             book.is_borrowed = False
-            book.borrowed_by = None
             book.borrowed_at = None
         self.session.add(book)
+        self._emit_changed(book)
         return BookDTO.from_model(book)
@@ -0,0 +1,68 @@
+from datetime import timedelta
+from typing import Optional, Sequence, Tuple
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.dataclasses.book_dto import BookDTO
+from app.dataclasses.change_dto import ChangesDTO, ChangeWatermark, TombstoneDTO
+from app.exceptions import InvalidChangeToken
+from app.models import Book, BookTombstone
+from app.utils import utcnow
+
+
+class ChangeFeedService:
+    """Books modified and deleted after a watermark, ordered by (timestamp, id).
+
+    Rows younger than `change_feed_lag_seconds` are held back, so a transaction
+    that stamped its rows earlier but commits later than a concurrent one is not
+    skipped by a client that has already moved past its timestamp."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def rows_since(
+        self, watermark: ChangeWatermark, limit: int
+    ) -> Tuple[Sequence[Book], Sequence[BookTombstone]]:
+        """Up to `limit` books and up to `limit` tombstones after `watermark`,
+        each ordered by (timestamp, id). The two are paged independently."""
+        horizon = utcnow() - timedelta(seconds=settings.change_feed_lag_seconds)
+
+        stmt = select(Book).where(Book.updated_at <= horizon)
+        if watermark.books:
+            stmt = stmt.where(tuple_(Book.updated_at, Book.id) > watermark.books)
+        stmt = stmt.order_by(Book.updated_at, Book.id).limit(limit)
+        books = (await self.session.execute(stmt)).scalars().all()
+
+        stmt = select(BookTombstone).where(BookTombstone.deleted_at <= horizon)
+        if watermark.deleted:
+            stmt = stmt.where(
+                tuple_(BookTombstone.deleted_at, BookTombstone.id) > watermark.deleted
+            )
+        stmt = stmt.order_by(BookTombstone.deleted_at, BookTombstone.id).limit(limit)
+        deleted = (await self.session.execute(stmt)).scalars().all()
+        return books, deleted
+
+    async def changes_since(self, token: Optional[str], limit: int = 500) -> ChangesDTO:
+        try:
+            watermark = ChangeWatermark.decode(token) if token else ChangeWatermark()
+        except (ValueError, KeyError, TypeError, IndexError) as e:
+            raise InvalidChangeToken("Invalid change token") from e
+        limit = max(1, min(limit, 1000))
+        books, deleted = await self.rows_since(watermark, limit)
+
+        next_watermark = ChangeWatermark(
+            books=(books[-1].updated_at, books[-1].id) if books else watermark.books,
+            deleted=(
+                (deleted[-1].deleted_at, deleted[-1].id)
+                if deleted
+                else watermark.deleted
+            ),
+        )
+        return ChangesDTO(
+            books=[BookDTO.from_model(b) for b in books],
+            deleted=[TombstoneDTO.from_model(t) for t in deleted],
+            next_token=next_watermark.encode(),
+            has_more=len(books) == limit or len(deleted) == limit,
+        )
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import bindparam, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.circulation import period_start
+from app.dataclasses.circulation_dto import CirculationPointDTO
+from app.models import CirculationBucket
+from app.utils import utcnow
+
+PERIODS = {
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+    "week": timedelta(weeks=1),
+}
+
+BUCKETS_SINCE = (
+    select(
+        CirculationBucket.bucket_start,
+        CirculationBucket.borrows,
+        CirculationBucket.returns,
+    )
+    .where(
+        CirculationBucket.granularity == bindparam("granularity"),
+        CirculationBucket.bucket_start >= bindparam("since"),
+    )
+    .order_by(CirculationBucket.bucket_start)
+)
+
+
+class CirculationService:
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def series(
+        self, granularity: str, periods: int, now: Optional[datetime] = None
+    ) -> List[CirculationPointDTO]:
+        """Borrows and returns in each of the last `periods` hours, days or weeks
+        up to the current one, oldest first, read from the buckets of that
+        granularity; periods without loans are included with zero counts."""
+        step = PERIODS[granularity]
+        current = period_start(now or utcnow(), granularity)
+        first = current - step * (periods - 1)
+        totals: Dict[datetime, List[int]] = {
+            first + step * i: [0, 0] for i in range(periods)
+        }
+        result = await self.session.execute(
+            BUCKETS_SINCE, {"granularity": granularity, "since": first}
+        )
+        for start, borrows, returns in result:
+            counts = totals.get(period_start(start, granularity))
+            if counts is not None:
+                counts[0] += borrows
+                counts[1] += returns
+        return [
+            CirculationPointDTO(start=start, borrows=borrows, returns=returns)
+            for start, (borrows, returns) in totals.items()
+        ]
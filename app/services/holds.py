@@ -0,0 +1,87 @@
+import uuid
+from typing import List, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cards import CARD_EXISTS, card_cache
+from app.dataclasses.hold_dto import HoldDTO
+from app.exceptions import (
+    BookNotBorrowed,
+    DuplicateHold,
+    HoldNotFound,
+    InvalidCardNumber,
+    UserNotFound,
+)
+from app.models import Hold
+from app.services.books import BookService
+from app.utils import validate_card
+
+
+class HoldService:
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+        self.books = BookService(session)
+
+    async def place_hold(
+        self, serial_number: str, card_number: str
+    ) -> Tuple[HoldDTO, int]:
+        # Locking the book serializes this with return_book, so a hold can't slip in
+        # after the book has been handed back and stay queued on an available book.
+        book = await self.books.get_by_serial(serial_number, for_update=True)
+        try:
+            card = validate_card(card_number)
+        except ValueError as e:
+            raise InvalidCardNumber(str(e)) from e
+        if not book.is_borrowed:
+            raise BookNotBorrowed(
+                f"Book {book.serial_number} is available, borrow it instead"
+            )
+        if book.borrowed_by == card:
+            raise DuplicateHold(
+                f"Book {book.serial_number} is already borrowed by {card}"
+            )
+        await self.books.resolve_card(card)
+        hold = Hold(book_id=book.id, card_number=card)
+        try:
+            async with self.session.begin_nested():
+                self.session.add(hold)
+                await self.session.flush()
+        except IntegrityError as e:
+            # The card cache may still list a user deleted since.
+            user = await self.session.execute(CARD_EXISTS, {"card": card})
+            if user.scalar_one_or_none() is None:
+                card_cache.discard(card)
+                raise UserNotFound(f"User with card number {card} not found") from e
+            raise DuplicateHold(
+                f"User {card} already has a hold on book {book.serial_number}"
+            ) from e
+        position = await self.session.execute(
+            select(func.count(Hold.id)).where(Hold.book_id == book.id)
+        )
+        return HoldDTO.from_model(hold, book.serial_number), position.scalar_one()
+
+    async def list_holds(self, serial_number: str) -> List[HoldDTO]:
+        book = await self.books.get_by_serial(serial_number)
+        stmt = (
+            select(Hold)
+            .where(Hold.book_id == book.id)
+            .order_by(Hold.created_at, Hold.id)
+        )
+        result = await self.session.execute(stmt)
+        return [HoldDTO.from_model(h, book.serial_number) for h in result.scalars()]
+
+    async def cancel_hold(self, serial_number: str, hold_id: uuid.UUID) -> None:
+        book = await self.books.get_by_serial(serial_number)
+        stmt = (
+            select(Hold)
+            .where(Hold.id == hold_id, Hold.book_id == book.id)
+            .with_for_update()
+        )
+        hold = (await self.session.execute(stmt)).scalar_one_or_none()
+        if not hold:
+            raise HoldNotFound(
+                f"Hold {hold_id} not found for book {book.serial_number}"
+            )
+        await self.session.delete(hold)
@@ -0,0 +1,65 @@
+import re
+from typing import AsyncIterable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.availability import SERIALS_AND_STATUS
+from app.bitset import DigitBitset
+from app.dataclasses.inventory_dto import InventoryAuditDTO, Scans
+
+SCAN_SEPARATORS = re.compile(rb"[\s,]+")
+CATALOG_PARTITION = 10_000
+MAX_INVALID_SAMPLE = 20
+
+
+def _add_scan(scans: Scans, token: bytes) -> None:
+    if not token:
+        return
+    scans.total += 1
+    if len(token) == 6 and token.isdigit():
+        scans.serials.add(token.decode())
+        return
+    scans.invalid += 1
+    if len(scans.invalid_sample) < MAX_INVALID_SAMPLE:
+        scans.invalid_sample.append(token[:32].decode(errors="replace"))
+
+
+async def read_scans(chunks: AsyncIterable[bytes]) -> Scans:
+    """Collects serials separated by whitespace or commas from a byte stream,
+    without holding more than one chunk of it."""
+    scans = Scans()
+    tail = b""
+    async for chunk in chunks:
+        tokens = SCAN_SEPARATORS.split(tail + chunk)
+        tail = tokens.pop()
+        for token in tokens:
+            _add_scan(scans, token)
+    _add_scan(scans, tail)
+    return scans
+
+
+class InventoryService:
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def audit(self, scans: Scans) -> InventoryAuditDTO:
+        """Compares the scanned serials with the whole catalog, read in one
+        streamed query into bitsets; the three differences are bitwise set
+        operations over the 1,000,000 possible serials."""
+        exists, borrowed = DigitBitset(), DigitBitset()
+        result = await self.session.stream(SERIALS_AND_STATUS)
+        async for rows in result.partitions(CATALOG_PARTITION):
+            for serial, is_borrowed in rows:
+                exists.add(serial)
+                if is_borrowed:
+                    borrowed.add(serial)
+        scanned = scans.serials
+        return InventoryAuditDTO(
+            scans=scans.total,
+            distinct_serials=len(scanned),
+            missing=list(exists - borrowed - scanned),
+            borrowed_on_shelf=list(scanned & borrowed),
+            unknown=list(scanned - exists),
+            invalid=scans.invalid,
+            invalid_sample=scans.invalid_sample,
+        )
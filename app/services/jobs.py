@@ -0,0 +1,204 @@
+import asyncio
+import logging
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import db
+from app.config import settings
+from app.dataclasses.job_dto import JobDTO
+from app.exceptions import BookError, JobNotFound, JobQueueFull, UserNotFound
+from app.models import Job
+from app.services.books import BookService
+from app.utils import utcnow
+
+logger = logging.getLogger(__name__)
+
+MAX_RECORDED_ERRORS = 100
+
+Operation = Callable[[BookService, Dict[str, Any]], Awaitable[Any]]
+
+
+async def import_book(svc: BookService, item: Dict[str, Any]) -> None:
+    await svc.add_book(
+        serial_number=item["serial_number"], title=item["title"], author=item["author"]
+    )
+
+
+async def set_book_status(svc: BookService, item: Dict[str, Any]) -> None:
+    await svc.set_status(
+        serial_number=item["serial_number"],
+        is_borrowed=item["is_borrowed"],
+        borrower_card=item.get("borrower_card"),
+        when=item.get("when"),
+    )
+
+
+OPERATIONS: Dict[str, Operation] = {
+    "import_books": import_book,
+    "set_status": set_book_status,
+}
+
+
+class JobService:
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def create(self, kind: str, total: int) -> Job:
+        job = Job(kind=kind, status="queued", total=total, errors=[])
+        self.session.add(job)
+        await self.session.flush()
+        return job
+
+    async def get(self, job_id: uuid.UUID) -> JobDTO:
+        job = await self.session.get(Job, job_id)
+        if not job:
+            raise JobNotFound(f"Job {job_id} not found")
+        return JobDTO.from_model(job)
+
+    async def mark_failed(self, job_ids: Sequence[uuid.UUID]) -> None:
+        await self.session.execute(
+            update(Job)
+            .where(Job.id.in_(job_ids))
+            .values(status="failed", finished_at=utcnow())
+        )
+
+
+class JobRunner:
+    """A bounded pool of asyncio workers executing bulk BookService operations.
+
+    Items are processed in chunks of `job_chunk_size`, each chunk in its own
+    transaction together with the job's progress update, so row locks are only
+    held for one chunk at a time. Each item runs in a savepoint, so a failing
+    item is recorded as an error without aborting the rest of its chunk."""
+
+    def __init__(self) -> None:
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        # Slots held by submissions still inserting their job row.
+        self._reserved = 0
+
+    async def start(self, workers: int, queue_size: int) -> None:
+        self._queue = asyncio.Queue(maxsize=queue_size)
+        self._reserved = 0
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"job-worker-{i}")
+            for i in range(workers)
+        ]
+
+    async def stop(self, timeout: float) -> None:
+        if not self._workers:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Stopping job workers with unfinished jobs")
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        pending = []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait()[0])
+        if pending:
+            await self._mark_failed(pending)
+
+    async def join(self) -> None:
+        await self._queue.join()
+
+    def _has_room(self) -> bool:
+        if self._queue is None:
+            return False
+        size = self._queue.maxsize
+        return size <= 0 or self._queue.qsize() + self._reserved < size
+
+    async def submit(self, kind: str, items: Sequence[Dict[str, Any]]) -> JobDTO:
+        if self._workers and all(task.done() for task in self._workers):
+            raise JobQueueFull("No job workers are running, try again later")
+        # The slot is taken before the job row is inserted, so concurrent
+        # submissions cannot fill the queue while this one awaits the database.
+        if not self._has_room():
+            raise JobQueueFull("Too many queued jobs, try again later")
+        self._reserved += 1
+        try:
+            async with db.transaction_session("job") as session:
+                job = await JobService(session).create(kind, total=len(items))
+            self._queue.put_nowait((job.id, OPERATIONS[kind], list(items)))
+        finally:
+            self._reserved -= 1
+        return JobDTO.from_model(job)
+
+    async def _worker(self) -> None:
+        while True:
+            job_id, operation, items = await self._queue.get()
+            try:
+                await self._run(job_id, operation, items)
+            except asyncio.CancelledError:
+                await self._mark_failed([job_id])
+                raise
+            except Exception:
+                logger.exception("Job %s crashed", job_id)
+                await self._mark_failed([job_id])
+            finally:
+                self._queue.task_done()
+
+    async def _mark_failed(self, job_ids: List[uuid.UUID]) -> None:
+        # A worker must outlive a database that is down while it cleans up.
+        try:
+            async with db.transaction_session("job") as session:
+                await JobService(session).mark_failed(job_ids)
+        except Exception:
+            logger.exception("Marking jobs %s as failed failed", job_ids)
+
+    async def _run(
+        self, job_id: uuid.UUID, operation: Operation, items: List[Dict[str, Any]]
+    ) -> None:
+        async with db.transaction_session("job") as session:
+            await session.execute(
+                update(Job)
+                .where(Job.id == job_id)
+                .values(status="running", started_at=utcnow())
+            )
+
+        chunk_size = max(1, settings.job_chunk_size)
+        for start in range(0, len(items), chunk_size):
+            chunk = items[start : start + chunk_size]
+            async with db.transaction_session("job") as session:
+                svc = BookService(session)
+                succeeded, errors = 0, []
+                for index, item in enumerate(chunk, start=start):
+                    try:
+                        async with session.begin_nested():
+                            await operation(svc, item)
+                        succeeded += 1
+                    except (BookError, UserNotFound) as e:
+                        errors.append(
+                            {
+                                "index": index,
+                                "serial_number": item.get("serial_number"),
+                                "detail": str(e),
+                            }
+                        )
+                job = (
+                    await session.execute(select(Job).where(Job.id == job_id))
+                ).scalar_one()
+                job.processed += len(chunk)
+                job.succeeded += succeeded
+                job.failed += len(errors)
+                room = MAX_RECORDED_ERRORS - len(job.errors)
+                if errors and room > 0:
+                    job.errors = job.errors + errors[:room]
+            # Let interactive requests get at the pool and the rows between chunks.
+            await asyncio.sleep(0)
+
+        async with db.transaction_session("job") as session:
+            job = (
+                await session.execute(select(Job).where(Job.id == job_id))
+            ).scalar_one()
+            job.status = "succeeded" if job.failed == 0 else "completed_with_errors"
+            job.finished_at = utcnow()
+
+
+runner = JobRunner()
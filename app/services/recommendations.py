@@ -0,0 +1,190 @@
+import asyncio
+import uuid
+from array import array
+from typing import Dict, List
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover - numpy is optional
+    numpy = None
+
+from sqlalchemy import bindparam, delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.config import settings
+from app.dataclasses.recommendation_dto import RelatedBookDTO
+from app.exceptions import BookNotFound, InvalidSerialNumber
+from app.models import Author, Book, Loan, RelatedBook
+from app.utils import validate_serial
+
+LOAN_PARTITION = 10_000
+INSERT_CHUNK = 5_000
+# Upper bound on the ordered book pairs expanded at once while counting.
+PAIR_CHUNK = 4_000_000
+
+LOAN_CARDS_AND_BOOKS = select(Loan.card_number, Loan.book_id)
+
+# One primary key range read: the book itself is outer joined so an unknown
+# serial (no row) can be told from a book without recommendations (one row of
+# NULLs).
+_RELATED = aliased(Book)
+RELATED_BOOKS = (
+    select(
+        RelatedBook.together,
+        _RELATED.serial_number,
+        _RELATED.title,
+        Author.name,
+        _RELATED.is_borrowed,
+    )
+    .select_from(Book)
+    .outerjoin(RelatedBook, RelatedBook.book_id == Book.id)
+    .outerjoin(_RELATED, _RELATED.id == RelatedBook.related_id)
+    .outerjoin(Author, Author.id == _RELATED.author_id)
+    .where(Book.serial_number == bindparam("serial"))
+    .order_by(RelatedBook.rank)
+)
+
+
+def _ranges(lengths):
+    """0..n-1 for each n in `lengths`, concatenated."""
+    return numpy.arange(lengths.sum()) - numpy.repeat(
+        numpy.cumsum(lengths) - lengths, lengths
+    )
+
+
+def _pair_keys(books, starts, sizes, n_books):
+    # Every book of a card is paired with every other book of the same card.
+    members = numpy.repeat(starts, sizes) + _ranges(sizes)
+    per_member = numpy.repeat(sizes, sizes)
+    left = numpy.repeat(members, per_member)
+    right = numpy.repeat(numpy.repeat(starts, sizes), per_member) + _ranges(per_member)
+    distinct = left != right
+    return books[left[distinct]] * n_books + books[right[distinct]]
+
+
+def _accumulate(keys, counts, chunk_keys):
+    chunk, chunk_counts = numpy.unique(chunk_keys, return_counts=True)
+    if keys.size == 0:
+        return chunk, chunk_counts
+    merged, inverse = numpy.unique(
+        numpy.concatenate([keys, chunk]), return_inverse=True
+    )
+    weights = numpy.concatenate([counts, chunk_counts])
+    return merged, numpy.bincount(inverse, weights=weights).astype(numpy.int64)
+
+
+def co_borrowing_neighbours(
+    cards, books, n_books: int, top_k: int, min_together: int, max_per_card: int
+):
+    """Ranks, for every book, the books borrowed by the most of its borrowers.
+
+    `cards` and `books` are parallel int64 arrays with one entry per loan, books
+    numbered from 0 to `n_books - 1`. The co-borrowing matrix is built sparse,
+    as sorted `book * n_books + related` keys with the number of distinct
+    cards that borrowed both; cards with more than `max_per_card` books are
+    left out. Returns parallel arrays (book, rank, related, together) with at
+    most `top_k` entries per book, each seen together at least `min_together`
+    times, best first and ties by related book number."""
+    empty = numpy.zeros(0, dtype=numpy.int64)
+    # One entry per (card, book), grouped by card.
+    loans = numpy.unique(cards * n_books + books)
+    card_of, book_of = loans // n_books, loans % n_books
+    starts = numpy.flatnonzero(numpy.r_[True, card_of[1:] != card_of[:-1]])
+    sizes = numpy.diff(numpy.r_[starts, loans.size])
+    useful = (sizes > 1) & (sizes <= max_per_card)
+    starts, sizes = starts[useful], sizes[useful]
+
+    keys, counts = empty, empty
+    pairs = numpy.cumsum(sizes * sizes)
+    lo = 0
+    while lo < sizes.size:
+        done = pairs[lo] - sizes[lo] * sizes[lo]
+        hi = max(lo + 1, int(numpy.searchsorted(pairs, done + PAIR_CHUNK, "right")))
+        chunk = _pair_keys(book_of, starts[lo:hi], sizes[lo:hi], n_books)
+        keys, counts = _accumulate(keys, counts, chunk)
+        lo = hi
+
+    frequent = counts >= min_together
+    keys, counts = keys[frequent], counts[frequent]
+    if keys.size == 0:
+        return empty, empty, empty, empty
+    book, related = keys // n_books, keys % n_books
+    order = numpy.lexsort((related, -counts, book))
+    book, related, counts = book[order], related[order], counts[order]
+    firsts = numpy.flatnonzero(numpy.r_[True, book[1:] != book[:-1]])
+    rank = _ranges(numpy.diff(numpy.r_[firsts, book.size]))
+    top = rank < top_k
+    return book[top], rank[top], related[top], counts[top]
+
+
+class RecommendationService:
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def related_books(self, serial_number: str) -> List[RelatedBookDTO]:
+        try:
+            serial = validate_serial(serial_number)
+        except ValueError as e:
+            raise InvalidSerialNumber(str(e)) from e
+        result = await self.session.execute(RELATED_BOOKS, {"serial": serial})
+        rows = result.all()
+        if not rows:
+            raise BookNotFound(f"Book with serial {serial} not found")
+        return [
+            RelatedBookDTO(
+                serial_number=related_serial,
+                title=title,
+                author=author,
+                is_borrowed=is_borrowed,
+                borrowed_together=together,
+            )
+            for together, related_serial, title, author, is_borrowed in rows
+            if related_serial is not None
+        ]
+
+    async def rebuild(self) -> int:
+        """Replaces `related_books` with the top neighbours computed from the
+        whole loan history, read in one streamed query; the counting runs in a
+        worker thread. Returns the number of rows stored."""
+        if numpy is None:
+            raise RuntimeError("Rebuilding recommendations needs the numpy package")
+        book_ids: List[uuid.UUID] = []
+        book_codes: Dict[uuid.UUID, int] = {}
+        cards, books = array("q"), array("q")
+        result = await self.session.stream(LOAN_CARDS_AND_BOOKS)
+        async for rows in result.partitions(LOAN_PARTITION):
+            for card, book_id in rows:
+                code = book_codes.get(book_id)
+                if code is None:
+                    code = book_codes[book_id] = len(book_ids)
+                    book_ids.append(book_id)
+                cards.append(int(card))
+                books.append(code)
+
+        book, rank, related, together = await asyncio.to_thread(
+            co_borrowing_neighbours,
+            numpy.frombuffer(cards, dtype=numpy.int64),
+            numpy.frombuffer(books, dtype=numpy.int64),
+            max(1, len(book_ids)),
+            settings.recommendations_top_k,
+            settings.recommendations_min_together,
+            settings.recommendations_max_books_per_card,
+        )
+        rows = [
+            {
+                "book_id": book_ids[b],
+                "rank": r,
+                "related_id": book_ids[o],
+                "together": t,
+            }
+            for b, r, o, t in zip(
+                book.tolist(), rank.tolist(), related.tolist(), together.tolist()
+            )
+        ]
+        await self.session.execute(delete(RelatedBook))
+        for start in range(0, len(rows), INSERT_CHUNK):
+            await self.session.execute(
+                insert(RelatedBook), rows[start : start + INSERT_CHUNK]
+            )
+        return len(rows)
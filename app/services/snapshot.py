@@ -0,0 +1,137 @@
+import asyncio
+from functools import lru_cache
+from typing import AsyncIterator, List, Sequence
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover - pyarrow is optional
+    pyarrow = None
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models import Author, Book
+from app.services.books import (
+    BOOK_FIELDS,
+    STATEMENT_CACHE_SIZE,
+    Fields,
+    canonical_fields,
+)
+
+SNAPSHOT_MEDIA_TYPES = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+SNAPSHOT_EXTENSIONS = {"arrow": "arrows", "parquet": "parquet"}
+
+
+def snapshot_available() -> bool:
+    return pyarrow is not None
+
+
+def _arrow_type(field: str):
+    if field == "is_borrowed":
+        return pyarrow.bool_()
+    if field == "borrowed_at":
+        return pyarrow.timestamp("us", tz="UTC")
+    return pyarrow.string()
+
+
+def snapshot_schema(fields: Fields):
+    return pyarrow.schema([(f, _arrow_type(f)) for f in fields or BOOK_FIELDS])
+
+
+@lru_cache(maxsize=STATEMENT_CACHE_SIZE)
+def snapshot_statement(fields: Fields = None):
+    # Plain columns rather than Book entities, so no ORM objects are built for
+    # the full scan.
+    columns = [
+        Author.name.label("author") if f == "author" else getattr(Book, f)
+        for f in fields or BOOK_FIELDS
+    ]
+    stmt = select(*columns)
+    if "author" in (fields or BOOK_FIELDS):
+        stmt = stmt.join(Author, Author.id == Book.author_id)
+    return stmt
+
+
+class _ChunkSink:
+    """Write-only file for the Arrow writers that hands out, on `drain`, the
+    bytes written since the previous call."""
+
+    closed = False
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class SnapshotEncoder:
+    """Turns batches of rows into an Arrow IPC stream or a Parquet file (one row
+    group per batch), returning the encoded bytes batch by batch."""
+
+    def __init__(self, format: str, fields: Fields) -> None:
+        self.fields = fields or BOOK_FIELDS
+        # Rows come in canonical column order, the schema in the requested one.
+        self.columns = canonical_fields(fields) or BOOK_FIELDS
+        self.schema = snapshot_schema(fields)
+        self._sink = _ChunkSink()
+        if format == "parquet":
+            self._writer = pyarrow.parquet.ParquetWriter(self._sink, self.schema)
+        else:
+            self._writer = pyarrow.ipc.new_stream(self._sink, self.schema)
+
+    def write(self, rows: Sequence) -> bytes:
+        columns = dict(zip(self.columns, zip(*rows)))
+        arrays = []
+        for name in self.fields:
+            values = columns[name]
+            if name == "id":
+                values = [str(v) for v in values]
+            arrays.append(pyarrow.array(values, type=self.schema.field(name).type))
+        batch = pyarrow.RecordBatch.from_arrays(arrays, schema=self.schema)
+        self._writer.write_batch(batch)
+        return self._sink.drain()
+
+    def close(self) -> bytes:
+        self._writer.close()
+        return self._sink.drain()
+
+
+class SnapshotService:
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def stream(self, format: str, fields: Fields = None) -> AsyncIterator[bytes]:
+        """Yields the whole catalog encoded as `format`, read through a
+        server-side cursor `snapshot_batch_rows` rows at a time. Each batch is
+        encoded in a worker thread, so at most one batch of rows and its
+        encoding are held at once."""
+        encoder = await asyncio.to_thread(SnapshotEncoder, format, fields)
+        result = await self.session.stream(snapshot_statement(canonical_fields(fields)))
+        async for rows in result.partitions(settings.snapshot_batch_rows):
+            yield await asyncio.to_thread(encoder.write, rows)
+        yield await asyncio.to_thread(encoder.close)
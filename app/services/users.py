@@ -0,0 +1,23 @@
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Book, User
+
+
+class UserService:
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def recompute_loan_counts(self) -> int:
+        actual = (
+            select(func.count(Book.id))
+            .where(Book.borrowed_by == User.card_number)
+            .scalar_subquery()
+        )
+        result = await self.session.execute(
+            update(User)
+            .where(User.loan_count != actual)
+            .values(loan_count=actual)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
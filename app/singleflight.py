@@ -0,0 +1,62 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+from app import events, profiling
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one execution.
+
+    A caller joins the in-flight call for its key if that call started at most
+    `window` seconds ago; otherwise it starts a new one. The call runs in its own
+    task, so a caller that is cancelled (e.g. on client disconnect) does not
+    cancel it for the others. `forget_all` stops later callers from joining the
+    calls in flight, e.g. once a write commits that they may have missed."""
+
+    def __init__(self) -> None:
+        self._flights: Dict[Hashable, Tuple[float, asyncio.Task]] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    async def do(
+        self, key: Hashable, fn: Callable[[], Awaitable[T]], window: float
+    ) -> T:
+        if window <= 0:
+            return await fn()
+        now = time.monotonic()
+        flight = self._flights.get(key)
+        if flight is not None and now - flight[0] <= window:
+            self.coalesced += 1
+            profiling.follow(flight[1])
+            return await asyncio.shield(flight[1])
+
+        task = asyncio.ensure_future(fn())
+        flight = (now, task)
+        self._flights[key] = flight
+        self.executed += 1
+
+        def _forget(_) -> None:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+        task.add_done_callback(_forget)
+        profiling.follow(task)
+        return await asyncio.shield(task)
+
+    def forget_all(self, **_) -> None:
+        self._flights.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._flights),
+        }
+
+
+read_coalescer = SingleFlight()
+# Reads issued after a local write never join a flight that started before it.
+events.subscribe("book.changed", read_coalescer.forget_all)
@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import os
+import sys
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Set
+
+import greenlet
+from sqlalchemy import Engine, event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import settings
+from app.utils import utcnow
+
+logger = logging.getLogger(__name__)
+
+SERVICES_DIR = os.path.join(os.path.dirname(__file__), "services") + os.sep
+EXPLAINABLE = ("SELECT", "WITH", "UPDATE", "DELETE", "INSERT")
+
+_explaining: ContextVar[bool] = ContextVar("explaining_slow_query", default=False)
+
+
+@dataclass
+class SlowQuery:
+    recorded_at: datetime
+    duration_ms: float
+    statement: str
+    parameters: Any
+    origin: Optional[str]
+    plan: Optional[Any] = None
+
+
+def parameter_shape(params: Any) -> Any:
+    """Describes bound parameters by type (and length for sequences) only."""
+    if isinstance(params, dict):
+        return {k: _value_shape(v) for k, v in params.items()}
+    if isinstance(params, (list, tuple)):
+        return [_value_shape(v) for v in params]
+    return _value_shape(params)
+
+
+def _value_shape(value: Any) -> str:
+    if isinstance(value, (list, tuple)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+
+def service_origin() -> Optional[str]:
+    """Returns the innermost public `app.services` method on the calling stack
+    (or the innermost private one if there is none), following the async
+    caller behind SQLAlchemy's greenlet bridge."""
+    frame = sys._getframe(1)
+    current = greenlet.getcurrent()
+    private = None
+    while True:
+        while frame is not None:
+            if frame.f_code.co_filename.startswith(SERVICES_DIR):
+                name = frame.f_code.co_qualname
+                if not name.rpartition(".")[2].startswith("_"):
+                    return name
+                private = private or name
+            frame = frame.f_back
+        current = current.parent
+        if current is None:
+            return private
+        frame = current.gr_frame
+
+
+class SlowQueryLog:
+    """Ring buffer of statements that took at least `slow_query_threshold_ms`.
+
+    On PostgreSQL the plan of a slow statement is captured afterwards with
+    `EXPLAIN (FORMAT JSON)` on a separate connection, in a background task, at
+    most once per `slow_query_explain_interval_s` for the same SQL and never
+    more than one at a time."""
+
+    def __init__(self, capacity: int) -> None:
+        self._entries: Deque[SlowQuery] = deque(maxlen=capacity)
+        self._explained_at: Dict[str, float] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    def entries(self) -> List[SlowQuery]:
+        return list(reversed(self._entries))
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._explained_at.clear()
+
+    def record(
+        self,
+        engine: Engine,
+        statement: str,
+        params: Any,
+        shape: Any,
+        duration: float,
+        explain: bool = True,
+    ) -> SlowQuery:
+        entry = SlowQuery(
+            recorded_at=utcnow(),
+            duration_ms=round(duration * 1000, 3),
+            statement=statement,
+            parameters=shape,
+            origin=service_origin(),
+        )
+        self._entries.append(entry)
+        logger.warning(
+            "Slow query (%.1f ms) from %s: %s parameters=%s",
+            entry.duration_ms,
+            entry.origin or "unknown",
+            statement,
+            shape,
+        )
+        if explain and self._should_explain(engine, statement):
+            task = asyncio.get_running_loop().create_task(
+                self._explain(engine, entry, params)
+            )
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return entry
+
+    def _should_explain(self, engine: Engine, statement: str) -> bool:
+        if (
+            not settings.slow_query_explain
+            or engine.dialect.name != "postgresql"
+            or self._tasks
+            or not statement.lstrip().upper().startswith(EXPLAINABLE)
+        ):
+            return False
+        now = time.monotonic()
+        last = self._explained_at.get(statement)
+        if last is not None and now - last < settings.slow_query_explain_interval_s:
+            return False
+        self._explained_at[statement] = now
+        return True
+
+    async def _explain(self, engine: Engine, entry: SlowQuery, params: Any) -> None:
+        _explaining.set(True)
+        try:
+            async with AsyncEngine(engine).connect() as conn:
+                result = await conn.exec_driver_sql(
+                    "EXPLAIN (FORMAT JSON) " + entry.statement, params
+                )
+                entry.plan = result.scalar()
+                await conn.rollback()
+        except Exception:
+            logger.exception("Could not EXPLAIN slow query from %s", entry.origin)
+
+
+slow_query_log = SlowQueryLog(settings.slow_query_log_size)
+
+
+def _start_timer(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info["query_started_at"] = time.perf_counter()
+
+
+def _check_duration(conn, cursor, statement, parameters, context, executemany) -> None:
+    duration = time.perf_counter() - conn.info["query_started_at"]
+    if duration * 1000 < settings.slow_query_threshold_ms or _explaining.get():
+        return
+    if context is not None and context.compiled is not None:
+        shapes = [parameter_shape(p) for p in context.compiled_parameters]
+    else:
+        shapes = [parameter_shape(parameters)]
+    shape = shapes[0] if len(shapes) == 1 else {"rows": len(shapes), "row": shapes[0]}
+    slow_query_log.record(
+        conn.engine, statement, parameters, shape, duration, explain=not executemany
+    )
+
+
+def install(engine) -> None:
+    """Times every statement run through the async `engine`."""
+    event.listen(engine.sync_engine, "before_cursor_execute", _start_timer)
+    event.listen(engine.sync_engine, "after_cursor_execute", _check_duration)
+
+
+def uninstall(engine) -> None:
+    event.remove(engine.sync_engine, "before_cursor_execute", _start_timer)
+    event.remove(engine.sync_engine, "after_cursor_execute", _check_duration)
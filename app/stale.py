@@ -0,0 +1,51 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from app.config import settings
+
+STALE_HEADERS = {"Warning": '110 - "Response is Stale"', "X-Stale": "true"}
+
+
+class LastGoodResponses:
+    """The latest body of each recent read, to answer it while the database is
+    unavailable. Least recently stored bodies are dropped beyond
+    `stale_reads_max_bytes`."""
+
+    def __init__(self) -> None:
+        self._bodies: "OrderedDict[Hashable, Tuple[bytes, float]]" = OrderedDict()
+        self._size = 0
+        self.served = 0
+
+    def put(self, key: Hashable, body: bytes) -> None:
+        limit = settings.stale_reads_max_bytes
+        previous = self._bodies.pop(key, None)
+        if previous is not None:
+            self._size -= len(previous[0])
+        if len(body) > limit:
+            return
+        self._bodies[key] = (body, time.time())
+        self._size += len(body)
+        while self._size > limit:
+            _, (dropped, _) = self._bodies.popitem(last=False)
+            self._size -= len(dropped)
+
+    def get(self, key: Hashable) -> Optional[Tuple[bytes, Dict[str, str]]]:
+        """The stored body with the headers marking it stale, if any."""
+        item = self._bodies.get(key)
+        if item is None:
+            return None
+        body, stored_at = item
+        self.served += 1
+        age = max(0, int(time.time() - stored_at))
+        return body, dict(STALE_HEADERS, Age=str(age))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._bodies),
+            "bytes": self._size,
+            "served": self.served,
+        }
+
+
+last_good = LastGoodResponses()
@@ -0,0 +1,90 @@
+import asyncio
+import logging
+import math
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import DBAPIError
+
+from app import db
+from app.config import settings
+from app.exceptions import DatabaseUnavailable
+
+logger = logging.getLogger(__name__)
+
+# query_canceled (statement_timeout) and lock_not_available (lock_timeout)
+TIMEOUT_SQLSTATES = {"57014", "55P03"}
+
+
+async def database_timeout_handler(request: Request, exc: DBAPIError):
+    if getattr(exc.orig, "sqlstate", None) not in TIMEOUT_SQLSTATES:
+        raise exc
+    logger.warning("%s %s hit its database time budget", request.method, request.url)
+    return JSONResponse(
+        status_code=503, content={"detail": "Database timeout, try again later"}
+    )
+
+
+async def database_unavailable_handler(request: Request, exc: DatabaseUnavailable):
+    retry_after = max(1, math.ceil(db.breaker.retry_after()))
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(retry_after)},
+    )
+
+
+class CancelOnDisconnectMiddleware:
+    """Cancels the request handler as soon as the client disconnects.
+
+    The request messages are read by a watcher task and handed to the app
+    through a queue, so the watcher sees `http.disconnect` even while the
+    handler is busy. Cancelling the handler cancels the awaited asyncpg query,
+    which makes asyncpg cancel it on the server, and the session context
+    managers roll back and return the connection to the pool. Nothing is
+    cancelled once the response has been sent."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not settings.cancel_on_disconnect:
+            await self.app(scope, receive, send)
+            return
+
+        messages: asyncio.Queue = asyncio.Queue()
+        response_complete = False
+
+        async def tracking_send(message) -> None:
+            nonlocal response_complete
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get(
+                "more_body", False
+            ):
+                response_complete = True
+
+        handler = asyncio.ensure_future(self.app(scope, messages.get, tracking_send))
+
+        async def watch() -> None:
+            while True:
+                message = await receive()
+                await messages.put(message)
+                if message["type"] == "http.disconnect":
+                    # Once the response is out, let dependency teardown finish.
+                    if not response_complete:
+                        handler.cancel()
+                    return
+
+        watcher = asyncio.ensure_future(watch())
+        try:
+            await handler
+        except asyncio.CancelledError:
+            if not handler.cancelled() or asyncio.current_task().cancelling():
+                raise
+            logger.info(
+                "Client went away, cancelled %s %s", scope["method"], scope["path"]
+            )
+        finally:
+            watcher.cancel()
+            if not handler.done():
+                handler.cancel()
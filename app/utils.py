@@ -1,7 +1,9 @@
 import re
 from datetime import datetime, timezone
+from typing import List, Optional, Sequence, Tuple
 
 SIX_DIGITS = re.compile(r"^\d{6}$")
+SIX_DIGITS_CSV = re.compile(r"\d{6}(?:,\d{6})*")
 
 
 def validate_serial(serial: str) -> str:
@@ -10,11 +12,42 @@ def validate_serial(serial: str) -> str:
     return serial
 
 
+def validate_serials(serials: Sequence[str]) -> List[str]:
+    """Validates a whole batch with a single regex pass over the joined values and
+    returns it deduplicated, in the original order."""
+    if not serials:
+        return []
+    if not all(isinstance(s, str) for s in serials):
+        raise ValueError("serial_numbers must all be exactly 6 digits")
+    joined = ",".join(serials)
+    if len(joined) != 7 * len(serials) - 1 or not SIX_DIGITS_CSV.fullmatch(joined):
+        raise ValueError("serial_numbers must all be exactly 6 digits")
+    return list(dict.fromkeys(serials))
+
+
 def validate_card(card: str) -> str:
     if not isinstance(card, str) or not SIX_DIGITS.match(card):
         raise ValueError("card_number must be exactly 6 digits")
     return card
 
 
+def parse_fields(
+    raw: Optional[str], allowed: Sequence[str]
+) -> Optional[Tuple[str, ...]]:
+    """Parses a comma-separated `fields=` value into a deduplicated tuple in the
+    order given; None when no fieldset was requested."""
+    if raw is None:
+        return None
+    fields = tuple(dict.fromkeys(f.strip() for f in raw.split(",") if f.strip()))
+    if not fields:
+        raise ValueError("fields must name at least one field")
+    unknown = [f for f in fields if f not in allowed]
+    if unknown:
+        raise ValueError(
+            f"Unknown fields: {', '.join(unknown)} (allowed: {', '.join(allowed)})"
+        )
+    return fields
+
+
 def utcnow() -> datetime:
     return datetime.now(timezone.utc)
@@ -0,0 +1,22 @@
+from sqlalchemy import CheckConstraint
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app import db as app_db
+from app import models  # noqa: F401
+from app.db import Base
+
+
+async def use_sqlite_memory_db() -> None:
+    """Points app.db at a fresh in-memory SQLite database, like tests/conftest.py."""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    app_db.engine = engine
+    app_db.SessionLocal = async_sessionmaker(
+        bind=engine, expire_on_commit=False, class_=AsyncSession
+    )
+    for table in Base.metadata.tables.values():
+        for c in list(table.constraints):
+            if isinstance(c, CheckConstraint) and "~" in str(getattr(c, "sqltext", "")):
+                table.constraints.remove(c)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
@@ -0,0 +1,60 @@
+"""CPU cost and size of compressing a full `GET /books` page.
+
+Run with `python -m benchmarks.compression [--rows 500] [--repeat 200]`.
+"""
+
+import argparse
+import json
+import time
+import uuid
+
+from app.compression import GzipStream, ZstdStream, zstandard
+
+
+def sample_page(rows: int) -> bytes:
+    return json.dumps(
+        [
+            {
+                "id": str(uuid.uuid4()),
+                "serial_number": f"{i:06d}",
+                "title": f"The Pragmatic Programmer, volume {i}",
+                "author": "Andrew Hunt, David Thomas",
+                "is_borrowed": i % 3 == 0,
+                "borrowed_at": "2025-10-05T12:34:56Z" if i % 3 == 0 else None,
+                "borrowed_by": "654321" if i % 3 == 0 else None,
+            }
+            for i in range(rows)
+        ]
+    ).encode()
+
+
+def measure(factory, payload: bytes, repeat: int):
+    size = 0
+    started = time.process_time()
+    for _ in range(repeat):
+        size = len(factory().compress(payload, final=True))
+    cpu_ms = (time.process_time() - started) * 1000 / repeat
+    return size, cpu_ms
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    payload = sample_page(args.rows)
+    codecs = [("gzip", level, GzipStream) for level in (1, 6, 9)]
+    if zstandard is not None:
+        codecs += [("zstd", level, ZstdStream) for level in (1, 3, 9, 19)]
+
+    print(f"payload: {args.rows} rows, {len(payload)} bytes")
+    print(f"{'codec':<6} {'level':>5} {'bytes':>8} {'ratio':>6} {'cpu ms/req':>10}")
+    for name, level, cls in codecs:
+        size, cpu_ms = measure(lambda: cls(level), payload, args.repeat)
+        ratio = len(payload) / size
+        print(f"{name:<6} {level:>5} {size:>8} {ratio:>6.1f} {cpu_ms:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
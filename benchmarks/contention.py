@@ -0,0 +1,187 @@
+"""Lock contention of concurrent borrow/return calls on a few hot books.
+
+Compares the previous route shape, where the session comes from the `get_db`
+dependency and commits only at dependency teardown (after the response has
+been built), with the current routes, which commit before serializing. Reports
+throughput and how long the `FOR UPDATE` row lock was held per transaction.
+
+Needs a migrated PostgreSQL database configured through the usual POSTGRES_*
+settings; the benchmark creates and removes its own users and books.
+Run with `python -m benchmarks.contention [--clients 50] [--serials 3]`.
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from fastapi import APIRouter, Depends, FastAPI, HTTPException
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import delete, event, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import db as app_db
+from app.api.books import dto_to_out
+from app.api.books import router as books_router
+from app.db import get_db
+from app.exceptions import BookError
+from app.models import Book, BookTombstone, User
+from app.schemas.book import BookOut, BorrowRequest
+from app.services.authors import AuthorService
+from app.services.books import BookService
+
+SERIAL_PREFIX = "99"
+CARD_PREFIX = "98"
+
+legacy_router = APIRouter(prefix="/books")
+
+
+@legacy_router.post("/{serial_number}/borrow", response_model=BookOut)
+async def legacy_borrow(
+    serial_number: str, body: BorrowRequest, db: AsyncSession = Depends(get_db)
+):
+    try:
+        dto = await BookService(db).borrow_book(
+            serial_number=serial_number, borrower_card=body.borrower_card
+        )
+    except BookError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return dto_to_out(dto)
+
+
+@legacy_router.post("/{serial_number}/return", response_model=BookOut)
+async def legacy_return(serial_number: str, db: AsyncSession = Depends(get_db)):
+    try:
+        dto = await BookService(db).return_book(serial_number=serial_number)
+    except BookError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return dto_to_out(dto)
+
+
+def make_app(router: APIRouter) -> FastAPI:
+    app = FastAPI()
+    app.include_router(router)
+    return app
+
+
+class LockTimer:
+    def __init__(self) -> None:
+        self.held: list = []
+
+    def install(self) -> None:
+        engine = app_db.engine.sync_engine
+        event.listen(engine, "after_cursor_execute", self._locked)
+        event.listen(engine, "commit", self._released)
+        event.listen(engine, "rollback", self._released)
+
+    def _locked(self, conn, cursor, statement, parameters, context, executemany):
+        if "FOR UPDATE" in statement and "locked_at" not in conn.info:
+            conn.info["locked_at"] = time.perf_counter()
+
+    def _released(self, conn) -> None:
+        started = conn.info.pop("locked_at", None)
+        if started is not None:
+            self.held.append(time.perf_counter() - started)
+
+
+async def seed(serials: int, clients: int) -> None:
+    async with app_db.transaction_session(budget=None) as session:
+        await cleanup(session)
+        await session.execute(
+            insert(User).values(
+                [
+                    {"first_name": "Bench", "last_name": str(i), "card_number": card(i)}
+                    for i in range(clients)
+                ]
+            )
+        )
+        author = await AuthorService(session).get_or_create("Bench")
+        await session.execute(
+            insert(Book).values(
+                [
+                    {"serial_number": serial(i), "title": "Hot", "author_id": author.id}
+                    for i in range(serials)
+                ]
+            )
+        )
+
+
+async def cleanup(session: AsyncSession) -> None:
+    await session.execute(
+        delete(Book).where(Book.serial_number.startswith(SERIAL_PREFIX))
+    )
+    await session.execute(
+        delete(BookTombstone).where(
+            BookTombstone.serial_number.startswith(SERIAL_PREFIX)
+        )
+    )
+    await session.execute(delete(User).where(User.card_number.startswith(CARD_PREFIX)))
+
+
+def serial(i: int) -> str:
+    return f"{SERIAL_PREFIX}{i:04d}"
+
+
+def card(i: int) -> str:
+    return f"{CARD_PREFIX}{i:04d}"
+
+
+async def run(app: FastAPI, clients: int, serials: int, ops: int):
+    transport = ASGITransport(app=app)
+    completed = 0
+
+    async def client_loop(i: int) -> None:
+        nonlocal completed
+        async with AsyncClient(transport=transport, base_url="http://bench") as c:
+            for _ in range(ops):
+                target = serial(random.randrange(serials))
+                r = await c.post(
+                    f"/books/{target}/borrow", json={"borrower_card": card(i)}
+                )
+                if r.status_code != 200:
+                    continue
+                r = await c.post(f"/books/{target}/return")
+                if r.status_code == 200:
+                    completed += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client_loop(i) for i in range(clients)))
+    return completed, time.perf_counter() - started
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--serials", type=int, default=3)
+    parser.add_argument("--ops", type=int, default=20, help="attempts per client")
+    args = parser.parse_args()
+
+    await seed(args.serials, args.clients)
+    timer = LockTimer()
+    timer.install()
+    print(f"{args.clients} clients, {args.serials} hot books, {args.ops} attempts each")
+    print(f"{'variant':<22} {'loans/s':>8} {'lock mean ms':>13} {'lock p95 ms':>12}")
+    try:
+        for name, router in (
+            ("commit at teardown", legacy_router),
+            ("commit before output", books_router),
+        ):
+            timer.held.clear()
+            completed, elapsed = await run(
+                make_app(router), args.clients, args.serials, args.ops
+            )
+            held = timer.held or [0.0]
+            p95 = statistics.quantiles(held, n=20)[-1] if len(held) > 1 else held[0]
+            print(
+                f"{name:<22} {completed / elapsed:>8.1f} "
+                f"{statistics.mean(held) * 1000:>13.2f} {p95 * 1000:>12.2f}"
+            )
+    finally:
+        async with app_db.transaction_session(budget=None) as session:
+            await cleanup(session)
+        await app_db.engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
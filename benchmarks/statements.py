@@ -0,0 +1,113 @@
+"""Per-call overhead of the BookService hot statements, ad-hoc vs prebuilt.
+
+Measures statement construction + cache key generation alone, and a full
+`session.execute` against in-memory SQLite (so the driver cost is small and the
+Python side dominates). Run with `python -m benchmarks.statements [--calls N]`.
+"""
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import insert, select
+
+from app import db as app_db
+from app.models import Author, Book, User
+from app.services.books import BOOK_BY_SERIAL, USER_BY_CARD, list_books_statement
+from benchmarks._sqlite import use_sqlite_memory_db
+
+
+def adhoc_get_by_serial(serial):
+    return select(Book).where(Book.serial_number == serial), {}
+
+
+def prebuilt_get_by_serial(serial):
+    return BOOK_BY_SERIAL, {"serial": serial}
+
+
+def adhoc_user_by_card(card):
+    return select(User).where(User.card_number == card), {}
+
+
+def prebuilt_user_by_card(card):
+    return USER_BY_CARD, {"card": card}
+
+
+def adhoc_list_books(_):
+    stmt = (
+        select(Book)
+        .where(Book.is_borrowed == False)  # noqa: E712
+        .order_by(Book.created_at.desc())
+        .offset(0)
+        .limit(100)
+    )
+    return stmt, {}
+
+
+def prebuilt_list_books(_):
+    stmt = list_books_statement(True, False)
+    return stmt, {"is_borrowed": False, "offset": 0, "limit": 100}
+
+
+CASES = [
+    ("get_by_serial", adhoc_get_by_serial, prebuilt_get_by_serial, "123456"),
+    ("_get_user_by_card", adhoc_user_by_card, prebuilt_user_by_card, "111111"),
+    ("list_books", adhoc_list_books, prebuilt_list_books, None),
+]
+
+
+def build_cost_us(factory, arg, calls: int) -> float:
+    started = time.perf_counter()
+    for _ in range(calls):
+        stmt, _params = factory(arg)
+        stmt._generate_cache_key()
+    return (time.perf_counter() - started) * 1e6 / calls
+
+
+async def execute_cost_us(factory, arg, calls: int) -> float:
+    async with app_db.SessionLocal() as session:
+        stmt, params = factory(arg)
+        await session.execute(stmt, params)
+        started = time.perf_counter()
+        for _ in range(calls):
+            stmt, params = factory(arg)
+            (await session.execute(stmt, params)).scalars().all()
+        return (time.perf_counter() - started) * 1e6 / calls
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=5000)
+    args = parser.parse_args()
+
+    await use_sqlite_memory_db()
+    async with app_db.SessionLocal() as session:
+        await session.execute(
+            insert(User).values(first_name="U", last_name="One", card_number="111111")
+        )
+        await session.execute(insert(Author).values(id=1, name="A"))
+        await session.execute(
+            insert(Book).values(
+                [
+                    {"serial_number": f"{i:06d}", "title": "T", "author_id": 1}
+                    for i in range(100_000, 100_200)
+                ]
+            )
+        )
+        await session.commit()
+
+    print(f"{'query':<18} {'step':<8} {'ad-hoc us':>10} {'prebuilt us':>12}")
+    for name, adhoc, prebuilt, arg in CASES:
+        print(
+            f"{name:<18} {'build':<8} {build_cost_us(adhoc, arg, args.calls):>10.1f} "
+            f"{build_cost_us(prebuilt, arg, args.calls):>12.1f}"
+        )
+        calls = max(1, args.calls // 10)
+        adhoc_us = await execute_cost_us(adhoc, arg, calls)
+        prebuilt_us = await execute_cost_us(prebuilt, arg, calls)
+        print(f"{name:<18} {'execute':<8} {adhoc_us:>10.1f} {prebuilt_us:>12.1f}")
+    await app_db.engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
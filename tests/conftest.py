@@ -62,3 +62,17 @@ async def _clean_and_seed():
 async def session() -> AsyncSession:  # type: ignore
     async with app_db.SessionLocal() as session:
         yield session  # type: ignore
+
+
+@pytest.fixture
+def statements():
+    """Every SQL statement sent to the database while the test runs."""
+    seen = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        seen.append(statement)
+
+    engine = app_db.engine.sync_engine
+    event.listen(engine, "before_cursor_execute", record)
+    yield seen
+    event.remove(engine, "before_cursor_execute", record)
@@ -1,7 +1,10 @@
+import asyncio
+
 import pytest
 from fastapi import FastAPI
 from httpx import AsyncClient, ASGITransport
 from app.api.books import router
+from app.services.books import list_books_statement
 
 
 @pytest.fixture(scope="session")
@@ -161,3 +164,106 @@ async def test_set_status_borrow_and_free(client):
         and book_data["borrowed_by"] is None
         and book_data["borrowed_at"] is None
     )
+
+
+@pytest.mark.asyncio
+async def test_lookup_books(client):
+    for serial_number in ("111111", "222222"):
+        assert (await _create_book(client, serial_number)).status_code == 201
+    response = await client.post(
+        "/books/lookup", json={"serial_numbers": ["222222", "444444", "111111"]}
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert [book["serial_number"] for book in body["found"]] == ["222222", "111111"]
+    assert body["missing"] == ["444444"]
+    response = await client.post("/books/lookup", json={"serial_numbers": ["1"]})
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_sparse_fieldsets(client):
+    assert (await _create_book(client, "555555", "Dune")).status_code == 201
+    response = await client.get("/books", params={"fields": "serial_number,title"})
+    assert response.status_code == 200
+    assert response.json() == [{"serial_number": "555555", "title": "Dune"}]
+
+    response = await client.post(
+        "/books/lookup",
+        params={"fields": "is_borrowed"},
+        json={"serial_numbers": ["555555", "444444"]},
+    )
+    assert response.status_code == 200
+    assert response.json() == {"found": [{"is_borrowed": False}], "missing": ["444444"]}
+
+    response = await client.get("/books", params={"fields": "title,isbn"})
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_field_order_does_not_add_statements(client):
+    assert (await _create_book(client, "555555", "Dune")).status_code == 201
+    await client.get("/books", params={"fields": "serial_number,title"})
+    cached = list_books_statement.cache_info().currsize
+    response = await client.get("/books", params={"fields": "title,serial_number"})
+    assert list(response.json()[0]) == ["title", "serial_number"]
+    assert list_books_statement.cache_info().currsize == cached
+
+    response = await client.post(
+        "/books/lookup",
+        params={"fields": "title,serial_number"},
+        json={"serial_numbers": ["555555"]},
+    )
+    assert list(response.json()["found"][0]) == ["title", "serial_number"]
+
+
+@pytest.mark.asyncio
+async def test_borrow_over_loan_limit_returns_409(client, monkeypatch):
+    monkeypatch.setattr("app.services.books.settings.max_loans_per_card", 1)
+    for serial_number in ("123463", "123464"):
+        assert (await _create_book(client, serial_number)).status_code == 201
+    response = await client.post(
+        "/books/123463/borrow", json={"borrower_card": "111111"}
+    )
+    assert response.status_code == 200
+    response = await client.post(
+        "/books/123464/borrow", json={"borrower_card": "111111"}
+    )
+    assert response.status_code == 409
+    response = await client.patch(
+        "/books/123464/status", json={"is_borrowed": True, "borrower_card": "111111"}
+    )
+    assert response.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_lists(client):
+    for serial_number in ("111111", "222222"):
+        assert (await _create_book(client, serial_number)).status_code == 201
+    responses = await asyncio.gather(
+        *(client.get("/books", params={"is_borrowed": False}) for _ in range(10))
+    )
+    bodies = [r.json() for r in responses]
+    assert all(r.status_code == 200 for r in responses)
+    assert all(len(body) == 2 and body == bodies[0] for body in bodies)
+    response = await client.get("/books", params={"borrower_card": "12"})
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_write_commits_before_building_the_response(client, monkeypatch):
+    from app import db as app_db
+    from app.api import books as books_api
+
+    open_transactions = []
+    original = books_api.dto_to_out
+
+    def tracking_dto_to_out(dto):
+        open_transactions.append(app_db.inflight.count)
+        return original(dto)
+
+    monkeypatch.setattr(books_api, "dto_to_out", tracking_dto_to_out)
+    await _create_book(client, "123456")
+    await client.post("/books/123456/borrow", json={"borrower_card": "111111"})
+    await client.post("/books/123456/return")
+    assert open_transactions == [0, 0, 0]
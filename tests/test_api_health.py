@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+
+from app import db as app_db
+from app import lifecycle
+from app.api.books import router as books_router
+from app.api.health import router as health_router
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = FastAPI()
+    app.add_middleware(lifecycle.DrainMiddleware)
+    app.include_router(books_router)
+    app.include_router(health_router)
+    return app
+
+
+@pytest.fixture
+async def client(app):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture(autouse=True)
+def _reset_state():
+    lifecycle.state.started = False
+    lifecycle.state.draining = False
+    yield
+    lifecycle.state.started = False
+    lifecycle.state.draining = False
+
+
+@pytest.mark.asyncio
+async def test_live_always_ok(client):
+    response = await client.get("/health/live")
+    assert response.status_code == 200
+    assert response.json() == {"status": "alive"}
+
+
+@pytest.mark.asyncio
+async def test_ready_before_startup(client):
+    response = await client.get("/health/ready")
+    assert response.status_code == 503
+    assert response.json() == {"status": "starting"}
+
+
+@pytest.mark.asyncio
+async def test_ready_after_warm_up(client):
+    await lifecycle.warm_up_pool(1)
+    lifecycle.state.started = True
+    response = await client.get("/health/ready")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ready"}
+
+
+@pytest.mark.asyncio
+async def test_warm_up_fails_when_a_connection_fails(monkeypatch):
+    working = app_db.SessionLocal
+    opened = 0
+
+    def flaky():
+        nonlocal opened
+        opened += 1
+        if opened == 3:
+            raise ConnectionRefusedError("connection refused")
+        return working()
+
+    monkeypatch.setattr(app_db, "SessionLocal", flaky)
+    running = asyncio.all_tasks()
+    with pytest.raises(ConnectionRefusedError):
+        await asyncio.wait_for(lifecycle.warm_up_pool(3), timeout=5)
+    assert opened == 3
+    # No warm-up is left waiting at the barrier with a connection checked out.
+    assert asyncio.all_tasks() <= running
+
+
+@pytest.mark.asyncio
+async def test_draining_rejects_requests_but_not_probes(client):
+    lifecycle.state.started = True
+    lifecycle.state.draining = True
+    response = await client.get("/books")
+    assert response.status_code == 503
+    response = await client.get("/health/ready")
+    assert response.status_code == 503
+    assert response.json() == {"status": "draining"}
+    assert (await client.get("/health/live")).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_drain_waits_for_open_transactions():
+    async with app_db.transaction_session():
+        assert app_db.inflight.count == 1
+        assert await lifecycle.drain(timeout=0.01) is False
+
+    async def _short_transaction():
+        async with app_db.transaction_session():
+            await asyncio.sleep(0.01)
+
+    task = asyncio.create_task(_short_transaction())
+    await asyncio.sleep(0)
+    assert await lifecycle.drain(timeout=1) is True
+    await task
+    assert app_db.inflight.count == 0
@@ -0,0 +1,65 @@
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import func, select
+
+from app.api.authors import router as authors_router
+from app.api.books import router as books_router
+from app.models import Author
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = FastAPI()
+    app.include_router(books_router)
+    app.include_router(authors_router)
+    return app
+
+
+@pytest.fixture
+async def client(app):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+async def _create_book(client, serial, author):
+    r = await client.post(
+        "/books", json={"serial_number": serial, "title": "T", "author": author}
+    )
+    assert r.status_code == 201
+    return r.json()
+
+
+@pytest.mark.asyncio
+async def test_authors_are_shared_case_insensitively(client, session):
+    await _create_book(client, "100001", "Ursula K. Le Guin")
+    book = await _create_book(client, "100002", " ursula k. le guin ")
+    assert book["author"] == "Ursula K. Le Guin"
+    assert await session.scalar(select(func.count()).select_from(Author)) == 1
+
+
+@pytest.mark.asyncio
+async def test_filter_books_by_author(client):
+    await _create_book(client, "100001", "Le Guin")
+    await _create_book(client, "100002", "Banks")
+    await _create_book(client, "100003", "le guin")
+
+    r = await client.get("/books", params={"author": "LE GUIN"})
+    assert [b["serial_number"] for b in r.json()] == ["100003", "100001"]
+    r = await client.get("/books", params={"author": "Le"})
+    assert r.json() == []
+
+
+@pytest.mark.asyncio
+async def test_browse_authors_with_counts(client):
+    await _create_book(client, "100001", "Banks")
+    await _create_book(client, "100002", "adams")
+    await _create_book(client, "100003", "Banks")
+    await _create_book(client, "100004", "Card")
+    assert (await client.delete("/books/100004")).status_code == 204
+
+    r = await client.get("/authors", params={"limit": 1})
+    assert r.json() == [{"name": "adams", "book_count": 1}]
+    r = await client.get("/authors", params={"after": "Adams"})
+    assert r.json() == [{"name": "Banks", "book_count": 2}]
@@ -0,0 +1,201 @@
+import asyncio
+import uuid
+from datetime import timedelta
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import delete, insert
+
+from app import db as app_db
+from app.api.admin import router as admin_router
+from app.api.books import router as books_router
+from app.availability import availability
+from app.models import Book, BookTombstone
+from app.services.authors import AuthorService
+from app.utils import utcnow
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = FastAPI()
+    app.include_router(books_router)
+    app.include_router(admin_router)
+    return app
+
+
+@pytest.fixture
+async def client(app, monkeypatch):
+    monkeypatch.setattr("app.availability.settings.change_feed_lag_seconds", 0)
+    monkeypatch.setattr("app.services.changes.settings.change_feed_lag_seconds", 0)
+    async with app_db.transaction_session() as session:
+        await availability.load(session)
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+async def _create_book(client, serial):
+    r = await client.post(
+        "/books", json={"serial_number": serial, "title": "T", "author": "A"}
+    )
+    assert r.status_code == 201
+
+
+@pytest.mark.asyncio
+async def test_index_follows_writes(client):
+    await _create_book(client, "123456")
+    r = await client.get("/books/123456/available")
+    assert r.json() == {"serial_number": "123456", "available": True}
+
+    await client.post("/books/123456/borrow", json={"borrower_card": "111111"})
+    assert (await client.get("/books/123456/available")).json()["available"] is False
+
+    await client.post("/books/123456/return")
+    assert (await client.get("/books/123456/available")).json()["available"] is True
+
+    await client.delete("/books/123456")
+    assert (await client.get("/books/123456/available")).status_code == 404
+    assert (await client.get("/books/12x456/available")).status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_bulk_availability(client):
+    await _create_book(client, "100001")
+    await _create_book(client, "100002")
+    await client.post("/books/100002/borrow", json={"borrower_card": "111111"})
+
+    r = await client.post(
+        "/books/availability",
+        json={"serial_numbers": ["100001", "100002", "100003", "100001"]},
+    )
+    assert r.json() == {
+        "available": ["100001"],
+        "borrowed": ["100002"],
+        "missing": ["100003"],
+    }
+
+
+@pytest.mark.asyncio
+async def test_failed_write_does_not_change_index(client):
+    await _create_book(client, "100001")
+    r = await client.post("/books/100001/borrow", json={"borrower_card": "999999"})
+    assert r.status_code == 404
+    assert availability.status("100001") is False
+
+
+@pytest.mark.asyncio
+async def test_sync_applies_changes_from_other_workers(client):
+    async with app_db.transaction_session() as session:
+        author = await AuthorService(session).get_or_create("A")
+        await session.execute(
+            insert(Book).values(serial_number="200001", title="T", author_id=author.id)
+        )
+    assert availability.status("200001") is None
+
+    async with app_db.transaction_session() as session:
+        assert await availability.sync(session) == 1
+    assert availability.status("200001") is False
+
+    async with app_db.transaction_session() as session:
+        await session.execute(delete(Book).where(Book.serial_number == "200001"))
+        await session.execute(
+            insert(BookTombstone).values(book_id=uuid.uuid4(), serial_number="200001")
+        )
+    async with app_db.transaction_session() as session:
+        await availability.sync(session)
+    assert availability.status("200001") is None
+
+
+@pytest.mark.asyncio
+async def test_sync_applies_tombstones_and_books_in_commit_order(client, monkeypatch):
+    monkeypatch.setattr("app.availability.SYNC_PAGE_SIZE", 1)
+    start = utcnow()
+
+    def at(ms):
+        return start + timedelta(milliseconds=ms)
+
+    async with app_db.transaction_session() as session:
+        author = await AuthorService(session).get_or_create("A")
+        # An earlier copy of 200001 was deleted after 200002, then re-created.
+        for serial, ms in (("200002", 1), ("200001", 2)):
+            await session.execute(
+                insert(BookTombstone).values(
+                    book_id=uuid.uuid4(), serial_number=serial, deleted_at=at(ms)
+                )
+            )
+        await session.execute(
+            insert(Book).values(
+                serial_number="200001",
+                title="T",
+                author_id=author.id,
+                created_at=at(3),
+                updated_at=at(3),
+            )
+        )
+    await asyncio.sleep(0.01)
+    async with app_db.transaction_session() as session:
+        assert await availability.sync(session) == 3
+    assert availability.status("200001") is False
+    assert availability.status("200002") is None
+
+
+class _SlowSnapshotSession:
+    """Session whose catalog scan returns `rows` once `ready` is set."""
+
+    def __init__(self, rows, ready: asyncio.Event) -> None:
+        self.rows = rows
+        self.ready = ready
+
+    async def stream(self, statement):
+        return self
+
+    async def partitions(self, size):
+        await self.ready.wait()
+        yield self.rows
+
+
+@pytest.mark.asyncio
+async def test_overlapping_checks_keep_their_concurrent_writes(client):
+    scanned = asyncio.Event()
+    first = asyncio.create_task(
+        availability.check(
+            _SlowSnapshotSession([("100001", False)], scanned), repair=True
+        )
+    )
+    await asyncio.sleep(0)
+    done = asyncio.Event()
+    done.set()
+    second = asyncio.create_task(availability.check(_SlowSnapshotSession([], done)))
+    await asyncio.sleep(0)
+    # Committed while the first scan is running.
+    availability.set("100002", True, False)
+    scanned.set()
+    await asyncio.gather(first, second)
+    assert availability.status("100001") is False
+    assert availability.status("100002") is False
+
+
+@pytest.mark.asyncio
+async def test_check_reports_and_repairs_drift(client):
+    await _create_book(client, "100001")
+    r = await client.get("/admin/availability/check")
+    assert r.json() == {"books": 1, "mismatches": 0, "sample": [], "repaired": False}
+
+    availability.set("999999", True, True)
+    availability.set("100001", False, False)
+    r = await client.get("/admin/availability/check")
+    assert r.json()["mismatches"] == 3
+    assert r.json()["sample"] == ["100001", "999999"]
+    assert availability.status("999999") is True
+
+    r = await client.get("/admin/availability/check", params={"repair": True})
+    assert r.json()["repaired"] is True
+    assert availability.status("999999") is None
+    assert availability.status("100001") is False
+
+
+@pytest.mark.asyncio
+async def test_not_loaded_returns_503(client, monkeypatch):
+    monkeypatch.setattr(availability, "loaded", False)
+    assert (await client.get("/books/123456/available")).status_code == 503
@@ -0,0 +1,86 @@
+import pytest
+from sqlalchemy import insert
+
+from app.cards import card_cache
+from app.exceptions import (
+    BookAlreadyBorrowed,
+    BookNotBorrowed,
+    BookNotFound,
+    UserNotFound,
+)
+from app.models import User
+from app.services.books import BookService
+from app.services.holds import HoldService
+
+
+@pytest.fixture
+async def cards(session):
+    await card_cache.load(session)
+    yield card_cache
+
+
+@pytest.mark.asyncio
+async def test_borrow_with_cached_card_skips_user_lookup(session, cards, statements):
+    service = BookService(session)
+    await service.add_book(serial_number="123456", title="T", author="A")
+    statements.clear()
+
+    await service.borrow_book(serial_number="123456", borrower_card="111111")
+    assert not [s for s in statements if s.startswith("SELECT") and "users" in s]
+
+
+@pytest.mark.asyncio
+async def test_unknown_card_is_refused(session, cards):
+    service = BookService(session)
+    await service.add_book(serial_number="123456", title="T", author="A")
+    with pytest.raises(UserNotFound):
+        await service.borrow_book(serial_number="123456", borrower_card="444444")
+    with pytest.raises(UserNotFound):
+        await service.set_status(
+            serial_number="123456", is_borrowed=True, borrower_card="444444"
+        )
+
+
+@pytest.mark.asyncio
+async def test_book_errors_take_precedence_over_card_errors(session, cards):
+    service = BookService(session)
+    for card in ("444444", "12345"):
+        with pytest.raises(BookNotFound):
+            await service.borrow_book(serial_number="123456", borrower_card=card)
+        with pytest.raises(BookNotFound):
+            await service.set_status(
+                serial_number="123456", is_borrowed=True, borrower_card=card
+            )
+    await service.add_book(serial_number="123456", title="T", author="A")
+    with pytest.raises(BookNotBorrowed):
+        await HoldService(session).place_hold("123456", "444444")
+    await service.borrow_book(serial_number="123456", borrower_card="111111")
+    for card in ("444444", "12345"):
+        with pytest.raises(BookAlreadyBorrowed):
+            await service.borrow_book(serial_number="123456", borrower_card=card)
+
+
+@pytest.mark.asyncio
+async def test_new_user_is_found_and_cached(session, cards):
+    await session.execute(
+        insert(User).values(first_name="U", last_name="Four", card_number="444444")
+    )
+    assert "444444" not in cards
+    assert await cards.is_registered(session, "444444") is True
+    assert "444444" in cards
+
+
+@pytest.mark.asyncio
+async def test_stale_cached_card_is_rejected_and_dropped(session, cards):
+    service = BookService(session)
+    await service.add_book(serial_number="123456", title="T", author="A")
+    cards.add("444444")
+    with pytest.raises(UserNotFound):
+        await service.borrow_book(serial_number="123456", borrower_card="444444")
+    assert "444444" not in cards
+
+    await service.borrow_book(serial_number="123456", borrower_card="111111")
+    cards.add("555555")
+    with pytest.raises(UserNotFound):
+        await HoldService(session).place_hold("123456", "555555")
+    assert "555555" not in cards
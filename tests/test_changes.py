@@ -0,0 +1,74 @@
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+
+from app.api.books import router as books_router
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = FastAPI()
+    app.include_router(books_router)
+    return app
+
+
+@pytest.fixture
+async def client(app, monkeypatch):
+    monkeypatch.setattr("app.services.changes.settings.change_feed_lag_seconds", 0)
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+async def _changes(client, since=None, limit=500):
+    params = {"limit": limit}
+    if since:
+        params["since"] = since
+    response = await client.get("/books/changes", params=params)
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.asyncio
+async def test_change_feed_pages_and_resumes(client):
+    for serial in ("100001", "100002", "100003"):
+        await client.post(
+            "/books", json={"serial_number": serial, "title": "T", "author": "A"}
+        )
+
+    page = await _changes(client, limit=2)
+    assert [b["serial_number"] for b in page["books"]] == ["100001", "100002"]
+    assert page["has_more"] is True
+    page = await _changes(client, page["next_token"], limit=2)
+    assert [b["serial_number"] for b in page["books"]] == ["100003"]
+    assert page["has_more"] is False
+    token = page["next_token"]
+
+    empty = await _changes(client, token)
+    assert empty["books"] == [] and empty["deleted"] == []
+    assert empty["next_token"] == token
+
+    await client.post("/books/100001/borrow", json={"borrower_card": "111111"})
+    await client.delete("/books/100002")
+    page = await _changes(client, token)
+    assert [(b["serial_number"], b["is_borrowed"]) for b in page["books"]] == [
+        ("100001", True)
+    ]
+    assert [d["serial_number"] for d in page["deleted"]] == ["100002"]
+    page = await _changes(client, page["next_token"])
+    assert page["books"] == [] and page["deleted"] == []
+
+
+@pytest.mark.asyncio
+async def test_change_feed_holds_back_recent_rows(client, monkeypatch):
+    monkeypatch.setattr("app.services.changes.settings.change_feed_lag_seconds", 60)
+    await client.post(
+        "/books", json={"serial_number": "100001", "title": "T", "author": "A"}
+    )
+    assert (await _changes(client))["books"] == []
+
+
+@pytest.mark.asyncio
+async def test_change_feed_rejects_bad_token(client):
+    response = await client.get("/books/changes", params={"since": "not-a-token"})
+    assert response.status_code == 400
@@ -0,0 +1,117 @@
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+
+from app import db as app_db
+from app.api.books import router as books_router
+from app.api.stats import router as stats_router
+from app.circulation import circulation
+from app.services.circulation import CirculationService, period_start
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = FastAPI()
+    app.include_router(books_router)
+    app.include_router(stats_router)
+    return app
+
+
+@pytest.fixture
+async def client(app):
+    # Counts left over from other tests' loans.
+    circulation.take()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+def test_period_start():
+    at = datetime(2025, 10, 9, 13, 45, 12, tzinfo=timezone.utc)  # a Thursday
+    assert period_start(at, "hour") == at.replace(minute=0, second=0)
+    assert period_start(at, "day") == datetime(2025, 10, 9, tzinfo=timezone.utc)
+    assert period_start(at, "week") == datetime(2025, 10, 6, tzinfo=timezone.utc)
+
+
+@pytest.mark.asyncio
+async def test_loans_are_counted_and_flushed(client):
+    await client.post(
+        "/books", json={"serial_number": "100001", "title": "T", "author": "A"}
+    )
+    for card in ("111111", "222222"):
+        r = await client.post("/books/100001/borrow", json={"borrower_card": card})
+        assert r.status_code == 200
+        r = await client.post("/books/100001/return")
+        assert r.status_code == 200
+    # Rolled back: the book is already borrowed.
+    await client.post("/books/100001/borrow", json={"borrower_card": "111111"})
+    r = await client.post("/books/100001/borrow", json={"borrower_card": "222222"})
+    assert r.status_code == 409
+    # Lent straight to another card: one return and one borrow.
+    r = await client.patch(
+        "/books/100001/status", json={"is_borrowed": True, "borrower_card": "333333"}
+    )
+    assert r.status_code == 200
+
+    # One row each for the hour, the day and the week.
+    assert await circulation.flush() == 3
+    r = await client.get("/stats/circulation?granularity=hour&periods=3")
+    assert r.status_code == 200
+    series = r.json()
+    assert len(series) == 3
+    assert [(p["borrows"], p["returns"]) for p in series] == [
+        (0, 0),
+        (0, 0),
+        (4, 3),
+    ]
+
+    # A second flush adds to the stored bucket.
+    await client.post("/books/100001/return")
+    await circulation.flush()
+    series = (await client.get("/stats/circulation?granularity=week")).json()
+    assert len(series) == 30
+    assert (series[-1]["borrows"], series[-1]["returns"]) == (4, 4)
+
+
+@pytest.mark.asyncio
+async def test_deleting_a_borrowed_book_counts_a_return(client):
+    await client.post(
+        "/books", json={"serial_number": "100001", "title": "T", "author": "A"}
+    )
+    await client.post("/books/100001/borrow", json={"borrower_card": "111111"})
+    r = await client.delete("/books/100001", params={"allow_if_borrowed": True})
+    assert r.status_code == 204
+    await circulation.flush()
+    series = (await client.get("/stats/circulation?granularity=day&periods=1")).json()
+    assert (series[0]["borrows"], series[0]["returns"]) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_hourly_counts_are_rolled_up_per_day_and_week():
+    circulation.take()
+
+    def at(day, hour, minute=0):
+        return datetime(2025, 10, day, hour, minute, tzinfo=timezone.utc)
+
+    for when in (at(6, 23), at(7, 10, 20), at(7, 10, 40), at(8, 0), at(9, 13, 10)):
+        circulation.on_borrowed(at=when)
+    for _ in range(3):
+        circulation.on_borrowed(at=at(8, 23, 59))
+    circulation.on_returned(at=at(9, 1))
+    # Six hours, four days and one week.
+    assert await circulation.flush() == 11
+    async with app_db.transaction_session("read") as session:
+        service = CirculationService(session)
+        days = await service.series("day", 3, now=at(9, 14))
+        weeks = await service.series("week", 2, now=at(9, 14))
+    assert [(p.start.day, p.borrows, p.returns) for p in days] == [
+        (7, 2, 0),
+        (8, 4, 0),
+        (9, 1, 1),
+    ]
+    assert [(p.start.day, p.borrows, p.returns) for p in weeks] == [
+        (29, 0, 0),
+        (6, 8, 1),
+    ]
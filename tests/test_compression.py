@@ -0,0 +1,93 @@
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from httpx import AsyncClient, ASGITransport
+
+from app.compression import CompressionMiddleware, negotiate, zstandard
+
+ROWS = [{"serial_number": f"{i:06d}", "title": "Clean Code" * 5} for i in range(200)]
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware)
+
+    @app.get("/big")
+    async def big():
+        return ROWS
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/stream")
+    async def stream():
+        async def rows():
+            for row in ROWS:
+                yield (json.dumps(row) + "\n").encode()
+
+        return StreamingResponse(rows(), media_type="application/x-ndjson")
+
+    return app
+
+
+@pytest.fixture
+async def client(app):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("gzip", "gzip"),
+        ("gzip, deflate, br", "gzip"),
+        ("gzip;q=0", None),
+        ("identity", None),
+        ("*", "zstd" if zstandard else "gzip"),
+        ("gzip;q=1.0, zstd;q=0.5", "gzip"),
+    ],
+)
+def test_negotiate(header, expected):
+    assert negotiate(header) == expected
+
+
+@pytest.mark.asyncio
+async def test_large_json_is_gzipped(client):
+    response = await client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(json.dumps(ROWS))
+    assert response.json() == ROWS
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(zstandard is None, reason="zstandard not installed")
+async def test_large_json_is_zstd_compressed(client):
+    response = await client.get("/big", headers={"Accept-Encoding": "zstd, gzip"})
+    assert response.headers["content-encoding"] == "zstd"
+    assert response.json() == ROWS
+
+
+@pytest.mark.asyncio
+async def test_small_or_unaccepted_responses_are_not_compressed(client):
+    response = await client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.json() == {"ok": True}
+    response = await client.get("/big", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.json() == ROWS
+
+
+@pytest.mark.asyncio
+async def test_streamed_response_is_compressed(client):
+    response = await client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    lines = response.text.splitlines()
+    assert [json.loads(line) for line in lines] == ROWS
@@ -0,0 +1,142 @@
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy.exc import DBAPIError, IntegrityError, InterfaceError
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+
+from app import db as app_db
+from app.api.books import router as books_router
+from app.exceptions import DatabaseUnavailable
+from app.timeouts import database_unavailable_handler
+
+
+class Unreachable:
+    """Session factory of a database that refuses connections."""
+
+    calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self
+
+    async def __aenter__(self):
+        raise ConnectionRefusedError("connection refused")
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class _Orig(Exception):
+    def __init__(self, sqlstate):
+        self.sqlstate = sqlstate
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = FastAPI()
+    app.add_exception_handler(DatabaseUnavailable, database_unavailable_handler)
+    app.include_router(books_router)
+    return app
+
+
+@pytest.fixture(autouse=True)
+def _close_breaker(monkeypatch):
+    monkeypatch.setattr("app.db.settings.db_breaker_failure_threshold", 2)
+    yield
+    app_db.breaker.record_success()
+
+
+@pytest.fixture
+async def client(app, monkeypatch):
+    monkeypatch.setattr("app.api.books.settings.read_coalescing_window_ms", 0)
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+def test_outage_errors():
+    assert app_db.is_outage(ConnectionRefusedError())
+    assert app_db.is_outage(DBAPIError("SELECT 1", {}, _Orig("08006")))
+    assert app_db.is_outage(DBAPIError("SELECT 1", {}, _Orig("57P01")))
+    assert app_db.is_outage(InterfaceError("SELECT 1", {}, _Orig(None)))
+    assert not app_db.is_outage(DBAPIError("SELECT 1", {}, _Orig("57014")))
+    assert not app_db.is_outage(DBAPIError("SELECT 1", {}, _Orig("57P05")))
+    assert not app_db.is_outage(PoolTimeout("QueuePool limit reached"))
+    assert not app_db.is_outage(IntegrityError("INSERT", {}, _Orig("23505")))
+
+
+class PoolExhausted(Unreachable):
+    async def __aenter__(self):
+        raise PoolTimeout("QueuePool limit reached")
+
+
+@pytest.mark.asyncio
+async def test_pool_timeouts_leave_the_breaker_closed(monkeypatch):
+    monkeypatch.setattr(app_db, "SessionLocal", PoolExhausted())
+    for _ in range(3):
+        with pytest.raises(DatabaseUnavailable):
+            async with app_db.transaction_session("read"):
+                pass
+    assert app_db.breaker.state == "closed"
+    assert app_db.breaker.failures == 0
+
+
+@pytest.mark.asyncio
+async def test_reads_are_served_stale_while_the_database_is_down(client, monkeypatch):
+    r = await client.post(
+        "/books", json={"serial_number": "100001", "title": "T", "author": "A"}
+    )
+    assert r.status_code == 201
+    fresh = await client.get("/books?limit=5")
+    assert fresh.status_code == 200 and "x-stale" not in fresh.headers
+
+    unreachable = Unreachable()
+    monkeypatch.setattr(app_db, "SessionLocal", unreachable)
+    for _ in range(2):
+        r = await client.get("/books?limit=5")
+        assert r.status_code == 200
+        assert r.content == fresh.content
+        assert r.headers["x-stale"] == "true"
+        assert r.headers["warning"].startswith("110")
+    assert app_db.breaker.state == "open"
+
+    # Open: no connection attempts, unknown reads and writes get a quick 503.
+    r = await client.get("/books?limit=6")
+    assert r.status_code == 503
+    assert int(r.headers["retry-after"]) >= 1
+    r = await client.post("/books/100001/borrow", json={"borrower_card": "111111"})
+    assert r.status_code == 503
+    assert unreachable.calls == 2
+    assert (await client.get("/books?limit=5")).headers["x-stale"] == "true"
+
+
+@pytest.mark.asyncio
+async def test_half_open_probe_closes_the_breaker(client, monkeypatch):
+    working = app_db.SessionLocal
+    monkeypatch.setattr(app_db, "SessionLocal", Unreachable())
+    for _ in range(2):
+        assert (await client.get("/books?limit=7")).status_code == 503
+    assert app_db.breaker.state == "open"
+
+    monkeypatch.setattr(app_db, "SessionLocal", working)
+    monkeypatch.setattr("app.db.settings.db_breaker_reset_timeout_s", 0)
+    r = await client.get("/books?limit=7")
+    assert r.status_code == 200
+    assert "x-stale" not in r.headers
+    assert app_db.breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_failed_probe_reopens_the_breaker(monkeypatch):
+    monkeypatch.setattr("app.db.settings.db_breaker_reset_timeout_s", 0)
+    for _ in range(2):
+        app_db.breaker.record_failure()
+
+    async def refuse():
+        raise ConnectionRefusedError("connection refused")
+
+    monkeypatch.setattr(app_db.breaker, "_probe", refuse)
+    with pytest.raises(DatabaseUnavailable):
+        async with app_db.transaction_session("read"):
+            pass
+    assert app_db.breaker.state == "open"
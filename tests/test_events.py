@@ -0,0 +1,68 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import events
+
+
+@pytest.fixture
+def received():
+    seen = []
+
+    def handler(**payload):
+        seen.append(payload["n"])
+
+    events.subscribe("test.event", handler)
+    yield seen
+    events.unsubscribe("test.event", handler)
+
+
+@pytest.mark.asyncio
+async def test_events_dispatched_after_commit(session: AsyncSession, received):
+    async with session.begin():
+        events.emit(session, "test.event", n=1)
+        assert received == []
+    assert received == [1]
+
+
+@pytest.mark.asyncio
+async def test_events_dropped_on_rollback(session: AsyncSession, received):
+    with pytest.raises(RuntimeError):
+        async with session.begin():
+            events.emit(session, "test.event", n=1)
+            raise RuntimeError("rollback")
+    async with session.begin():
+        pass
+    assert received == []
+
+
+@pytest.mark.asyncio
+async def test_savepoint_rollback_drops_only_its_events(
+    session: AsyncSession, received
+):
+    async with session.begin():
+        events.emit(session, "test.event", n=1)
+        async with session.begin_nested():
+            events.emit(session, "test.event", n=2)
+        with pytest.raises(RuntimeError):
+            async with session.begin_nested():
+                events.emit(session, "test.event", n=3)
+                raise RuntimeError("rollback savepoint")
+        assert received == []
+    assert received == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_async_handlers_are_scheduled(session: AsyncSession):
+    seen = []
+
+    async def handler(**payload):
+        seen.append(payload["n"])
+
+    events.subscribe("test.async", handler)
+    try:
+        async with session.begin():
+            events.emit(session, "test.async", n=1)
+        await events.wait_for_handlers()
+    finally:
+        events.unsubscribe("test.async", handler)
+    assert seen == [1]
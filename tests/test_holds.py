@@ -0,0 +1,130 @@
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+
+from app import events
+from app.api.books import router as books_router
+from app.api.holds import router as holds_router
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = FastAPI()
+    app.include_router(books_router)
+    app.include_router(holds_router)
+    return app
+
+
+@pytest.fixture
+async def client(app):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture
+def fulfilled():
+    seen = []
+
+    def handler(**payload):
+        seen.append(payload)
+
+    events.subscribe("hold.fulfilled", handler)
+    yield seen
+    events.unsubscribe("hold.fulfilled", handler)
+
+
+async def _borrowed_book(client, serial="123456", card="111111"):
+    await client.post(
+        "/books", json={"serial_number": serial, "title": "T", "author": "A"}
+    )
+    response = await client.post(
+        f"/books/{serial}/borrow", json={"borrower_card": card}
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_return_assigns_book_to_head_of_queue(client, fulfilled):
+    await _borrowed_book(client)
+    first = await client.post("/books/123456/holds", json={"borrower_card": "222222"})
+    second = await client.post("/books/123456/holds", json={"borrower_card": "333333"})
+    assert first.status_code == 201 and first.json()["position"] == 1
+    assert second.status_code == 201 and second.json()["position"] == 2
+
+    response = await client.post("/books/123456/return")
+    assert response.status_code == 200
+    book = response.json()
+    assert book["is_borrowed"] is True and book["borrowed_by"] == "222222"
+    assert [e["card_number"] for e in fulfilled] == ["222222"]
+
+    holds = (await client.get("/books/123456/holds")).json()
+    assert [(h["card_number"], h["position"]) for h in holds] == [("333333", 1)]
+
+    response = await client.post("/books/123456/return")
+    assert response.json()["borrowed_by"] == "333333"
+    response = await client.post("/books/123456/return")
+    assert response.json()["is_borrowed"] is False
+    assert (await client.get("/books/123456/holds")).json() == []
+
+
+@pytest.mark.asyncio
+async def test_setting_status_available_assigns_book_to_head_of_queue(
+    client, fulfilled
+):
+    await _borrowed_book(client)
+    await client.post("/books/123456/holds", json={"borrower_card": "222222"})
+
+    response = await client.patch("/books/123456/status", json={"is_borrowed": False})
+    assert response.status_code == 200
+    book = response.json()
+    assert book["is_borrowed"] is True and book["borrowed_by"] == "222222"
+    assert [e["card_number"] for e in fulfilled] == ["222222"]
+    assert (await client.get("/books/123456/holds")).json() == []
+
+    response = await client.post(
+        "/books/123456/borrow", json={"borrower_card": "333333"}
+    )
+    assert response.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_hold_rules(client):
+    await client.post(
+        "/books", json={"serial_number": "123456", "title": "T", "author": "A"}
+    )
+    response = await client.post(
+        "/books/123456/holds", json={"borrower_card": "222222"}
+    )
+    assert response.status_code == 409
+
+    await client.post("/books/123456/borrow", json={"borrower_card": "111111"})
+    response = await client.post(
+        "/books/123456/holds", json={"borrower_card": "111111"}
+    )
+    assert response.status_code == 409
+    response = await client.post(
+        "/books/123456/holds", json={"borrower_card": "999999"}
+    )
+    assert response.status_code == 404
+    assert (
+        await client.post("/books/123456/holds", json={"borrower_card": "222222"})
+    ).status_code == 201
+    response = await client.post(
+        "/books/123456/holds", json={"borrower_card": "222222"}
+    )
+    assert response.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_cancel_hold(client):
+    await _borrowed_book(client)
+    hold = (
+        await client.post("/books/123456/holds", json={"borrower_card": "222222"})
+    ).json()
+    response = await client.delete(f"/books/123456/holds/{hold['id']}")
+    assert response.status_code == 204
+    response = await client.delete(f"/books/123456/holds/{hold['id']}")
+    assert response.status_code == 404
+    response = await client.post("/books/123456/return")
+    assert response.json()["is_borrowed"] is False
@@ -0,0 +1,79 @@
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+
+from app.api.books import router as books_router
+from app.api.inventory import router as inventory_router
+from app.bitset import DigitBitset
+from app.services.inventory import read_scans
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = FastAPI()
+    app.include_router(books_router)
+    app.include_router(inventory_router)
+    return app
+
+
+@pytest.fixture
+async def client(app):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+async def _chunks(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+def test_bitset_set_operations():
+    a, b = DigitBitset(), DigitBitset()
+    for key in ("000001", "000500", "999999"):
+        a.add(key)
+    b.add("000500")
+    b.add("123456")
+    assert list(a - b) == ["000001", "999999"]
+    assert list(a & b) == ["000500"]
+    assert list(a | b) == ["000001", "000500", "123456", "999999"]
+    assert len(a) == 3
+
+
+@pytest.mark.asyncio
+async def test_read_scans_across_chunk_boundaries():
+    scans = await read_scans(_chunks(b"100001\r\n1000", b"02,100001 12x4", b"56\n\n"))
+    assert list(scans.serials) == ["100001", "100002"]
+    assert scans.total == 4
+    assert scans.invalid == 1
+    assert scans.invalid_sample == ["12x456"]
+
+
+@pytest.mark.asyncio
+async def test_audit(client):
+    for serial in ("100001", "100002", "100003", "100004"):
+        r = await client.post(
+            "/books", json={"serial_number": serial, "title": "T", "author": "A"}
+        )
+        assert r.status_code == 201
+    for serial in ("100003", "100004"):
+        r = await client.post(
+            f"/books/{serial}/borrow", json={"borrower_card": "111111"}
+        )
+        assert r.status_code == 200
+
+    r = await client.post(
+        "/inventory/audit",
+        content=_chunks(b"100002\n100004\n", b"100002\n999999\nabc\n"),
+        headers={"content-type": "text/plain"},
+    )
+    assert r.status_code == 200
+    assert r.json() == {
+        "scans": 5,
+        "distinct_serials": 3,
+        "missing": ["100001"],
+        "borrowed_on_shelf": ["100004"],
+        "unknown": ["999999"],
+        "invalid": 1,
+        "invalid_sample": ["abc"],
+    }
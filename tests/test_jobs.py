@@ -0,0 +1,157 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import func, select
+
+from app import db as app_db
+from app.api.books import router as books_router
+from app.api.jobs import router as jobs_router
+from app.exceptions import DatabaseUnavailable, JobQueueFull
+from app.models import Job
+from app.services.holds import HoldService
+from app.services.jobs import OPERATIONS, JobService, runner
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = FastAPI()
+    app.include_router(books_router)
+    app.include_router(jobs_router)
+    return app
+
+
+@pytest.fixture
+async def client(app):
+    await runner.start(workers=2, queue_size=10)
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+    await runner.stop(timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_import_job_reports_progress_and_errors(client, monkeypatch):
+    monkeypatch.setattr("app.services.jobs.settings.job_chunk_size", 2)
+    books = [
+        {"serial_number": serial, "title": "T", "author": "A"}
+        for serial in ("100001", "100002", "100001", "100003", "100004")
+    ]
+    response = await client.post("/books/bulk/import", json={"books": books})
+    assert response.status_code == 202
+    accepted = response.json()
+    await runner.join()
+
+    response = await client.get(accepted["status_url"])
+    assert response.status_code == 200
+    job = response.json()
+    assert job["status"] == "completed_with_errors"
+    assert (job["total"], job["processed"]) == (5, 5)
+    assert (job["succeeded"], job["failed"]) == (4, 1)
+    assert job["errors"][0]["index"] == 2
+    assert job["errors"][0]["serial_number"] == "100001"
+    response = await client.get("/books")
+    assert len(response.json()) == 4
+
+
+@pytest.mark.asyncio
+async def test_bulk_status_job(client):
+    for serial in ("100001", "100002"):
+        await client.post(
+            "/books", json={"serial_number": serial, "title": "T", "author": "A"}
+        )
+    items = [
+        {"serial_number": "100001", "is_borrowed": True, "borrower_card": "111111"},
+        {"serial_number": "100002", "is_borrowed": True, "borrower_card": "999999"},
+    ]
+    response = await client.post("/books/bulk/status", json={"items": items})
+    assert response.status_code == 202
+    await runner.join()
+
+    job = (await client.get(response.json()["status_url"])).json()
+    assert (job["succeeded"], job["failed"]) == (1, 1)
+    borrowed = (await client.get("/books", params={"is_borrowed": True})).json()
+    assert [book["serial_number"] for book in borrowed] == ["100001"]
+
+
+@pytest.mark.asyncio
+async def test_bulk_status_release_assigns_book_to_head_of_queue(client):
+    await client.post(
+        "/books", json={"serial_number": "100001", "title": "T", "author": "A"}
+    )
+    await client.post("/books/100001/borrow", json={"borrower_card": "111111"})
+    async with app_db.transaction_session() as session:
+        await HoldService(session).place_hold("100001", "222222")
+
+    items = [{"serial_number": "100001", "is_borrowed": False}]
+    response = await client.post("/books/bulk/status", json={"items": items})
+    assert response.status_code == 202
+    await runner.join()
+
+    job = (await client.get(response.json()["status_url"])).json()
+    assert (job["succeeded"], job["failed"]) == (1, 0)
+    [book] = (await client.get("/books")).json()
+    assert book["is_borrowed"] is True and book["borrowed_by"] == "222222"
+
+
+@pytest.mark.asyncio
+async def test_submission_waiting_on_the_database_keeps_its_slot(monkeypatch):
+    await runner.stop(timeout=1)
+    await runner.start(workers=1, queue_size=1)
+    inserting = asyncio.Event()
+    create = JobService.create
+
+    async def slow_create(self, *args, **kwargs):
+        await inserting.wait()
+        return await create(self, *args, **kwargs)
+
+    monkeypatch.setattr(JobService, "create", slow_create)
+    first = asyncio.create_task(runner.submit("set_status", []))
+    await asyncio.sleep(0.01)
+    with pytest.raises(JobQueueFull):
+        await asyncio.wait_for(runner.submit("set_status", []), timeout=1)
+    inserting.set()
+    await first
+    await runner.stop(timeout=1)
+    async with app_db.transaction_session("read") as session:
+        assert await session.scalar(select(func.count()).select_from(Job)) == 1
+
+
+@pytest.mark.asyncio
+async def test_worker_survives_a_failure_to_mark_a_job_failed(client, monkeypatch):
+    await runner.stop(timeout=1)
+    await runner.start(workers=1, queue_size=10)
+
+    async def crash(svc, item):
+        raise RuntimeError("boom")
+
+    async def unavailable(self, job_ids):
+        raise DatabaseUnavailable("Database unavailable, try again later")
+
+    set_status = OPERATIONS["set_status"]
+    monkeypatch.setitem(OPERATIONS, "set_status", crash)
+    monkeypatch.setattr(JobService, "mark_failed", unavailable)
+    await runner.submit("set_status", [{"serial_number": "100001"}])
+    await runner.join()
+
+    monkeypatch.setitem(OPERATIONS, "set_status", set_status)
+    job = await runner.submit("set_status", [])
+    await runner.join()
+    r = await client.get(f"/jobs/{job.id}")
+    assert r.json()["status"] == "succeeded"
+
+
+@pytest.mark.asyncio
+async def test_submit_is_refused_once_the_workers_are_gone(client):
+    for task in runner._workers:
+        task.cancel()
+    await asyncio.sleep(0)
+    with pytest.raises(JobQueueFull):
+        await runner.submit("set_status", [])
+
+
+@pytest.mark.asyncio
+async def test_unknown_job_returns_404(client):
+    response = await client.get("/jobs/0f8c2a5e-6f0b-4a4e-9a53-3f1f2f0c9d11")
+    assert response.status_code == 404
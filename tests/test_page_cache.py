@@ -0,0 +1,173 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+
+from app import events
+from app.api.books import router as books_router
+from app.page_cache import MemoryBackend, PageCache, page_cache, page_key
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = FastAPI()
+    app.include_router(books_router)
+    return app
+
+
+@pytest.fixture
+async def client(app, monkeypatch):
+    monkeypatch.setattr("app.api.books.settings.read_coalescing_window_ms", 0)
+    page_cache.open(MemoryBackend())
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+    await page_cache.close()
+
+
+def test_page_key_is_normalized():
+    assert page_key("books", {"limit": 10, "offset": 0, "is_borrowed": None}) == (
+        page_key("books", {"offset": 0, "limit": 10})
+    )
+    assert page_key("books", {"is_borrowed": True, "fields": ("id", "title")}) == (
+        "books?fields=id%2Ctitle&is_borrowed=true"
+    )
+
+
+@pytest.mark.asyncio
+async def test_list_pages_are_cached_until_a_write(client):
+    hits = page_cache.hits
+    r = await client.post(
+        "/books", json={"serial_number": "123456", "title": "T", "author": "A"}
+    )
+    assert r.status_code == 201
+    await events.wait_for_handlers()
+    assert len((await client.get("/books?limit=10")).json()) == 1
+    assert len((await client.get("/books?limit=10&offset=0")).json()) == 1
+    assert page_cache.hits == hits + 1
+
+    await client.post("/books/123456/borrow", json={"borrower_card": "111111"})
+    await events.wait_for_handlers()
+    books = (await client.get("/books?limit=10")).json()
+    assert books[0]["is_borrowed"] is True
+
+
+class SlowIncrBackend(MemoryBackend):
+    """Memory backend with the round trip of a remote `INCR`."""
+
+    async def incr(self, key: str) -> int:
+        await asyncio.sleep(0.05)
+        return await super().incr(key)
+
+
+@pytest.mark.asyncio
+async def test_list_is_fresh_right_after_a_write(client):
+    page_cache.open(SlowIncrBackend())
+    r = await client.post(
+        "/books", json={"serial_number": "123456", "title": "T", "author": "A"}
+    )
+    assert r.status_code == 201
+    assert len((await client.get("/books?limit=10")).json()) == 1
+
+    r = await client.post(
+        "/books", json={"serial_number": "123457", "title": "T", "author": "A"}
+    )
+    assert r.status_code == 201
+    assert len((await client.get("/books?limit=10")).json()) == 2
+    r = await client.post("/books/123456/borrow", json={"borrower_card": "111111"})
+    assert r.status_code == 200
+    books = (await client.get("/books?limit=10&is_borrowed=true")).json()
+    assert [b["serial_number"] for b in books] == ["123456"]
+    books = (await client.get("/books?limit=10")).json()
+    assert {b["serial_number"]: b["is_borrowed"] for b in books} == {
+        "123456": True,
+        "123457": False,
+    }
+
+
+class HangingBackend(MemoryBackend):
+    """A cache server that accepts requests but never answers."""
+
+    async def get(self, key):
+        await asyncio.Event().wait()
+
+    async def incr(self, key):
+        await asyncio.Event().wait()
+
+
+@pytest.mark.asyncio
+async def test_hanging_cache_server_falls_back_to_the_database(client, monkeypatch):
+    monkeypatch.setattr("app.page_cache.settings.page_cache_timeout_s", 0.05)
+    page_cache.open(HangingBackend())
+    errors = page_cache.errors
+    r = await asyncio.wait_for(
+        client.post(
+            "/books", json={"serial_number": "123456", "title": "T", "author": "A"}
+        ),
+        timeout=2,
+    )
+    assert r.status_code == 201
+    r = await asyncio.wait_for(client.get("/books?limit=10"), timeout=2)
+    assert [b["serial_number"] for b in r.json()] == ["123456"]
+    assert page_cache.errors == errors + 2
+
+
+@pytest.mark.asyncio
+async def test_only_one_worker_computes_a_missing_page():
+    backend = MemoryBackend()
+    workers = [PageCache(), PageCache()]
+    for worker in workers:
+        worker.open(backend)
+    calls = 0
+
+    async def produce():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return b"[]"
+
+    results = await asyncio.gather(
+        *(w.get_or_compute("books", {"limit": 1}, produce) for w in workers * 3)
+    )
+    assert results == [b"[]"] * 6
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_page_is_served_while_one_worker_refreshes(monkeypatch):
+    monkeypatch.setattr("app.page_cache.settings.page_cache_ttl_s", 0)
+    cache = PageCache()
+    cache.open(MemoryBackend())
+    bodies = iter([b"old", b"new"])
+    refreshing = asyncio.Event()
+
+    async def produce():
+        body = next(bodies)
+        if body == b"new":
+            refreshing.set()
+            await asyncio.sleep(0.05)
+        return body
+
+    assert await cache.get_or_compute("books", {}, produce) == b"old"
+    refresh = asyncio.ensure_future(cache.get_or_compute("books", {}, produce))
+    await refreshing.wait()
+    assert await cache.get_or_compute("books", {}, produce) == b"old"
+    assert await refresh == b"new"
+    assert cache.stale == 1
+
+
+@pytest.mark.asyncio
+async def test_backend_failure_falls_back_to_the_database():
+    class Down(MemoryBackend):
+        async def get(self, key):
+            raise ConnectionError("cache is down")
+
+    cache = PageCache()
+    cache.open(Down())
+
+    async def produce():
+        return b"[]"
+
+    assert await cache.get_or_compute("books", {}, produce) == b"[]"
+    assert cache.errors == 1
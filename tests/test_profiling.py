@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+
+from app.api.books import router as books_router
+from app.profiling import ProfilerMiddleware
+from app.services.books import BookService
+
+
+async def slow_query():
+    await asyncio.sleep(0.05)
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = FastAPI()
+    app.add_middleware(ProfilerMiddleware)
+    app.include_router(books_router)
+
+    @app.get("/slow")
+    async def slow():
+        await slow_query()
+        return {"ok": True}
+
+    return app
+
+
+@pytest.fixture
+async def client(app):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture
+def profiling(monkeypatch, tmp_path):
+    monkeypatch.setattr("app.profiling.settings.profiling_enabled", True)
+    monkeypatch.setattr("app.profiling.settings.profiling_interval_ms", 1.0)
+    monkeypatch.setattr("app.profiling.settings.profiling_dir", str(tmp_path))
+    return tmp_path
+
+
+@pytest.mark.asyncio
+async def test_header_triggers_profile(client, profiling):
+    r = await client.get("/slow", headers={"X-Profile": "1"})
+    assert r.status_code == 200
+    profile = profiling / r.headers["x-profile-id"]
+    lines = profile.read_text().splitlines()
+    assert lines
+    stack, weight = lines[0].rsplit(" ", 1)
+    assert int(weight) >= 0
+    awaiting = [line for line in lines if "slow_query" in line]
+    assert awaiting
+    assert sum(int(line.rsplit(" ", 1)[1]) for line in awaiting) >= 30_000
+
+
+@pytest.mark.asyncio
+async def test_coalesced_reads_are_profiled_inside_the_flight(
+    client, profiling, monkeypatch
+):
+    monkeypatch.setattr("app.api.books.settings.read_coalescing_window_ms", 1000)
+    list_books = BookService.list_books
+
+    async def slow_list_books(self, **filters):
+        await slow_query()
+        return await list_books(self, **filters)
+
+    monkeypatch.setattr(BookService, "list_books", slow_list_books)
+    r = await client.get("/books?limit=3", headers={"X-Profile": "1"})
+    assert r.status_code == 200
+    lines = (profiling / r.headers["x-profile-id"]).read_text().splitlines()
+    in_flight = [
+        line for line in lines if "SingleFlight.do" in line and "slow_query" in line
+    ]
+    assert sum(int(line.rsplit(" ", 1)[1]) for line in in_flight) >= 30_000
+
+
+@pytest.mark.asyncio
+async def test_untriggered_request_is_not_profiled(client, profiling):
+    r = await client.get("/slow")
+    assert "x-profile-id" not in r.headers
+    assert list(profiling.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_sample_rate_triggers_profile(client, profiling, monkeypatch):
+    monkeypatch.setattr("app.profiling.settings.profiling_sample_rate", 1.0)
+    r = await client.get("/slow")
+    assert (profiling / r.headers["x-profile-id"]).exists()
+
+
+@pytest.mark.asyncio
+async def test_disabled_ignores_header(client, tmp_path, monkeypatch):
+    monkeypatch.setattr("app.profiling.settings.profiling_dir", str(tmp_path))
+    r = await client.get("/slow", headers={"X-Profile": "1"})
+    assert "x-profile-id" not in r.headers
+    assert list(tmp_path.iterdir()) == []
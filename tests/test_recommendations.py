@@ -0,0 +1,112 @@
+import random
+from collections import Counter
+from itertools import permutations
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+
+from app import db as app_db
+from app.api.books import router as books_router
+from app.api.recommendations import router as recommendations_router
+from app.services.recommendations import (
+    RecommendationService,
+    co_borrowing_neighbours,
+    numpy,
+)
+
+needs_numpy = pytest.mark.skipif(numpy is None, reason="numpy not installed")
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = FastAPI()
+    app.include_router(books_router)
+    app.include_router(recommendations_router)
+    return app
+
+
+@pytest.fixture
+async def client(app):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+async def _lend(client, serial, card):
+    r = await client.post(f"/books/{serial}/borrow", json={"borrower_card": card})
+    assert r.status_code == 200, r.text
+    r = await client.post(f"/books/{serial}/return")
+    assert r.status_code == 200, r.text
+
+
+@pytest.mark.asyncio
+async def test_related_books_of_unknown_and_unranked_books(client):
+    assert (await client.get("/books/999999/related")).status_code == 404
+    assert (await client.get("/books/12345/related")).status_code == 400
+    await client.post(
+        "/books", json={"serial_number": "100001", "title": "T", "author": "A"}
+    )
+    r = await client.get("/books/100001/related")
+    assert r.status_code == 200
+    assert r.json() == []
+
+
+@needs_numpy
+def test_neighbours_match_brute_force_counts(monkeypatch):
+    monkeypatch.setattr("app.services.recommendations.PAIR_CHUNK", 50)
+    rng = random.Random(7)
+    loans = [(rng.randrange(30), rng.randrange(20)) for _ in range(400)]
+    loans += [(99, b) for b in range(20)]  # a card over the per-card limit
+    together = Counter()
+    by_card = {}
+    for card, book in loans:
+        by_card.setdefault(card, set()).add(book)
+    for card, books in by_card.items():
+        if len(books) <= 15:
+            together.update(permutations(books, 2))
+
+    book, rank, related, counts = co_borrowing_neighbours(
+        numpy.array([c for c, _ in loans], dtype=numpy.int64),
+        numpy.array([b for _, b in loans], dtype=numpy.int64),
+        20,
+        top_k=3,
+        min_together=2,
+        max_per_card=15,
+    )
+    for b in range(20):
+        expected = sorted(
+            ((-n, o) for (a, o), n in together.items() if a == b and n >= 2)
+        )[:3]
+        mine = book == b
+        assert rank[mine].tolist() == list(range(len(expected)))
+        assert list(zip((-counts[mine]).tolist(), related[mine].tolist())) == expected
+
+
+@needs_numpy
+@pytest.mark.asyncio
+async def test_rebuild_serves_books_borrowed_together(client):
+    for serial in ("100001", "100002", "100003", "100004"):
+        r = await client.post(
+            "/books", json={"serial_number": serial, "title": serial, "author": "A"}
+        )
+        assert r.status_code == 201
+    for card in ("111111", "222222", "333333"):
+        await _lend(client, "100001", card)
+        await _lend(client, "100002", card)
+    for card in ("111111", "222222"):
+        await _lend(client, "100003", card)
+    await _lend(client, "100004", "111111")
+
+    async with app_db.transaction_session("job") as session:
+        assert await RecommendationService(session).rebuild() == 6
+
+    r = await client.get("/books/100001/related")
+    assert r.status_code == 200
+    assert [(b["serial_number"], b["borrowed_together"]) for b in r.json()] == [
+        ("100002", 3),
+        ("100003", 2),
+    ]
+    assert r.json()[0]["author"] == "A"
+    r = await client.get("/books/100004/related")
+    assert r.json() == []
@@ -1,7 +1,10 @@
 import pytest
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.models import User
 from app.services.books import BookService
+from app.services.users import UserService
 from app.exceptions import (
     BookAlreadyBorrowed,
     BookNotBorrowed,
@@ -9,6 +12,7 @@ from app.exceptions import (
     DuplicateSerialNumber,
     InvalidCardNumber,
     InvalidSerialNumber,
+    LoanLimitExceeded,
     UserNotFound,
 )
 
@@ -204,3 +208,119 @@ async def test_borrow_nonexistent_user_raises(session: AsyncSession):
 
     with pytest.raises(UserNotFound):
         await service.borrow_book(serial_number="999999", borrower_card="666666")
+
+
+@pytest.mark.asyncio
+async def test_lookup_by_serials(session: AsyncSession, monkeypatch):
+    monkeypatch.setattr("app.services.books.LOOKUP_CHUNK_SIZE", 2)
+    service = BookService(session)
+    for serial in ("111111", "222222", "333333"):
+        await add_sample_book(service, serial)
+    await session.commit()
+
+    found, missing = await service.lookup_by_serials(
+        ["333333", "999999", "111111", "333333", "222222"]
+    )
+    assert [b.serial_number for b in found] == ["333333", "111111", "222222"]
+    assert missing == ["999999"]
+
+    with pytest.raises(InvalidSerialNumber):
+        await service.lookup_by_serials(["111111", "12AB56"])
+
+
+@pytest.mark.asyncio
+async def test_list_and_lookup_selected_fields(session: AsyncSession):
+    service = BookService(session)
+    for serial in ("111111", "222222"):
+        await add_sample_book(service, serial)
+    await session.commit()
+
+    rows = await service.list_book_fields(("serial_number", "is_borrowed"))
+    assert sorted(rows, key=lambda r: r["serial_number"]) == [
+        {"serial_number": "111111", "is_borrowed": False},
+        {"serial_number": "222222", "is_borrowed": False},
+    ]
+
+    found, missing = await service.lookup_book_fields(
+        ["222222", "999999", "111111"], ("title",)
+    )
+    assert found == [{"title": "T"}, {"title": "T"}]
+    assert missing == ["999999"]
+
+
+async def loan_counts(session: AsyncSession):
+    result = await session.execute(select(User.card_number, User.loan_count))
+    return dict(result.all())
+
+
+@pytest.mark.asyncio
+async def test_loan_count_follows_borrow_return_and_set_status(session: AsyncSession):
+    service = BookService(session)
+    for serial in ("100001", "100002", "100003"):
+        await add_sample_book(service, serial)
+    await session.commit()
+
+    await service.borrow_book(serial_number="100001", borrower_card="111111")
+    await service.set_status(
+        serial_number="100002", is_borrowed=True, borrower_card="111111"
+    )
+    await service.borrow_book(serial_number="100003", borrower_card="222222")
+    await session.commit()
+    assert await loan_counts(session) == {"111111": 2, "222222": 1, "333333": 0}
+
+    await service.set_status(
+        serial_number="100002", is_borrowed=True, borrower_card="333333"
+    )
+    await service.return_book(serial_number="100001")
+    await service.set_status(serial_number="100003", is_borrowed=False)
+    await session.commit()
+    assert await loan_counts(session) == {"111111": 0, "222222": 0, "333333": 1}
+
+    await service.delete_book(serial_number="100002", allow_if_borrowed=True)
+    await session.commit()
+    assert await loan_counts(session) == {"111111": 0, "222222": 0, "333333": 0}
+
+
+@pytest.mark.asyncio
+async def test_borrow_over_loan_limit_raises(session: AsyncSession, monkeypatch):
+    monkeypatch.setattr("app.services.books.settings.max_loans_per_card", 1)
+    service = BookService(session)
+    await add_sample_book(service, "100001")
+    await add_sample_book(service, "100002")
+    await session.commit()
+
+    await service.borrow_book(serial_number="100001", borrower_card="111111")
+    await session.commit()
+    with pytest.raises(LoanLimitExceeded):
+        await service.borrow_book(serial_number="100002", borrower_card="111111")
+    await session.rollback()
+    with pytest.raises(LoanLimitExceeded):
+        await service.set_status(
+            serial_number="100002", is_borrowed=True, borrower_card="111111"
+        )
+    await session.rollback()
+
+    await service.return_book(serial_number="100001")
+    await service.borrow_book(serial_number="100002", borrower_card="111111")
+    await session.commit()
+    assert (await loan_counts(session))["111111"] == 1
+
+
+@pytest.mark.asyncio
+async def test_recompute_loan_counts_repairs_drift(session: AsyncSession):
+    service = BookService(session)
+    await add_sample_book(service, "100001")
+    await session.commit()
+    await service.borrow_book(serial_number="100001", borrower_card="222222")
+    await session.execute(
+        update(User).where(User.card_number == "333333").values(loan_count=4)
+    )
+    await session.execute(
+        update(User).where(User.card_number == "222222").values(loan_count=0)
+    )
+    await session.commit()
+
+    fixed = await UserService(session).recompute_loan_counts()
+    await session.commit()
+    assert fixed == 2
+    assert await loan_counts(session) == {"111111": 0, "222222": 1, "333333": 0}
@@ -0,0 +1,133 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+
+from app.api.books import router as books_router
+from app.singleflight import SingleFlight, read_coalescer
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = FastAPI()
+    app.include_router(books_router)
+    return app
+
+
+@pytest.fixture
+async def client(app, monkeypatch):
+    monkeypatch.setattr("app.api.books.settings.read_coalescing_window_ms", 1000)
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = 0
+
+    async def query():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return b"[]"
+
+    results = await asyncio.gather(*(flight.do("k", query, window=1) for _ in range(5)))
+    assert results == [b"[]"] * 5
+    assert calls == 1
+    assert flight.stats() == {"executed": 1, "coalesced": 4, "in_flight": 0}
+
+    await flight.do("k", query, window=1)
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_distinct_keys_and_disabled_window_do_not_coalesce():
+    flight = SingleFlight()
+    calls = 0
+
+    async def query():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+
+    await asyncio.gather(flight.do("a", query, window=1), flight.do("b", query, 1))
+    await asyncio.gather(*(flight.do("a", query, window=0) for _ in range(3)))
+    assert calls == 5
+
+
+@pytest.mark.asyncio
+async def test_flight_older_than_window_is_not_joined():
+    flight = SingleFlight()
+    calls = 0
+
+    async def query():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+
+    first = asyncio.create_task(flight.do("k", query, window=0.01))
+    await asyncio.sleep(0.03)
+    await flight.do("k", query, window=0.01)
+    await first
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_joiners():
+    flight = SingleFlight()
+
+    async def query():
+        await asyncio.sleep(0.02)
+        return 42
+
+    leader = asyncio.create_task(flight.do("k", query, window=1))
+    await asyncio.sleep(0)
+    joiner = asyncio.create_task(flight.do("k", query, window=1))
+    await asyncio.sleep(0)
+    leader.cancel()
+    assert await joiner == 42
+
+
+@pytest.mark.asyncio
+async def test_errors_are_shared():
+    flight = SingleFlight()
+
+    async def query():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(
+        *(flight.do("k", query, window=1) for _ in range(3)), return_exceptions=True
+    )
+    assert all(isinstance(r, ValueError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_read_after_write_does_not_join_an_older_flight(client, monkeypatch):
+    read, release = asyncio.Event(), asyncio.Event()
+    do = read_coalescer.do
+
+    async def held_do(key, fn, window):
+        async def held():
+            body = await fn()
+            read.set()
+            await release.wait()
+            return body
+
+        return await do(key, held, window)
+
+    monkeypatch.setattr(read_coalescer, "do", held_do)
+    before = asyncio.create_task(client.get("/books?limit=10"))
+    await read.wait()
+    r = await client.post(
+        "/books", json={"serial_number": "123456", "title": "T", "author": "A"}
+    )
+    assert r.status_code == 201
+    after = asyncio.create_task(client.get("/books?limit=10"))
+    await asyncio.sleep(0.01)
+    release.set()
+    assert [b["serial_number"] for b in (await after).json()] == ["123456"]
+    assert (await before).json() == []
@@ -0,0 +1,81 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+
+from app import db as app_db
+from app import slow_queries
+from app.api.admin import router as admin_router
+from app.services.books import BookService
+from app.slow_queries import SlowQueryLog, parameter_shape, slow_query_log
+
+
+@pytest.fixture
+def slow_log(monkeypatch):
+    monkeypatch.setattr("app.slow_queries.settings.slow_query_threshold_ms", 0.0)
+    slow_queries.install(app_db.engine)
+    slow_query_log.clear()
+    yield slow_query_log
+    slow_queries.uninstall(app_db.engine)
+    slow_query_log.clear()
+
+
+@pytest.mark.asyncio
+async def test_slow_statement_is_recorded_with_origin_and_shape(session, slow_log):
+    service = BookService(session)
+    await service.add_book(serial_number="123456", title="T", author="A")
+    slow_log.clear()
+
+    await service.get_by_serial("123456")
+
+    [entry] = slow_log.entries()
+    assert entry.origin == "BookService.get_by_serial"
+    assert "FROM books" in entry.statement
+    assert entry.parameters == {"serial": "str"}
+    assert "123456" not in str(entry.parameters)
+    assert entry.plan is None
+
+
+@pytest.mark.asyncio
+async def test_fast_statements_are_not_recorded(session, slow_log, monkeypatch):
+    monkeypatch.setattr("app.slow_queries.settings.slow_query_threshold_ms", 10_000)
+    await BookService(session).list_books()
+    assert slow_log.entries() == []
+
+
+@pytest.mark.asyncio
+async def test_admin_endpoint_lists_newest_first(session, slow_log):
+    service = BookService(session)
+    await service.list_books()
+    await service.lookup_by_serials(["123456", "654321"])
+
+    app = FastAPI()
+    app.include_router(admin_router)
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        r = await client.get("/admin/slow-queries")
+    assert r.status_code == 200
+    origins = [entry["origin"] for entry in r.json()]
+    assert origins[:2] == ["BookService.lookup_by_serials", "BookService.list_books"]
+
+
+def test_parameter_shape_hides_values():
+    assert parameter_shape({"serials": ["123456"] * 3, "limit": 10}) == {
+        "serials": "list[3]",
+        "limit": "int",
+    }
+    assert parameter_shape(("123456", None)) == ["str", "NoneType"]
+
+
+def test_explain_is_postgres_only_and_rate_limited():
+    log = SlowQueryLog(10)
+    postgres = SimpleNamespace(dialect=SimpleNamespace(name="postgresql"))
+    sqlite = SimpleNamespace(dialect=SimpleNamespace(name="sqlite"))
+    statement = "SELECT * FROM books WHERE serial_number = $1"
+
+    assert log._should_explain(sqlite, statement) is False
+    assert log._should_explain(postgres, statement) is True
+    assert log._should_explain(postgres, statement) is False
+    assert log._should_explain(postgres, "SELECT 1") is True
+    assert log._should_explain(postgres, "BEGIN") is False
@@ -0,0 +1,102 @@
+import io
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+
+from app.api.books import router as books_router
+from app.services.snapshot import pyarrow
+
+needs_pyarrow = pytest.mark.skipif(pyarrow is None, reason="pyarrow not installed")
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = FastAPI()
+    app.include_router(books_router)
+    return app
+
+
+@pytest.fixture
+async def client(app):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+async def _add_books(client, count):
+    for i in range(count):
+        r = await client.post(
+            "/books",
+            json={"serial_number": f"10000{i}", "title": f"T{i}", "author": "A"},
+        )
+        assert r.status_code == 201
+    r = await client.post("/books/100000/borrow", json={"borrower_card": "111111"})
+    assert r.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_snapshot_rejects_unknown_fields(client):
+    r = await client.get("/books/snapshot?fields=isbn")
+    assert r.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_snapshot_without_pyarrow(client, monkeypatch):
+    monkeypatch.setattr("app.services.snapshot.pyarrow", None)
+    r = await client.get("/books/snapshot")
+    assert r.status_code == 501
+
+
+@needs_pyarrow
+@pytest.mark.asyncio
+async def test_arrow_snapshot_is_streamed_in_batches(client, monkeypatch):
+    monkeypatch.setattr("app.services.snapshot.settings.snapshot_batch_rows", 2)
+    await _add_books(client, 5)
+    r = await client.get("/books/snapshot?format=arrow")
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    reader = pyarrow.ipc.open_stream(r.content)
+    batches = list(reader)
+    assert [b.num_rows for b in batches] == [2, 2, 1]
+    table = pyarrow.Table.from_batches(batches).sort_by("serial_number")
+    assert table.schema.names == [
+        "id",
+        "serial_number",
+        "title",
+        "author",
+        "is_borrowed",
+        "borrowed_at",
+        "borrowed_by",
+    ]
+    assert table["author"].to_pylist() == ["A"] * 5
+    assert table["is_borrowed"].to_pylist() == [True, False, False, False, False]
+    assert table["borrowed_by"].to_pylist()[0] == "111111"
+
+
+@needs_pyarrow
+@pytest.mark.asyncio
+async def test_parquet_snapshot_of_some_fields(client):
+    import pyarrow.parquet
+
+    await _add_books(client, 3)
+    r = await client.get("/books/snapshot?format=parquet&fields=title,serial_number")
+    assert r.status_code == 200
+    table = pyarrow.parquet.read_table(io.BytesIO(r.content))
+    assert table.schema.names == ["title", "serial_number"]
+    assert sorted(table["serial_number"].to_pylist()) == ["100000", "100001", "100002"]
+    assert sorted(table["title"].to_pylist()) == ["T0", "T1", "T2"]
+
+
+@needs_pyarrow
+@pytest.mark.asyncio
+async def test_snapshot_transaction_has_no_idle_timeout(client, monkeypatch):
+    budgets = []
+
+    async def record(session, budget):
+        budgets.append(budget)
+
+    monkeypatch.setattr("app.db.apply_timeout_budget", record)
+    r = await client.get("/books/snapshot?format=arrow")
+    assert r.status_code == 200
+    assert [b.idle_in_transaction_timeout_ms for b in budgets] == [0]
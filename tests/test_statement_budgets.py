@@ -0,0 +1,195 @@
+"""Exact number of SQL statements each endpoint sends to the database.
+
+An extra round trip on a route makes its case fail with the statements it ran;
+a route that got cheaper needs its budget lowered. Counted on SQLite: on
+PostgreSQL every transaction additionally sets its time budget with one
+`set_config` statement."""
+
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+
+from app import db as app_db
+from app.api.admin import router as admin_router
+from app.api.authors import router as authors_router
+from app.api.books import router as books_router
+from app.api.health import router as health_router
+from app.api.holds import router as holds_router
+from app.api.inventory import router as inventory_router
+from app.api.jobs import router as jobs_router
+from app.api.recommendations import router as recommendations_router
+from app.api.stats import router as stats_router
+from app.availability import availability
+from app.cards import card_cache
+from app.lifecycle import state
+from app.services.books import BookService
+from app.services.holds import HoldService
+from app.services.jobs import runner
+
+
+@dataclass(frozen=True)
+class Budget:
+    name: str
+    method: str
+    path: str
+    statements: int
+    json: Optional[Any] = None
+    status: int = 200
+    content: Optional[bytes] = None
+
+
+BUDGETS = [
+    Budget("list books", "GET", "/books", 1),
+    Budget("list books by author", "GET", "/books?author=A&sort=author", 1),
+    Budget("list book fields", "GET", "/books?fields=serial_number,title", 1),
+    Budget("book changes", "GET", "/books/changes", 2),
+    Budget("lookup books", "POST", "/books/lookup", 1, {"serial_numbers": ["100001"]}),
+    Budget(
+        "bulk availability",
+        "POST",
+        "/books/availability",
+        0,
+        {"serial_numbers": ["100001", "100002"]},
+    ),
+    Budget("book available", "GET", "/books/100001/available", 0),
+    Budget(
+        "create book",
+        "POST",
+        "/books",
+        2,
+        {"serial_number": "100009", "title": "T", "author": "A"},
+        201,
+    ),
+    Budget(
+        "create book by new author",
+        "POST",
+        "/books",
+        5,
+        {"serial_number": "100009", "title": "T", "author": "New"},
+        201,
+    ),
+    Budget("delete book", "DELETE", "/books/100001", 3, status=204),
+    Budget(
+        "borrow book",
+        "POST",
+        "/books/100001/borrow",
+        4,
+        {"borrower_card": "333333"},
+    ),
+    Budget("return book", "POST", "/books/100003/return", 4),
+    Budget("return book to hold", "POST", "/books/100002/return", 7),
+    Budget(
+        "set status borrowed",
+        "PATCH",
+        "/books/100001/status",
+        4,
+        {"is_borrowed": True, "borrower_card": "333333"},
+    ),
+    Budget(
+        "set status available",
+        "PATCH",
+        "/books/100003/status",
+        4,
+        {"is_borrowed": False},
+    ),
+    Budget(
+        "bulk import",
+        "POST",
+        "/books/bulk/import",
+        1,
+        {"books": [{"serial_number": "100009", "title": "T", "author": "A"}]},
+        202,
+    ),
+    Budget(
+        "bulk status",
+        "POST",
+        "/books/bulk/status",
+        1,
+        {"items": [{"serial_number": "100001", "is_borrowed": False}]},
+        202,
+    ),
+    Budget("list holds", "GET", "/books/100002/holds", 2),
+    Budget("related books", "GET", "/books/100001/related", 1),
+    Budget(
+        "place hold",
+        "POST",
+        "/books/100003/holds",
+        5,
+        {"borrower_card": "333333"},
+        201,
+    ),
+    Budget("cancel hold", "DELETE", "/books/100002/holds/{hold_id}", 3, status=204),
+    Budget("inventory audit", "POST", "/inventory/audit", 1, content=b"100001\n"),
+    Budget("get job", "GET", "/jobs/{job_id}", 1),
+    Budget("list authors", "GET", "/authors", 1),
+    Budget("circulation stats", "GET", "/stats/circulation?granularity=week", 1),
+    Budget("liveness", "GET", "/health/live", 0),
+    Budget("readiness", "GET", "/health/ready", 1),
+    Budget("metrics", "GET", "/admin/metrics", 0),
+    Budget("slow queries", "GET", "/admin/slow-queries", 0),
+    Budget("check availability", "GET", "/admin/availability/check", 1),
+]
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = FastAPI()
+    for router in (
+        books_router,
+        authors_router,
+        holds_router,
+        recommendations_router,
+        inventory_router,
+        jobs_router,
+        stats_router,
+        health_router,
+        admin_router,
+    ):
+        app.include_router(router)
+    return app
+
+
+@pytest.fixture
+async def library(monkeypatch):
+    """100001 is available, 100002 is borrowed by 111111 with a hold of
+    222222 and 100003 is borrowed by 222222; caches are warm."""
+    monkeypatch.setattr(state, "started", True)
+    async with app_db.transaction_session() as session:
+        books = BookService(session)
+        for serial in ("100001", "100002", "100003"):
+            await books.add_book(serial_number=serial, title="T", author="A")
+        await books.borrow_book(serial_number="100002", borrower_card="111111")
+        await books.borrow_book(serial_number="100003", borrower_card="222222")
+        hold, _ = await HoldService(session).place_hold("100002", "222222")
+    async with app_db.transaction_session() as session:
+        await card_cache.load(session)
+        await availability.load(session)
+    # No workers: submitted jobs stay queued, so they run no statements.
+    await runner.start(workers=0, queue_size=10)
+    job = await runner.submit("set_status", [])
+    yield {"hold_id": hold.id, "job_id": job.id}
+    await runner.stop(timeout=0)
+
+
+@pytest.fixture
+async def client(app, library):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("budget", BUDGETS, ids=[b.name for b in BUDGETS])
+async def test_statement_budget(client, library, statements, budget):
+    statements.clear()
+    response = await client.request(
+        budget.method,
+        budget.path.format(**library),
+        json=budget.json,
+        content=budget.content,
+    )
+    assert response.status_code == budget.status, response.text
+    assert len(statements) == budget.statements, "\n\n".join(statements)
@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+from fastapi import Depends, FastAPI
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import DBAPIError
+
+from app import db as app_db
+from app.timeouts import CancelOnDisconnectMiddleware, database_timeout_handler
+
+events = []
+
+
+class QueryCanceled(Exception):
+    sqlstate = "57014"
+
+
+async def teardown_later():
+    yield
+    await asyncio.sleep(0.01)
+    events.append("teardown")
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = FastAPI()
+    app.add_middleware(CancelOnDisconnectMiddleware)
+    app.add_exception_handler(DBAPIError, database_timeout_handler)
+
+    @app.post("/echo")
+    async def echo(payload: dict, _=Depends(teardown_later)):
+        return payload
+
+    @app.get("/timeout")
+    async def timeout():
+        raise DBAPIError("SELECT 1", None, QueryCanceled())
+
+    return app
+
+
+@pytest.fixture
+async def client(app):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+@pytest.mark.asyncio
+async def test_request_body_and_dependency_teardown_survive(client):
+    events.clear()
+    r = await client.post("/echo", json={"serial_number": "123456"})
+    assert r.json() == {"serial_number": "123456"}
+    await asyncio.sleep(0.05)
+    assert events == ["teardown"]
+
+
+@pytest.mark.asyncio
+async def test_statement_timeout_maps_to_503(client):
+    r = await client.get("/timeout")
+    assert r.status_code == 503
+
+
+@pytest.mark.asyncio
+async def test_client_disconnect_cancels_handler():
+    started, cancelled = asyncio.Event(), asyncio.Event()
+    sent = []
+
+    async def slow_app(scope, receive, send):
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    inbox = asyncio.Queue()
+    await inbox.put({"type": "http.request", "body": b"", "more_body": False})
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/books", "headers": []}
+    call = asyncio.create_task(
+        CancelOnDisconnectMiddleware(slow_app)(scope, inbox.get, send)
+    )
+    await started.wait()
+    await inbox.put({"type": "http.disconnect"})
+    await asyncio.wait_for(call, 1)
+    assert cancelled.is_set()
+    assert sent == []
+
+
+def test_timeout_budgets_are_set_per_transaction(monkeypatch):
+    monkeypatch.setattr("app.db.settings.db_read_statement_timeout_ms", 1500)
+    monkeypatch.setattr("app.db.settings.db_lock_timeout_ms", 250)
+    budget = app_db.timeout_budget("read")
+    assert budget.statement_timeout_ms == 1500
+    assert budget.lock_timeout_ms == 250
+    assert app_db.timeout_budget("job").statement_timeout_ms > 1500
+    assert budget.idle_in_transaction_timeout_ms > 0
+    assert app_db.timeout_budget("export").idle_in_transaction_timeout_ms == 0
+
+    sql = str(app_db.SET_TIMEOUTS.compile(dialect=postgresql.dialect()))
+    assert "set_config('statement_timeout', %(statement_timeout)s, true)" in sql
+    assert "set_config('lock_timeout', %(lock_timeout)s, true)" in sql
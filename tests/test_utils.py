@@ -1,6 +1,6 @@
 import pytest
 
-from app.utils import validate_serial, validate_card
+from app.utils import parse_fields, validate_serial, validate_serials, validate_card
 
 
 @pytest.mark.parametrize("value", ["000000", "123456", "999999"])
@@ -16,6 +16,26 @@ def test_validate_serial_invalid(value):
         validate_serial(value)
 
 
+def test_validate_serials_dedupes_in_order():
+    assert validate_serials(["222222", "111111", "222222"]) == ["222222", "111111"]
+    assert validate_serials([]) == []
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        ["123456", "12345"],
+        ["123456,123456"],
+        ["12345", "6,123456"],
+        ["123456", None],
+        ["123456\n"],
+    ],
+)
+def test_validate_serials_invalid(values):
+    with pytest.raises(ValueError):
+        validate_serials(values)
+
+
 @pytest.mark.parametrize("value", ["000000", "111111", "654321"])
 def test_validate_card_ok(value):
     assert validate_card(value) == value
@@ -27,3 +47,12 @@ def test_validate_card_ok(value):
 def test_validate_card_invalid(value):
     with pytest.raises(ValueError):
         validate_card(value)
+
+
+def test_parse_fields():
+    allowed = ("id", "title", "author")
+    assert parse_fields(None, allowed) is None
+    assert parse_fields("title, id,title", allowed) == ("title", "id")
+    for raw in ("", " , ", "title,isbn"):
+        with pytest.raises(ValueError):
+            parse_fields(raw, allowed)